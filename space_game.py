@@ -6,18 +6,577 @@ import os
 import json
 import wave
 import struct
+import time
+import argparse
+import functools
+import logging
+import logging.handlers
+import queue
+import threading
+import concurrent.futures
+import atexit
+import hashlib
+import heapq
+import socket
+import inspect
+import tracemalloc
+import weakref
+from collections import deque, Counter, defaultdict
 import numpy
 
+# Command-line options; performance settings may also come from JSON
+CONFIG_PATH = 'space_game.json'
+MIN_CANVAS = 640  # Smallest width or height that fits the biggest sprites
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Space Asteroid Shooter")
+    parser.add_argument('--config', metavar='PATH',
+                        help=f"read performance settings from the JSON file PATH (default {CONFIG_PATH}, if it "
+                             "exists); options given on the command line override the file")
+    parser.add_argument('--memstats', action='store_true',
+                        help="count live objects, surface bytes and allocations (F3 shows them in game)")
+    parser.add_argument('--memstats-json', metavar='PATH',
+                        help="write the memory statistics to PATH as JSON (implies --memstats)")
+    parser.add_argument('--bake', action='store_true',
+                        help="generate all ship, asteroid, power-up, boss and sound assets into the asset cache and exit")
+    parser.add_argument('--bake-levels', type=int, default=20, metavar='N',
+                        help="bake asteroid and boss art for levels 1 to N (default 20)")
+    parser.add_argument('--sound-test', action='store_true',
+                        help="play the startup sound self-test")
+    parser.add_argument('--autopilot', action='store_true',
+                        help="let the built-in pilot play the menus and levels unattended (soak testing)")
+    parser.add_argument('--soak-hours', type=float, metavar='H',
+                        help="with --autopilot, quit after H hours")
+    parser.add_argument('--soak-levels', type=int, metavar='N',
+                        help="with --autopilot, quit after N levels have been played")
+    parser.add_argument('--soak-report', default='soak_report.json', metavar='PATH',
+                        help="with --autopilot, where to write RSS, sprite counts and frame times per level "
+                             "(default soak_report.json)")
+    parser.add_argument('--pilot-name', default='autopilot', metavar='NAME',
+                        help="player name the autopilot enters (12345 plays invincible, to reach later levels)")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a window or audio device")
+    parser.add_argument('--stream-port', type=int, metavar='PORT',
+                        help="serve the game to spectators (see --watch) on TCP port PORT")
+    parser.add_argument('--stream-host', default='127.0.0.1', metavar='HOST',
+                        help="address the spectator stream listens on (default 127.0.0.1; 0.0.0.0 for other machines)")
+    parser.add_argument('--watch', metavar='HOST:PORT',
+                        help="open the spectator viewer on a game started with --stream-port, instead of playing")
+    parser.add_argument('--telemetry', metavar='DIR',
+                        help="log level, boss, power-up, death and frame-time events for each game to an NDJSON file in DIR")
+    parser.add_argument('--telemetry-report', nargs='+', metavar='PATH',
+                        help="summarize telemetry run files (or directories of them) and exit")
+    
+    performance = parser.add_argument_group(
+        'performance', 'each of these can also be set in the --config file by its name, e.g. '
+                       '{"width": 1920, "height": 1080, "fps": 120, "glow": false}')
+    settings = {}  # dest -> action, for checking the file's values
+    limits = {}  # dest -> (lowest, highest or None)
+    
+    def setting(*flags, lowest=None, highest=None, **kwargs):
+        action = performance.add_argument(*flags, **kwargs)
+        settings[action.dest] = action
+        if lowest is not None:
+            limits[action.dest] = (lowest, highest)
+    
+    def check_limits(dest, value, name):
+        lowest, highest = limits[dest]
+        if highest is None and value < lowest:
+            parser.error(f"{name} must be at least {lowest}, not {value}")
+        if highest is not None and not lowest <= value <= highest:
+            parser.error(f"{name} must be from {lowest} to {highest}, not {value}")
+    
+    setting('--width', type=int, default=1280, lowest=MIN_CANVAS,
+            help=f"logical canvas width in pixels, at least {MIN_CANVAS} (default 1280)")
+    setting('--height', type=int, default=1280, lowest=MIN_CANVAS,
+            help=f"logical canvas height in pixels, at least {MIN_CANVAS} (default 1280)")
+    setting('--render-scale', type=float, default=1.0, metavar='SCALE', lowest=0.25, highest=1.0,
+            help="draw the game world at SCALE of the logical resolution, from 0.25 to 1.0, e.g. 0.5 or 0.75")
+    setting('--pacing', choices=('vsync', 'busy', 'hybrid', 'uncapped'), default='hybrid',
+            help="frame pacing: wait for the display refresh, busy-wait, sleep then spin (default), "
+                 "or run as fast as possible")
+    setting('--fps', type=int, default=60, lowest=1,
+            help="target frame rate for the busy and hybrid pacing modes (default 60)")
+    setting('--renderer', choices=('surface', 'texture'), default='surface',
+            help="draw with surface blits (default) or pygame._sdl2's texture renderer; "
+                 "falls back to surfaces where the renderer can't be created")
+    setting('--audio-rate', type=int, default=44100, metavar='HZ', lowest=8000,
+            help="mixer sample rate (default 44100)")
+    setting('--audio-buffer', type=int, default=1024, metavar='SAMPLES', lowest=1,
+            help="mixer buffer size; smaller is lower latency but risks underruns (default 1024)")
+    setting('--channels', type=int, default=32, metavar='N', lowest=0,
+            help="sounds that can play at once (default 32)")
+    setting('--stars', type=int, default=100, metavar='N', lowest=0,
+            help="stars in the in-game star field (default 100)")
+    setting('--particles', type=int, default=2000, metavar='N', lowest=0,
+            help="particles alive at once, across every emitter (default 2000)")
+    setting('--explosion-scale', type=float, default=1.0, metavar='SCALE', lowest=0.0,
+            help="scale every explosion's radius; smaller blasts fill fewer pixels (default 1.0)")
+    setting('--glow', action=argparse.BooleanOptionalAction, default=True,
+            help="soft glows around near stars and glowing particles (default on)")
+    
+    # File values replace the defaults; the command line still wins
+    known = parser.parse_args(argv)
+    path = known.config or CONFIG_PATH
+    try:
+        with open(path) as f:
+            values = json.load(f)
+        if not isinstance(values, dict):
+            raise ValueError("expected a JSON object of settings")
+    except FileNotFoundError:
+        if known.config:
+            parser.error(f"config file {path} not found")
+        values = {}
+    except (OSError, ValueError) as e:
+        parser.error(f"can't read config file {path}: {e}")
+    defaults = {}
+    for name, value in values.items():
+        action = settings.get(name.replace('-', '_'))
+        if action is None:
+            parser.error(f"{path}: unknown setting {name!r}; expected one of {', '.join(sorted(settings))}")
+        try:
+            if isinstance(action, argparse.BooleanOptionalAction):
+                if not isinstance(value, bool):
+                    raise ValueError("expected true or false")
+            elif action.type:
+                value = action.type(value)
+        except (TypeError, ValueError) as e:
+            parser.error(f"{path}: bad value {value!r} for {name}: {e}")
+        if action.choices and value not in action.choices:
+            parser.error(f"{path}: {name} must be one of {', '.join(action.choices)}")
+        if action.dest in limits:
+            check_limits(action.dest, value, f"{path}: {name}")
+        defaults[action.dest] = value
+    parser.set_defaults(**defaults)
+    
+    args = parser.parse_args(argv)
+    for dest in limits:
+        check_limits(dest, getattr(args, dest), settings[dest].option_strings[0])
+    return args
+
+ARGS = parse_args()
+
+if ARGS.headless or ARGS.telemetry_report:
+    # SDL's dummy drivers: everything still renders and mixes, just nowhere visible
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+# Logging: WARNING and up unless SPACE_GAME_LOG sets a level
+LOG_LEVEL_ENV = 'SPACE_GAME_LOG'
+logger = logging.getLogger('space_game')
+event_counts = Counter()  # Event tallies, summarized once per game
+
+def configure_logging():
+    """Queues records for a background thread to write"""
+    level = logging.getLevelName(os.environ.get(LOG_LEVEL_ENV, 'WARNING').upper())
+    if not isinstance(level, int):
+        level = logging.WARNING
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(relativeCreated)8.0f %(levelname)-7s %(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, console)
+    listener.start()
+    atexit.register(listener.stop)  # Flushes whatever is still queued
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+
+def log_event_counts(label):
+    if event_counts:
+        logger.info("%s: %s", label, ", ".join(f"{category}={count}" for category, count in sorted(event_counts.items())))
+    event_counts.clear()
+
+configure_logging()
+
+# Memory instrumentation
+PLAIN_SURFACE = pygame.Surface  # Before --memstats wraps it, for isinstance() checks
+
+class MemoryTracker:
+    """Live instance, surface and allocation accounting for --memstats runs"""
+    SNAPSHOT_INTERVAL = 60  # Frames between tracemalloc snapshots
+    TOP_SITES = 10
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.instances = {}  # Class name -> WeakSet of live instances
+        self.surfaces = weakref.WeakSet()
+        self.surface_sites = Counter()  # Call site -> surfaces created since the last snapshot
+        self.allocation_sites = []  # Allocations per frame by call site, from the last interval
+        self.history = []  # Samples taken at level starts
+        self.frame = 0
+        self.snapshot = None
+        self.snapshot_frame = 0
+        if enabled:
+            tracemalloc.start()
+            self.install_surface_hooks()
+
+    def track(self, cls):
+        """Class decorator: count live instances while instrumentation is on"""
+        if not self.enabled:
+            return cls
+        instances = self.instances.setdefault(cls.__name__, weakref.WeakSet())
+        original_init = cls.__init__
+
+        @functools.wraps(original_init)
+        def __init__(obj, *args, **kwargs):
+            original_init(obj, *args, **kwargs)
+            if type(obj) is cls:
+                instances.add(obj)
+        cls.__init__ = __init__
+        return cls
+
+    def install_surface_hooks(self):
+        # Record surfaces from the constructor, convert, load, transforms and fonts
+        tracker = self
+
+        class TrackedSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                tracker.note_surface(self, sys._getframe(1))
+
+            def convert(self, *args, **kwargs):
+                surface = super().convert(*args, **kwargs)
+                tracker.note_surface(surface, sys._getframe(1))
+                return surface
+
+            def convert_alpha(self, *args, **kwargs):
+                surface = super().convert_alpha(*args, **kwargs)
+                tracker.note_surface(surface, sys._getframe(1))
+                return surface
+
+        class TrackedFont(pygame.font.Font):
+            def render(self, *args, **kwargs):
+                surface = super().render(*args, **kwargs)
+                tracker.note_surface(surface, sys._getframe(1))
+                return surface
+
+        def wrap(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                surface = function(*args, **kwargs)
+                tracker.note_surface(surface, sys._getframe(1))
+                return surface
+            return wrapper
+
+        pygame.Surface = TrackedSurface
+        pygame.font.Font = TrackedFont
+        for name in ('rotate', 'rotozoom', 'scale', 'smoothscale', 'flip'):
+            setattr(pygame.transform, name, wrap(getattr(pygame.transform, name)))
+        pygame.image.load = wrap(pygame.image.load)
+
+    def note_surface(self, surface, frame):
+        self.surfaces.add(surface)
+        self.surface_sites[f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"] += 1
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.frame += 1
+        if self.frame - self.snapshot_frame < self.SNAPSHOT_INTERVAL and self.snapshot is not None:
+            return
+        
+        # Allocation rate per call site over the last interval
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, weakref.__file__),
+        ])
+        frames = max(1, self.frame - self.snapshot_frame)
+        if self.snapshot is not None:
+            sites = []
+            for stat in snapshot.compare_to(self.snapshot, 'lineno'):
+                if stat.count_diff > 0:
+                    frame = stat.traceback[0]
+                    sites.append({
+                        'site': f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                        'allocations_per_frame': round(stat.count_diff / frames, 2),
+                        'bytes_per_frame': round(stat.size_diff / frames),
+                    })
+            for site, count in self.surface_sites.items():
+                sites.append({'site': site + " (surface)",
+                              'allocations_per_frame': round(count / frames, 2),
+                              'bytes_per_frame': 0})
+            sites.sort(key=lambda site: site['allocations_per_frame'], reverse=True)
+            self.allocation_sites = sites[:self.TOP_SITES]
+        self.surface_sites.clear()
+        self.snapshot = snapshot
+        self.snapshot_frame = self.frame
+
+    @staticmethod
+    def surface_bytes(surface):
+        width, height = surface.get_size()
+        return width * height * surface.get_bytesize()
+
+    @staticmethod
+    def object_bytes(obj):
+        # Shallow size plus the attribute dict and any containers hanging off it
+        size = sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+        for value in obj.__dict__.values():
+            if isinstance(value, (list, dict, set)):
+                size += sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+        return size
+
+    @staticmethod
+    def images_of(obj):
+        # Surfaces held directly, plus registry art
+        images = [value for value in vars(obj).values() if isinstance(value, PLAIN_SURFACE)]
+        for name in ('image', 'original_image'):
+            try:
+                image = getattr(obj, name, None)
+            except KeyError:
+                continue  # Its registry key has been discarded
+            if isinstance(image, PLAIN_SURFACE):
+                images.append(image)
+        return images
+
+    def report(self):
+        classes = {}
+        for name, instances in self.instances.items():
+            live = list(instances)
+            surfaces = {id(image): image for obj in live for image in self.images_of(obj)}
+            classes[name] = {
+                'live': len(live),
+                'object_bytes': sum(self.object_bytes(obj) for obj in live),
+                'surface_bytes': sum(self.surface_bytes(surface) for surface in surfaces.values()),
+            }
+        # Registry images too, some of which were converted in C
+        surfaces = list({id(surface): surface for surface in
+                         [*self.surfaces, *assets.images.values()]}.values())
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            'frame': self.frame,
+            'classes': classes,
+            'component_array_bytes': sum(getattr(store, name).nbytes
+                                         for store in entities.stores.values()
+                                         for name in store.components),
+            'surfaces_live': len(surfaces),
+            'surface_pixel_bytes': sum(self.surface_bytes(surface) for surface in surfaces),
+            'python_heap_bytes': current,
+            'python_heap_peak_bytes': peak,
+            'allocation_sites': self.allocation_sites,
+        }
+
+    def sample(self, label):
+        if self.enabled:
+            report = self.report()
+            report['label'] = label
+            del report['allocation_sites']
+            self.history.append(report)
+
+    def dump(self, path):
+        if not self.enabled or not path:
+            return
+        try:
+            with open(path, 'w') as f:
+                json.dump({'current': self.report(), 'history': self.history}, f, indent=2)
+        except Exception as e:
+            logger.error("Error writing memory statistics: %s", e)
+
+    def draw(self, surface):
+        report = self.report()
+        lines = [
+            f"Surfaces: {report['surfaces_live']}  {report['surface_pixel_bytes'] // 1024} KB pixels",
+            f"Python heap: {report['python_heap_bytes'] // 1024} KB  "
+            f"(peak {report['python_heap_peak_bytes'] // 1024} KB)",
+        ]
+        for name, stats in sorted(report['classes'].items()):
+            lines.append(f"{name}: {stats['live']} live  {stats['object_bytes'] // 1024} KB  "
+                         f"{stats['surface_bytes'] // 1024} KB surfaces")
+        for site in report['allocation_sites'][:5]:
+            lines.append(f"{site['site']}: {site['allocations_per_frame']}/frame")
+        font = pygame.font.Font(None, 24)
+        y = 130
+        for line in lines:
+            text = font.render(line, True, GREEN)
+            surface.blit(text, (WIDTH - text.get_width() - 10, y))
+            y += 22
+
+memory_tracker = MemoryTracker(ARGS.memstats or bool(ARGS.memstats_json))
+
+def current_rss():
+    """Resident set size in bytes (or the peak), else None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Bytes on macOS, KB elsewhere
+
+class Telemetry:
+    """Gameplay events per run, appended to NDJSON by a writer thread"""
+    BATCH = 256  # Events buffered before a batch is handed to the writer
+    FRAME_WINDOW = 300  # Frames per frame-time summary event
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, directory=None):
+        self.enabled = directory is not None
+        self.directory = directory
+        self.batches = queue.SimpleQueue()  # (path, events) for the writer; None stops it
+        self.writer = None
+        self.path = None  # The current run's file, None between runs
+        self.buffer = []
+        self.runs = 0
+        self.frame_ms = numpy.zeros(self.FRAME_WINDOW)
+        self.frame_entities = numpy.zeros(self.FRAME_WINDOW, numpy.int32)
+        self.frame_particles = numpy.zeros(self.FRAME_WINDOW, numpy.int32)
+        self.frames = 0
+
+    def write_batches(self):
+        # Encoding and file writes both happen here, off the game loop
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                return
+            path, events = batch
+            try:
+                with open(path, 'a') as f:
+                    f.writelines(json.dumps(event, separators=(',', ':')) + '\n' for event in events)
+            except OSError as e:
+                logger.error("Error writing telemetry to %s: %s", path, e)
+
+    def stop(self):
+        self.flush()
+        if self.writer:
+            self.batches.put(None)
+            self.writer.join()
+            self.writer = None
+
+    def flush(self):
+        if self.buffer and self.path:
+            self.batches.put((self.path, self.buffer))
+        self.buffer = []
+
+    def event(self, kind, **fields):
+        if not self.path:
+            return
+        self.buffer.append({'t': round(time.perf_counter() - self.start, 3), 'event': kind, **fields})
+        if len(self.buffer) >= self.BATCH:
+            self.flush()
+
+    def begin_run(self, scene, resumed=False):
+        if not self.enabled:
+            return
+        if self.writer is None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+            except OSError as e:
+                logger.error("Error creating telemetry directory %s: %s", self.directory, e)
+                self.enabled = False
+                return
+            self.writer = threading.Thread(target=self.write_batches, name='telemetry', daemon=True)
+            self.writer.start()
+            atexit.register(self.stop)
+        self.runs += 1
+        self.path = os.path.join(self.directory,
+                                 f"run-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.runs}.ndjson")
+        self.start = time.perf_counter()
+        # Level and boss times are in game time
+        self.level_started = None  # game_clock.ticks() when the current level's play began
+        self.boss_started = None
+        self.death = None
+        self.frames = 0
+        self.event('run_start', started=time.strftime('%Y-%m-%dT%H:%M:%S'), player=scene.player_name,
+                   ship=scene.ship_key[1], level=scene.level, resumed=resumed)
+        # A resumed run may already be mid-level, or mid-fight
+        if not scene.level_transition:
+            self.level_start(scene)
+        if scene.boss_group:
+            self.boss_started = game_clock.ticks()
+
+    def level_start(self, scene):
+        if not self.path:
+            return
+        self.level_started = game_clock.ticks()
+        # Same test as GameScene's boss spawn
+        boss = bool(scene.boss_group) or scene.level % 5 == 0 and not scene.just_defeated_boss
+        self.event('level_start', level=scene.level, boss=boss, score=scene.score)
+
+    def level_end(self, scene, outcome):
+        if not self.path or self.level_started is None:
+            return
+        self.event('level_end', level=scene.level, outcome=outcome, score=scene.score,
+                   duration_s=round((game_clock.ticks() - self.level_started) / 1000, 3))
+        self.level_started = None
+        self.flush()
+
+    def boss_spawn(self, scene, boss):
+        if not self.path:
+            return
+        self.boss_started = game_clock.ticks()
+        self.event('boss_spawn', level=scene.level, health=boss.max_health)
+
+    def boss_defeat(self, scene, boss):
+        if not self.path:
+            return
+        ttk = None if self.boss_started is None else round((game_clock.ticks() - self.boss_started) / 1000, 3)
+        self.boss_started = None
+        self.event('boss_defeat', level=scene.level, ttk_s=ttk)
+
+    def power_up(self, scene, power_up_type):
+        self.event('power_up', type=power_up_type, level=scene.level)
+
+    def died(self, scene, cause):
+        # Only the first cause counts
+        if not self.path or self.death:
+            return
+        self.death = cause
+        self.event('death', cause=cause, level=scene.level, score=scene.score,
+                   x=scene.player.rect.centerx, y=scene.player.rect.centery,
+                   boss=bool(scene.boss_group))
+
+    def frame(self, work_ms, entities, particles):
+        if not self.path:
+            return
+        i = self.frames
+        self.frame_ms[i] = work_ms
+        self.frame_entities[i] = entities
+        self.frame_particles[i] = particles
+        self.frames += 1
+        if self.frames == self.FRAME_WINDOW:
+            self.summarize_frames()
+
+    def summarize_frames(self):
+        n = self.frames
+        if not n:
+            return
+        ms = self.frame_ms[:n]
+        entities = self.frame_entities[:n]
+        self.event('frames', frames=n,
+                   work_ms={f"p{p}": round(float(v), 3)
+                            for p, v in zip(self.PERCENTILES, numpy.percentile(ms, self.PERCENTILES))},
+                   max_ms=round(float(ms.max()), 3),
+                   entities=round(float(entities.mean()), 1), max_entities=int(entities.max()),
+                   particles=round(float(self.frame_particles[:n].mean()), 1))
+        self.frames = 0
+
+    def end_run(self, scene):
+        if not self.path:
+            return
+        self.summarize_frames()
+        outcome = 'death' if self.death else 'quit' if scene.running else 'reset'
+        self.level_end(scene, outcome)
+        self.event('run_end', outcome=outcome, level=scene.level, score=scene.score,
+                   duration_s=round(time.perf_counter() - self.start, 3),
+                   game_s=round(game_clock.ticks() / 1000, 3))
+        self.flush()
+        self.path = None
+
+telemetry = Telemetry(ARGS.telemetry)
+
 # Initialize pygame and sound
 pygame.mixer.quit()  # Reset the mixer
-pygame.mixer.pre_init(44100, -16, 2, 1024)  # Smaller buffer size
+pygame.mixer.pre_init(ARGS.audio_rate, -16, 2, ARGS.audio_buffer)
 pygame.mixer.init()
 pygame.init()
+SAMPLE_RATE = pygame.mixer.get_init()[0]  # As opened, which may differ from the request
 
-# Screen dimensions
-WIDTH, HEIGHT = 1280, 1280
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Space Asteroid Shooter")
+# Screen dimensions: the logical canvas, whatever the window size
+WIDTH, HEIGHT = ARGS.width, ARGS.height
+screen = None  # Display surface or the renderer's UI layer
 
 # Colors
 WHITE = (255, 255, 255)
@@ -29,6 +588,7 @@ YELLOW = (255, 255, 0)
 PURPLE = (255, 0, 255)
 ORANGE = (255, 165, 0)
 LIGHT_BLUE = (100, 200, 255)
+LIGHT_GREEN = (180, 255, 180)
 
 # Grey shades for asteroids and effects
 GREY = (128, 128, 128)
@@ -38,30 +598,429 @@ LIGHT_GREY = (192, 192, 192)
 CRATER_GREY = (48, 48, 48)
 
 # Initialize game control variables
-ESC_QUIT_GAME = False
 ESC_WELCOME_SCREEN = True
 total_score = 0  # Initialize global total_score
 
 # Add after the imports at the top
 FULLSCREEN = False
+VSYNC = ARGS.pacing == 'vsync'  # Cleared if no renderer can provide it
+RENDERER = ARGS.renderer  # Falls back to 'surface'
+texture_display = None
+
+# Texture renderer: sprites drawn by the SDL renderer from a texture atlas
+try:
+    from pygame._sdl2 import video as sdl2_video
+except ImportError:
+    sdl2_video = None
+
+BLEND_MODE_BLEND = 1  # SDL_BLENDMODE_BLEND
+
+class TextureAtlas:
+    """Packs sprite images into a few large textures, uploaded once each"""
+    PAGE_SIZE = 2048
+    MAX_SIDE = 512  # Larger images get a texture of their own
+    MAX_PAGES = 4  # Past this, start over
+
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.entries = weakref.WeakKeyDictionary()  # Image -> (texture, source rect)
+        self.reset()
+
+    def reset(self):
+        self.entries.clear()
+        self.pages = []
+        self.cursor_x = self.shelf_y = self.shelf_height = 0
+
+    def get(self, image):
+        entry = self.entries.get(image)
+        if entry is None:
+            entry = self.entries[image] = self.add(image)
+        return entry
+
+    def add(self, image):
+        width, height = image.get_size()
+        if width > self.MAX_SIDE or height > self.MAX_SIDE:
+            texture = sdl2_video.Texture.from_surface(self.renderer, image)
+            return texture, texture.get_rect()
+        area = self.place(width, height)
+        if area is None:
+            if len(self.pages) >= self.MAX_PAGES:
+                self.reset()
+            page = sdl2_video.Texture(self.renderer, (self.PAGE_SIZE, self.PAGE_SIZE))
+            page.blend_mode = BLEND_MODE_BLEND
+            self.pages.append(page)
+            self.cursor_x = self.shelf_y = self.shelf_height = 0
+            area = self.place(width, height)
+        page = self.pages[-1]
+        page.update(image, area)
+        return page, area
+
+    def place(self, width, height):
+        # Shelf packing into the newest page
+        if not self.pages:
+            return None
+        if self.cursor_x + width > self.PAGE_SIZE:
+            self.cursor_x = 0
+            self.shelf_y += self.shelf_height + 1
+            self.shelf_height = 0
+        if self.shelf_y + height > self.PAGE_SIZE:
+            return None
+        area = pygame.Rect(self.cursor_x, self.shelf_y, width, height)
+        self.cursor_x += width + 1  # Gap against filtering bleed
+        self.shelf_height = max(self.shelf_height, height)
+        return area
+
+class TextureDisplay:
+    """Renderer-backed window: world as texture copies, UI layer over it"""
+    def __init__(self, vsync=False):
+        if sdl2_video is None:
+            raise pygame.error("pygame._sdl2 is not available")
+        self.window = sdl2_video.Window("Space Asteroid Shooter", size=(WIDTH, HEIGHT))
+        try:
+            self.renderer = sdl2_video.Renderer(self.window, vsync=vsync)
+        except pygame.error:
+            self.window.destroy()
+            raise
+        self.renderer.logical_size = (WIDTH, HEIGHT)  # Stretched to the window, like SCALED
+        self.atlas = TextureAtlas(self.renderer)
+        self.discs = {}  # Radius -> white disc texture, tinted per draw
+        
+        # Menus and the HUD draw here as on the display surface
+        self.ui = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        self.ui_texture = sdl2_video.Texture(self.renderer, (WIDTH, HEIGHT), streaming=True)
+        self.ui_texture.blend_mode = BLEND_MODE_BLEND
+        self.ui_area = self.ui.get_rect()  # Drawn part of the UI layer
+        self.world = False  # A world was drawn under the UI layer this frame
+
+    def set_fullscreen(self, fullscreen):
+        if fullscreen:
+            self.window.set_fullscreen(desktop=True)
+        else:
+            self.window.set_windowed()
+
+    def disc(self, radius):
+        texture = self.discs.get(radius)
+        if texture is None:
+            image = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(image, WHITE, (radius, radius), radius)
+            texture = self.discs[radius] = sdl2_video.Texture.from_surface(self.renderer, image)
+        return texture
+
+    def drawn_area(self):
+        # Bounding box of the visible pixels
+        alpha = pygame.surfarray.pixels_alpha(self.ui).T
+        rows = numpy.flatnonzero(alpha.max(axis=1))
+        if not len(rows):
+            return pygame.Rect(0, 0, 0, 0)
+        top, bottom = int(rows[0]), int(rows[-1]) + 1
+        columns = numpy.flatnonzero(alpha[top:bottom].max(axis=0))
+        left, right = int(columns[0]), int(columns[-1]) + 1
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def begin_world(self):
+        self.renderer.draw_color = (*BLACK, 255)
+        self.renderer.clear()
+        self.ui.fill((0, 0, 0, 0), self.ui_area)
+        self.world = True
+
+    def present(self):
+        if self.world:
+            # Upload only the drawn part
+            area = self.drawn_area()
+        else:
+            # Menus paint the whole layer themselves
+            self.renderer.draw_color = (*BLACK, 255)
+            self.renderer.clear()
+            area = self.ui.get_rect()
+        if area.width and area.height:
+            self.ui_texture.update(self.ui.subsurface(area), area)
+            self.ui_texture.draw(area, area)
+        self.ui_area = area
+        self.world = False
+        self.renderer.present()
+
+class TextureView:
+    """RenderView for the texture renderer"""
+    scale = 1.0  # The renderer's logical size does the scaling
+
+    def __init__(self, display):
+        self.display = display
+        self.atlas = display.atlas
+
+    def begin(self):
+        self.display.begin_world()
+        return self
+
+    def circle(self, color, center, radius):
+        self.soft_circle(tuple(color[:3]), center, radius)
+
+    def soft_circle(self, color, center, radius):
+        if radius < 1:
+            return
+        disc = self.display.disc(radius)
+        disc.color = color[:3]
+        disc.alpha = color[3] if len(color) > 3 else 255
+        disc.draw(None, (center[0] - radius, center[1] - radius, radius * 2, radius * 2))
+
+    def blit(self, image, position):
+        texture, area = self.atlas.get(image)
+        texture.draw(area, (position[0], position[1], area.width, area.height))
+
+    def draw_sprites(self, visible):
+        # One texture copy per sprite, rotated by the renderer if it can be
+        atlas = self.atlas
+        for sprite, rect in visible:
+            source = getattr(sprite, 'rotation_source', None)
+            if source is None:
+                texture, area = atlas.get(sprite.image)
+                texture.draw(area, rect)
+            else:
+                image, angle = source
+                texture, area = atlas.get(image)
+                texture.draw(area, image.get_rect(center=rect.center), -angle)  # SDL turns clockwise
+
+    def present(self):
+        pass  # The UI layer goes on top in present_display()
+
+def set_display_mode(flags=0):
+    """Recreate the window and re-convert registered assets"""
+    global screen, VSYNC, RENDERER, texture_display
+    if RENDERER == 'texture':
+        try:
+            if texture_display is None:
+                texture_display = TextureDisplay(VSYNC)
+            texture_display.set_fullscreen(FULLSCREEN)
+            screen = texture_display.ui
+            return screen
+        except pygame.error as e:
+            if VSYNC:
+                logger.warning("vsync is not available here; frames will be paced in hybrid mode")
+                VSYNC = False
+                return set_display_mode(flags)
+            logger.warning("Texture renderer unavailable (%s); drawing with surfaces", e)
+            RENDERER = 'surface'
+    
+    # SCALED keeps a WIDTH x HEIGHT canvas that SDL stretches
+    if FULLSCREEN:
+        flags |= pygame.FULLSCREEN
+    try:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), flags | pygame.SCALED, vsync=int(VSYNC))
+    except pygame.error:
+        if VSYNC:
+            logger.warning("vsync is not available here; frames will be paced in hybrid mode")
+            VSYNC = False
+            return set_display_mode(flags)
+        # No renderer for SCALED: stay windowed
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), flags & ~pygame.FULLSCREEN)
+    if 'assets' in globals():  # The first mode is set before the registry exists
+        assets.reconvert()
+    return screen
 
 def toggle_fullscreen():
-    global FULLSCREEN, screen, WIDTH, HEIGHT
+    global FULLSCREEN
     FULLSCREEN = not FULLSCREEN
-    if FULLSCREEN:
-        # Store the current window size before going fullscreen
-        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        WIDTH, HEIGHT = screen.get_size()
+    set_display_mode()
+
+def present_display():
+    """Shows the finished frame"""
+    if texture_display:
+        texture_display.present()
     else:
-        # Return to windowed mode with original size
-        WIDTH, HEIGHT = 800, 600  # Original window size
-        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.flip()
+
+set_display_mode()
+pygame.display.set_caption("Space Asteroid Shooter")
+
+# Frame pacing
+class FramePacer:
+    """Ends each frame per --pacing and records frame intervals"""
+    SPIN_MS = 2.0  # Hybrid mode sleeps until this close to the deadline, then spins
+
+    def __init__(self, mode='hybrid', fps=60, history=600):
+        if mode == 'vsync' and not VSYNC:
+            mode = 'hybrid'  # set_display_mode couldn't get vsync
+        self.mode = mode
+        self.fps = fps
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self.clock = pygame.time.Clock()
+        self.deadline = None
+        self.last_frame = None
+        self.intervals = deque(maxlen=history)  # ms between successive tick() returns
+
+    def tick(self):
+        """Call once per frame, after the frame is presented"""
+        if self.mode == 'busy':
+            self.clock.tick_busy_loop(self.fps)
+        elif self.mode == 'hybrid' and self.period:
+            self.wait_hybrid()
+        # vsync: flip() already waited for the refresh; uncapped: no wait at all
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.intervals.append((now - self.last_frame) * 1000)
+        self.last_frame = now
+
+    def idle(self, seconds):
+        # In place of tick() for an idle frame, which isn't an interval
+        time.sleep(seconds)
+        self.deadline = None
+        self.last_frame = None
+
+    def wait_hybrid(self):
+        now = time.perf_counter()
+        if self.deadline is None or now - self.deadline > self.period:
+            self.deadline = now  # After a stall, don't race to catch up
+        self.deadline += self.period
+        remaining = self.deadline - now - self.SPIN_MS / 1000
+        if remaining > 0:
+            time.sleep(remaining)  # May oversleep by a millisecond or more
+        while time.perf_counter() < self.deadline:
+            pass  # Fine: spin out the last SPIN_MS
+
+    def stats(self):
+        if not self.intervals:
+            return None
+        intervals = numpy.array(self.intervals)
+        return {
+            'mode': self.mode,
+            'target_ms': self.period * 1000,
+            'mean_ms': float(intervals.mean()),
+            'jitter_ms': float(intervals.std()),  # Standard deviation of the frame interval
+            'p1_ms': float(numpy.percentile(intervals, 1)),
+            'p99_ms': float(numpy.percentile(intervals, 99)),
+            'late_frames': int((intervals > self.period * 1500).sum()) if self.period else 0,
+        }
 
+    def report(self):
+        stats = self.stats()
+        if stats:
+            target = f" at {self.fps} fps" if self.mode in ('busy', 'hybrid') else ""
+            logger.info("Frame pacing %s%s: interval mean %.2f ms, jitter %.2f ms, p1/p99 %.2f/%.2f ms, %d late",
+                        stats['mode'], target, stats['mean_ms'], stats['jitter_ms'],
+                        stats['p1_ms'], stats['p99_ms'], stats['late_frames'])
+        self.reset()
+
+    def reset(self):
+        self.intervals.clear()
+        self.last_frame = None
+
+# Offscreen world layer for render scaling
+class RenderView:
+    """Draws the world at reduced resolution and upscales it once per frame"""
+    def __init__(self, scale=1.0):
+        self.scale = min(1.0, max(0.25, scale))
+        self.surface = None
+        self.scaled_images = weakref.WeakKeyDictionary()  # Source image -> copy at render scale
+
+    def begin(self):
+        # The cleared surface to draw the world into
+        if self.scale == 1.0:
+            self.surface = screen
+        elif self.surface is None or self.surface is screen:
+            self.surface = pygame.Surface((int(WIDTH * self.scale), int(HEIGHT * self.scale))).convert()
+        self.surface.fill(BLACK)
+        return self.surface
+
+    def scaled(self, image):
+        scaled = self.scaled_images.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            scaled = pygame.transform.scale(image, (max(1, int(width * self.scale)),
+                                                    max(1, int(height * self.scale))))
+            self.scaled_images[image] = scaled
+        return scaled
+
+    def circle(self, color, center, radius):
+        pygame.draw.circle(self.surface, color, center, radius)
+
+    def soft_circle(self, color, center, radius):
+        # Translucent disc, blended through a temporary surface
+        if radius < 1:
+            return
+        disc = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(disc, color, (radius, radius), radius)
+        self.surface.blit(disc, (center[0] - radius, center[1] - radius))
+
+    def blit(self, image, position):
+        self.surface.blit(image, position)
+
+    def draw_sprites(self, visible):
+        # visible is (sprite, rect) pairs in draw order
+        if self.scale == 1.0:
+            self.surface.blits([(sprite.image, rect) for sprite, rect in visible], doreturn=False)
+            return
+        scale = self.scale
+        self.surface.blits([(self.scaled(sprite.image), (int(rect.x * scale), int(rect.y * scale)))
+                            for sprite, rect in visible], doreturn=False)
+
+    def present(self):
+        # Upscale once; HUD and overlays draw at full resolution after
+        if self.surface is not screen:
+            pygame.transform.scale(self.surface, screen.get_size(), screen)
+
+# Viewport culling
+class ViewportCuller:
+    """Skips drawing sprites and particles outside the viewport"""
+    MARGIN = 16  # Reach of a particle's glow and shadow
+
+    def __init__(self, margin=MARGIN):
+        self.viewport = pygame.Rect(0, 0, WIDTH, HEIGHT).inflate(margin * 2, margin * 2)
+        self.drawn = Counter()  # Kind -> items drawn since the last report
+        self.culled = Counter()
+
+    def sprites(self, group):
+        """(sprite, rect) for the group's sprites that overlap the viewport, in draw order"""
+        pairs = [(sprite, sprite.rect) for sprite in group]
+        visible = [pairs[i] for i in self.viewport.collidelistall([rect for _, rect in pairs])]
+        self.tally('sprites', len(visible), len(pairs))
+        return visible
+
+    def particles(self, particles):
+        """Particles whose centre lies within the viewport"""
+        viewport = self.viewport
+        left, top, right, bottom = viewport.left, viewport.top, viewport.right, viewport.bottom
+        visible = [p for p in particles if left <= p['x'] < right and top <= p['y'] < bottom]
+        self.tally('particles', len(visible), len(particles))
+        return visible
+
+    def visible(self, kind, rect):
+        # Single-item test for draw loops that don't go through a group
+        hit = self.viewport.colliderect(rect)
+        self.tally(kind, int(hit), 1)
+        return hit
+
+    def tally(self, kind, drawn, total):
+        self.drawn[kind] += drawn
+        self.culled[kind] += total - drawn
+
+    def counts(self):
+        return {kind: {'drawn': self.drawn[kind], 'culled': self.culled[kind]} for kind in self.drawn}
+
+    def report(self):
+        for kind, counts in sorted(self.counts().items()):
+            total = counts['drawn'] + counts['culled']
+            if total:
+                logger.info("Viewport culling %s: %d drawn, %d culled (%.1f%%)",
+                            kind, counts['drawn'], counts['culled'], 100 * counts['culled'] / total)
+        self.reset()
+
+    def reset(self):
+        self.drawn.clear()
+        self.culled.clear()
+
+viewport_culler = ViewportCuller()
+
+@memory_tracker.track
 class ParticleSystem:
-    def __init__(self):
+    def __init__(self, max_particles=2000):
+        self.particles = []
+        self.max_particles = max_particles  # One budget shared by every emitter
+
+    def clear(self):
         self.particles = []
 
     def add_particle(self, x, y, color, velocity_x, velocity_y, lifetime, size=2, fade=True, glow=False, z=1.0):
+        if len(self.particles) >= self.max_particles:
+            return
         particle = {
             'x': x,
             'y': y,
@@ -78,6 +1037,27 @@ class ParticleSystem:
         }
         self.particles.append(particle)
 
+    def add_particles(self, xs, ys, colors, velocities_x, velocities_y, lifetime, size=2, fade=True, glow=False, z=1.0):
+        # Batched spawn for emitters that produce many particles in one go
+        room = self.max_particles - len(self.particles)
+        if room <= 0:
+            return
+        self.particles.extend({
+            'x': float(x),
+            'y': float(y),
+            'z': z,
+            'color': color,
+            'velocity_x': float(velocity_x) * z,
+            'velocity_y': float(velocity_y) * z,
+            'lifetime': lifetime,
+            'max_lifetime': lifetime,
+            'size': size * z,
+            'fade': fade,
+            'glow': glow,
+            'alpha': 255
+        } for x, y, color, velocity_x, velocity_y in zip(xs[:room], ys[:room], colors[:room],
+                                                          velocities_x[:room], velocities_y[:room]))
+
     def update(self):
         # Update all particles in a single list comprehension for better performance
         self.particles = [p for p in self.particles if p['lifetime'] > 0]
@@ -91,16 +1071,13 @@ class ParticleSystem:
                 fade_ratio = p['lifetime'] / p['max_lifetime']
                 p['alpha'] = int(255 * fade_ratio)
 
-    def draw(self, surface):
-        # Sort particles by depth for proper rendering
-        sorted_particles = sorted(self.particles, key=lambda p: p['z'])
-        
-        # Create a surface for glowing particles
-        if any(p['glow'] for p in sorted_particles):
-            glow_surface = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    def draw(self, view):
+        # Sort the particles on screen by depth for proper rendering
+        scale = view.scale
+        sorted_particles = sorted(viewport_culler.particles(self.particles), key=lambda p: p['z'])
         
         for p in sorted_particles:
-            pos = (int(p['x']), int(p['y']))
+            pos = (int(p['x'] * scale), int(p['y'] * scale))
             
             # Calculate color with alpha
             color = list(p['color'])
@@ -111,26 +1088,19 @@ class ParticleSystem:
             
             # Draw particle shadow for depth effect
             if p['z'] > 0.5:  # Only draw shadows for closer particles
-                shadow_offset = int(4 * p['z'])
-                shadow_size = int(p['size'] * 1.5)
+                shadow_offset = int(4 * p['z'] * scale)
+                shadow_size = int(p['size'] * 1.5 * scale)
                 shadow_alpha = int(100 * p['z'])
-                shadow_surface = pygame.Surface((shadow_size * 2, shadow_size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(shadow_surface, (0, 0, 0, shadow_alpha), 
-                                 (shadow_size, shadow_size), shadow_size)
-                surface.blit(shadow_surface, 
-                           (pos[0] - shadow_size + shadow_offset, 
-                            pos[1] - shadow_size + shadow_offset))
+                view.soft_circle((0, 0, 0, shadow_alpha), (pos[0] + shadow_offset, pos[1] + shadow_offset), shadow_size)
             
             # Draw glowing effect
-            if p['glow']:
-                glow_size = int(p['size'] * 2)
+            if p['glow'] and ARGS.glow:
+                glow_size = int(p['size'] * 2 * scale)
                 glow_color = (*p['color'][:3], int(p['alpha'] * 0.5))
-                glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(glow_surface, glow_color, (glow_size, glow_size), glow_size)
-                surface.blit(glow_surface, (pos[0] - glow_size, pos[1] - glow_size))
+                view.soft_circle(glow_color, pos, glow_size)
             
             # Draw main particle
-            pygame.draw.circle(surface, color, pos, int(p['size']))
+            view.circle(color, pos, max(1, int(p['size'] * scale)))
 
 class StarField:
     def __init__(self, num_stars=100):
@@ -167,25 +1137,34 @@ class StarField:
             elif star['y'] > HEIGHT:
                 star['y'] = 0
     
-    def draw(self, surface):
+    @staticmethod
+    def glow_image(glow_size, alpha):
+        # A handful of sizes and alphas cover every star, so build each glow once
+        def draw():
+            glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surface, (255, 255, 255, alpha), (glow_size, glow_size), glow_size)
+            return glow_surface
+        return assets.get(('star_glow', glow_size, alpha), draw)
+
+    def draw(self, view):
         # Draw stars from back to front
+        scale = view.scale
         sorted_stars = sorted(self.stars, key=lambda x: x['z'])
         for star in sorted_stars:
+            x = star['x'] * scale
+            y = star['y'] * scale
             # Create a glowing effect for closer stars
-            if star['z'] > 0.7:  # Only closest stars glow
-                glow_size = int(star['size'] * 2)
-                glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
-                glow_color = (255, 255, 255, int(100 * star['z']))
-                pygame.draw.circle(glow_surface, glow_color, (glow_size, glow_size), glow_size)
-                surface.blit(glow_surface, (star['x'] - glow_size, star['y'] - glow_size))
+            if star['z'] > 0.7 and ARGS.glow:  # Only closest stars glow
+                glow_size = max(1, int(star['size'] * 2 * scale))
+                glow_surface = self.glow_image(glow_size, int(100 * star['z']))
+                view.blit(glow_surface, (x - glow_size, y - glow_size))
             
             # Draw the star
             color = (star['brightness'], star['brightness'], star['brightness'])
-            pygame.draw.circle(surface, color, (int(star['x']), int(star['y'])), star['size'])
+            view.circle(color, (int(x), int(y)), max(1, int(star['size'] * scale)))
 
-# Initialize particle system and star field globally
-particle_system = ParticleSystem()
-star_field = StarField(150)  # Increased number of stars for more depth
+# Initialize particle system globally
+particle_system = ParticleSystem(ARGS.particles)
 
 def create_space_dust(x, y, count=1):
     for _ in range(count):
@@ -268,27 +1247,27 @@ def create_explosion_particles(x, y, intensity=1.0):
             )
 
 # Test pygame mixer
-print("Testing pygame mixer...")
-try:
-    test_array = numpy.array([[32767, 32767], [0, 0], [-32767, -32767]], dtype=numpy.int16)
-    test_sound = pygame.sndarray.make_sound(test_array)
-    test_sound.play()
-    pygame.time.wait(100)
-    print("Basic sound test successful")
-except Exception as e:
-    print(f"Error in basic sound test: {e}")
+if ARGS.sound_test:
+    logger.info("Testing pygame mixer...")
+    try:
+        test_array = numpy.array([[32767, 32767], [0, 0], [-32767, -32767]], dtype=numpy.int16)
+        test_sound = pygame.sndarray.make_sound(test_array)
+        test_sound.play()
+        pygame.time.wait(100)
+        logger.info("Basic sound test successful")
+    except Exception as e:
+        logger.error("Error in basic sound test: %s", e)
 
 # Set up mixer settings
-pygame.mixer.set_num_channels(32)  # Increase number of sound channels
+pygame.mixer.set_num_channels(ARGS.channels)
 pygame.mixer.music.set_volume(0.5)  # Set default volume
 
-print("Pygame version:", pygame.version.ver)
-print("Mixer initialized:", pygame.mixer.get_init())
-print("Number of channels:", pygame.mixer.get_num_channels())
+logger.info("Pygame version: %s", pygame.version.ver)
+logger.info("Mixer initialized: %s", pygame.mixer.get_init())
+logger.info("Number of channels: %s", pygame.mixer.get_num_channels())
 
-def create_simple_sound(frequency, duration, volume=0.5, sound_type='sine'):
+def create_simple_sound(frequency, duration, volume=0.5, sound_type='sine', sample_rate=SAMPLE_RATE):
     """Create a more interesting sound wave"""
-    sample_rate = 44100
     num_samples = int(sample_rate * duration)
     sound_buffer = numpy.zeros((num_samples, 2), dtype=numpy.int16)
     max_sample = 2**(16 - 1) - 1
@@ -392,83 +1371,298 @@ def create_simple_sound(frequency, duration, volume=0.5, sound_type='sine'):
         else:  # Default sine wave
             sample = int(max_sample * volume * math.sin(2.0 * math.pi * frequency * t))
         
-        # Enhanced stereo effect with more separation
-        pan_amount = 0.2  # Increased stereo separation
-        left_sample = int(sample * (1.0 + pan_amount * math.sin(2.0 * math.pi * 2 * t)))
-        right_sample = int(sample * (1.0 + pan_amount * math.cos(2.0 * math.pi * 2 * t)))
-        sound_buffer[i] = [left_sample, right_sample]
+        # Same on both sides; SoundManager pans when played
+        sound_buffer[i] = [sample, sample]
     
     return pygame.sndarray.make_sound(sound_buffer)
 
+# On-disk cache of generated art and sounds, filled by --bake
+ASSET_CACHE_DIR = 'asset_cache'
+
+class AssetCache:
+    """Generator output by registry key, stale when parameters or source change"""
+    VERSION = 1
+    ART_VERSION = 1  # Bump to regenerate everything
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, directory=ASSET_CACHE_DIR):
+        self.directory = directory
+        self.entries = {}  # Entry name -> file, params, code hash and metadata
+        self.pending = {}  # Entry name -> (entry, surface or raw sound) not yet written
+        self.code_hashes = {}
+        self.hits = self.misses = 0
+        try:
+            with open(os.path.join(directory, self.MANIFEST), 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == self.VERSION:
+                self.entries = manifest.get('entries', {})
+        except (OSError, ValueError):
+            pass  # No cache yet, or an unreadable one: everything is regenerated
+
+    def code_hash(self, generator):
+        code_hash = self.code_hashes.get(generator)
+        if code_hash is None:
+            digest = hashlib.sha1(f"art version {self.ART_VERSION}\n".encode())
+            try:
+                for source in self.sources(generator):
+                    digest.update(source.encode())
+            except (OSError, TypeError):
+                return None  # Without source there's nothing to validate against
+            code_hash = self.code_hashes[generator] = digest.hexdigest()
+        return code_hash
+
+    @staticmethod
+    def plain(value):
+        # Values whose repr is stable from run to run
+        if isinstance(value, tuple):
+            return all(AssetCache.plain(item) for item in value)
+        return value is None or isinstance(value, (bool, int, float, str))
+
+    @classmethod
+    def sources(cls, generator):
+        """Source of the generator and the functions it calls, plus the constants they read"""
+        module = globals()
+        pending, seen = [generator], set()
+        while pending:
+            function = pending.pop()
+            function = getattr(function, '__func__', function)  # Bound, class and static methods
+            if function in seen:
+                continue
+            seen.add(function)
+            yield inspect.getsource(function)
+            
+            # Every name read by the function and the functions nested in it
+            names, codes = set(), [function.__code__]
+            while codes:
+                code = codes.pop()
+                names.update(code.co_names)
+                codes.extend(const for const in code.co_consts if inspect.iscode(const))
+            qualname = function.__qualname__
+            owner = module.get(qualname.split('.')[0]) if '.' in qualname and '<locals>' not in qualname else None
+            namespaces = [vars(owner), module] if inspect.isclass(owner) else [module]
+            for name in sorted(names):
+                namespace = next((namespace for namespace in namespaces if name in namespace), None)
+                if namespace is None:
+                    continue  # An attribute or builtin
+                value = namespace[name]
+                value = getattr(value, '__func__', value)
+                if inspect.isfunction(value) and value.__module__ == function.__module__:
+                    pending.append(value)
+                elif cls.plain(value):
+                    yield f"{name} = {value!r}\n"
+
+    def lookup(self, key, generator, args, extension):
+        """(name, entry, path); entry is None when missing or stale"""
+        name = '-'.join(str(part) for part in key)
+        entry = {'file': name + extension, 'params': list(args), 'code_hash': self.code_hash(generator)}
+        cached = self.entries.get(name)
+        path = os.path.join(self.directory, entry['file'])
+        if (entry['code_hash'] and cached and cached.get('params') == entry['params']
+                and cached.get('code_hash') == entry['code_hash'] and os.path.exists(path)):
+            return name, cached, path
+        return name, entry, None
+
+    def art(self, key, generator, *args):
+        """generator(*args) gives a surface or (surface, metadata); so does this"""
+        name, entry, path = self.lookup(key, generator, args, '.png')
+        if path:
+            try:
+                image = pygame.image.load(path)
+                self.hits += 1
+                return (image, entry['meta']) if 'meta' in entry else image
+            except pygame.error:
+                pass  # A damaged file is regenerated like a stale one
+        result = generator(*args)
+        image = result[0] if isinstance(result, tuple) else result
+        if isinstance(result, tuple):
+            entry['meta'] = result[1]
+        self.store(name, entry, image)
+        return result
+
+    def sound(self, key, generator, *args):
+        """generator(*args) gives a pygame Sound, cached as a WAV file"""
+        name, entry, path = self.lookup(key, generator, args, '.wav')
+        if path:
+            try:
+                sound = pygame.mixer.Sound(path)
+                self.hits += 1
+                return sound
+            except pygame.error:
+                pass
+        sound = generator(*args)
+        frequency, size, channels = pygame.mixer.get_init()
+        if size == -16:  # WAV files here are signed 16-bit, the mixer's default
+            self.store(name, entry, (sound.get_raw(), frequency, channels))
+        return sound
+
+    def store(self, name, entry, asset):
+        self.misses += 1
+        if entry['code_hash']:
+            self.pending[name] = (entry, asset)
+
+    def save(self):
+        """Write regenerated entries and the manifest"""
+        if not self.pending:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for name, (entry, asset) in self.pending.items():
+                path = os.path.join(self.directory, entry['file'])
+                if isinstance(asset, PLAIN_SURFACE):
+                    pygame.image.save(asset, path)
+                else:
+                    raw, frequency, channels = asset
+                    with wave.open(path, 'wb') as f:
+                        f.setnchannels(channels)
+                        f.setsampwidth(2)
+                        f.setframerate(frequency)
+                        f.writeframes(raw)
+                self.entries[name] = entry
+            manifest_path = os.path.join(self.directory, self.MANIFEST)
+            with open(manifest_path + '.tmp', 'w') as f:
+                json.dump({'version': self.VERSION, 'entries': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(manifest_path + '.tmp', manifest_path)
+        except (OSError, pygame.error) as e:
+            logger.error("Error writing asset cache: %s", e)
+        self.pending.clear()
+
+asset_cache = AssetCache()
+
 # Sound effects
 class SoundManager:
     _instance = None
+    # create_simple_sound parameters: frequency, duration, volume, type
+    SOUNDS = {
+        'laser': (2000, 0.2, 0.3, 'laser'),
+        'explosion': (60, 1.0, 0.8, 'explosion'),  # Longer, louder, deeper
+        'collision': (200, 0.4, 0.7, 'collision'),  # Longer, louder, deeper
+        'powerup': (600, 0.3, 0.4, 'powerup'),
+    }
+    # Reserved channels, voice cap and priority per effect
+    VOICES = {
+        'explosion': (4, 6, 3),
+        'collision': (3, 3, 2),
+        'powerup': (2, 2, 2),
+        'laser': (4, 4, 1),
+    }
+    MERGE_MS = 15  # Repeat triggers of one effect closer than this play once
+    FALLOFF = HEIGHT * 1.5  # Distance at which effects reach MIN_GAIN
+    MIN_GAIN = 0.4
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(SoundManager, cls).__new__(cls)
             try:
-                # Create sound effects with enhanced sounds
-                cls._instance.laser_sound = create_simple_sound(2000, 0.2, 0.3, 'laser')
-                cls._instance.explosion_sound = create_simple_sound(60, 1.0, 0.8, 'explosion')  # Longer, louder, deeper
-                cls._instance.collision_sound = create_simple_sound(200, 0.4, 0.7, 'collision')  # Longer, louder, deeper
-                cls._instance.powerup_sound = create_simple_sound(600, 0.3, 0.4, 'powerup')
+                # Create sound effects with enhanced sounds, or load them from the asset cache
+                for name, params in cls.SOUNDS.items():
+                    sound = asset_cache.sound(('sound', name, SAMPLE_RATE), create_simple_sound, *params, SAMPLE_RATE)
+                    setattr(cls._instance, name + '_sound', sound)
+                cls._instance.init_voices()
                 
                 cls._instance.enabled = True
-                print("Sound manager initialized successfully")
+                logger.info("Sound manager initialized successfully")
                 
                 # Test sound
-                cls._instance.explosion_sound.play()
-                pygame.time.wait(100)
-                print("Test sound played")
+                if ARGS.sound_test:
+                    cls._instance.explosion_sound.play()
+                    pygame.time.wait(100)
+                    logger.info("Test sound played")
             except Exception as e:
-                print(f"Warning: Could not initialize sound manager: {e}")
+                logger.warning("Could not initialize sound manager: %s", e)
                 cls._instance.enabled = False
         return cls._instance
     
-    def play_laser(self):
-        if self.enabled:
-            try:
-                self.laser_sound.stop()  # Stop any currently playing instance
-                self.laser_sound.play()
-                print("Playing laser sound")
-            except Exception as e:
-                print(f"Error playing laser sound: {e}")
+    def init_voices(self):
+        # Reserved, so Sound.play() never takes them
+        self.channels = {}
+        index = 0
+        for name, (reserved, cap, priority) in self.VOICES.items():
+            self.channels[name] = [pygame.mixer.Channel(index + i) for i in range(reserved)]
+            index += reserved
+        pygame.mixer.set_reserved(index)
+        self.voices = {}  # Channel -> (effect, start tick)
+        self.last_trigger = dict.fromkeys(self.VOICES, -self.MERGE_MS)
+        self.listener = (WIDTH // 2, HEIGHT)  # Follows the player
     
-    def play_explosion(self):
-        if self.enabled:
-            try:
-                self.explosion_sound.stop()
-                self.explosion_sound.play()
-                print("Playing explosion sound")
-            except Exception as e:
-                print(f"Error playing explosion sound: {e}")
+    def find_voice(self, name):
+        reserved, cap, priority = self.VOICES[name]
+        own = self.channels[name]
+        lower = [channel for other, (_, _, other_priority) in self.VOICES.items()
+                 if other_priority < priority for channel in self.channels[other]]
+        busy = {channel: voice for channel, voice in self.voices.items() if channel.get_busy()}
+        
+        # At its cap an effect restarts its own oldest voice
+        active = [channel for channel, (effect, started) in busy.items() if effect == name]
+        if len(active) >= cap:
+            return min(active, key=lambda channel: busy[channel][1])
+        
+        # A free reserved channel, else a free lower-priority one
+        for channel in own + lower:
+            if channel not in busy:
+                return channel
+        
+        # Else steal the oldest voice that doesn't outrank it
+        stealable = [channel for channel in own + lower if self.VOICES[busy[channel][0]][2] <= priority]
+        if stealable:
+            return min(stealable, key=lambda channel: busy[channel][1])
+        return None
     
-    def play_collision(self):
-        if self.enabled:
-            try:
-                self.collision_sound.stop()
-                self.collision_sound.play()
-                print("Playing collision sound")
-            except Exception as e:
-                print(f"Error playing collision sound: {e}")
+    def stereo_volume(self, position):
+        # Equal-power pan by screen x, quieter with distance from the listener
+        if position is None:
+            return 1.0, 1.0
+        x, y = position
+        pan = min(max(x / WIDTH, 0.0), 1.0) * math.pi / 2
+        distance = math.hypot(x - self.listener[0], y - self.listener[1])
+        gain = max(self.MIN_GAIN, 1.0 - distance / self.FALLOFF * (1.0 - self.MIN_GAIN))
+        return gain * math.cos(pan) * math.sqrt(2), gain * math.sin(pan) * math.sqrt(2)
     
-    def play_powerup(self):
-        if self.enabled:
-            try:
-                self.powerup_sound.stop()
-                self.powerup_sound.play()
-                print("Playing powerup sound")
-            except Exception as e:
-                print(f"Error playing powerup sound: {e}")
+    def play(self, name, position=None):
+        """Play an effect on a pooled voice, panned by position if given"""
+        if not self.enabled:
+            return None
+        now = pygame.time.get_ticks()
+        if now - self.last_trigger[name] < self.MERGE_MS:
+            event_counts[f"sound.{name}.merged"] += 1
+            return None
+        self.last_trigger[name] = now
+        
+        channel = self.find_voice(name)
+        if channel is None:
+            event_counts[f"sound.{name}.dropped"] += 1
+            return None  # Every voice is taken by higher-priority effects
+        try:
+            channel.play(getattr(self, name + '_sound'))
+            # play() resets the volume, so pan afterwards
+            left, right = self.stereo_volume(position)
+            channel.set_volume(min(left, 1.0), min(right, 1.0))
+        except Exception as e:
+            event_counts[f"sound.{name}.error"] += 1
+            logger.debug("Error playing %s sound: %s", name, e)
+            return None
+        event_counts[f"sound.{name}"] += 1
+        self.voices[channel] = (name, now)
+        return channel
+    
+    def play_laser(self, position=None):
+        return self.play('laser', position)
+    
+    def play_explosion(self, position=None):
+        return self.play('explosion', position)
+    
+    def play_collision(self, position=None):
+        return self.play('collision', position)
+    
+    def play_powerup(self, position=None):
+        return self.play('powerup', position)
 
 # Initialize sound manager as a global singleton
-pygame.mixer.set_num_channels(32)  # Increase number of sound channels
+pygame.mixer.set_num_channels(max(ARGS.channels, sum(reserved for reserved, _, _ in SoundManager.VOICES.values())))
 sound_manager = SoundManager()
 
 # Test all sounds with delays
 def test_sounds():
-    print("\nTesting sound system...")
+    logger.info("Testing sound system...")
     sound_manager.play_laser()
     pygame.time.wait(200)  # Wait between sounds
     sound_manager.play_explosion()
@@ -477,150 +1671,698 @@ def test_sounds():
     pygame.time.wait(200)
     sound_manager.play_powerup()
     pygame.time.wait(300)
-    print("Sound test complete\n")
+    logger.info("Sound test complete")
 
 # Run sound test
-test_sounds()
+if ARGS.sound_test:
+    test_sounds()
+
+# Generated images, converted to the display format, with their collision masks
+class AssetRegistry:
+    """Generated surfaces, built and converted once, re-converted on mode changes"""
+    def __init__(self):
+        self.images = {}
+        self.masks = {}
+
+    @staticmethod
+    def to_display_format(surface):
+        # Blits between matching pixel formats skip the per-pixel conversion
+        if pygame.display.get_surface() is None:
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def get(self, key, factory):
+        image = self.images.get(key)
+        if image is None:
+            image = self.register(key, factory())
+        return image
+
+    def register(self, key, surface):
+        image = self.images[key] = self.to_display_format(surface)
+        return image
+
+    def discard(self, key):
+        self.images.pop(key, None)
+        self.masks.pop(key, None)
+
+    def reconvert(self):
+        # A display mode change can change the pixel format; masks don't depend on it
+        for key, image in self.images.items():
+            self.images[key] = self.to_display_format(image)
+
+    def mask(self, key):
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(self.images[key])
+            self.masks[key] = mask
+        return mask
+
+assets = AssetRegistry()
+
+@functools.lru_cache(maxsize=64)
+def circle_mask(radius):
+    circle = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(circle, WHITE, (radius, radius), radius)
+    return pygame.mask.from_surface(circle)
+
+def collide_precise(left, right):
+    """Rect test, then collision circles or pixel masks"""
+    if not left.rect.colliderect(right.rect):
+        return False
+    if getattr(right, 'collision_radius', None):
+        left, right = right, left
+    radius = getattr(left, 'collision_radius', None)
+    if radius:
+        # The circle stays put while the texture rotates and scales around it
+        centerx, centery = left.rect.center
+        offset = (centerx - radius - right.rect.x, centery - radius - right.rect.y)
+        return right.mask.overlap(circle_mask(radius), offset) is not None
+    return pygame.sprite.collide_mask(left, right) is not None
+
+# Continuous collision: test a projectile's whole path each tick
+def motion(sprite):
+    """How far a sprite moved over the last tick"""
+    if isinstance(sprite, ArrayEntity):
+        if sprite.slot is None:
+            return 0.0, 0.0
+        return float(sprite.store.vx[sprite.slot]), float(sprite.store.vy[sprite.slot])
+    return getattr(sprite, 'velocity_x', 0), getattr(sprite, 'velocity_y', 0)
+
+def clip_segment(x0, y0, x1, y1, rect):
+    """Slab test: (enter, leave) fractions inside rect, or None"""
+    enter, leave = 0.0, 1.0
+    for start, delta, low, high in ((x0, x1 - x0, rect.left, rect.right), (y0, y1 - y0, rect.top, rect.bottom)):
+        if delta == 0:
+            if not low <= start <= high:
+                return None
+            continue
+        near, far = (low - start) / delta, (high - start) / delta
+        if near > far:
+            near, far = far, near
+        enter, leave = max(enter, near), min(leave, far)
+        if enter > leave:
+            return None
+    return enter, leave
+
+def sweep_hit(projectile, target):
+    """Fraction of the last tick at which projectile hits target, or None"""
+    store, slot = projectile.store, projectile.slot
+    # Path relative to the target, so the target stays still
+    target_dx, target_dy = motion(target)
+    return path_hit(float(store.last_x[slot]) + target_dx, float(store.last_y[slot]) + target_dy,
+                    float(store.x[slot]), float(store.y[slot]), projectile.mask, target)
+
+def path_hit(x0, y0, x1, y1, footprint, target):
+    """Fraction of the path at which footprint first touches target, or None"""
+    width, height = footprint.get_size()
+    rect = target.rect
+    clipped = clip_segment(x0, y0, x1, y1, rect.inflate(width, height))
+    if clipped is None:
+        return None
+    enter, leave = clipped
+    path_x, path_y = x1 - x0, y1 - y0
+    length = math.hypot(path_x, path_y)
+
+    def touches(t):
+        left = int(x0 + path_x * t) - width // 2
+        top = int(y0 + path_y * t) - height // 2
+        return shape.overlap(footprint, (left - origin_x, top - origin_y))
+
+    radius = getattr(target, 'collision_radius', None)
+    if radius:
+        # A circle is closest to the path at a single point: test the footprint there only
+        shape, origin_x, origin_y = circle_mask(radius), rect.centerx - radius, rect.centery - radius
+        from_x, from_y = x0 - rect.centerx, y0 - rect.centery
+        closest = -(from_x * path_x + from_y * path_y) / (length * length) if length else enter
+        hit = min(max(closest, enter), leave)
+        if not touches(hit):
+            return None
+        # No contact before the bounding circles meet
+        reach = radius + math.hypot(width, height) / 2 + 2
+        half_b = from_x * path_x + from_y * path_y
+        discriminant = half_b * half_b - length * length * (from_x * from_x + from_y * from_y - reach * reach)
+        clear = max((-half_b - math.sqrt(discriminant)) / (length * length), enter) if discriminant >= 0 else hit
+    else:
+        # Walk the path in steps no longer than the projectile
+        shape, origin_x, origin_y = target.mask, rect.x, rect.y
+        steps = int(length * (leave - enter) / max(1, min(width, height))) + 1
+        samples = [enter + (leave - enter) * step / steps for step in range(steps + 1)]
+        first = next((index for index, t in enumerate(samples) if touches(t)), None)
+        if first is None:
+            return None
+        hit, clear = samples[first], samples[max(0, first - 1)]
+
+    # Close in on the first contact to a quarter pixel
+    t, step = clear, 0.25 / length if length else 1
+    while t < hit:
+        if touches(t):
+            return t
+        t += step
+    return hit
+
+def collide_swept(left, right):
+    """spritecollide() callback: swept for projectiles, else precise"""
+    if getattr(left, 'SWEPT', False):
+        left, right = right, left
+    if getattr(right, 'SWEPT', False) and right.slot is not None:
+        return sweep_hit(right, left) is not None
+    return collide_precise(left, right)
+
+class CollisionIndex:
+    """Uniform grid of screen cells, bucketing sprites by rect"""
+    CELL = 128
+
+    def __init__(self, sprites=()):
+        self.cells = defaultdict(list)
+        for sprite in sprites:
+            self.insert(sprite, self.swept_rect(sprite))
+
+    @staticmethod
+    def swept_rect(sprite):
+        # The area covered over the last tick
+        rect = sprite.rect
+        dx, dy = motion(sprite)
+        return rect.union(rect.move(-dx, -dy))
+
+    def cell_range(self, rect):
+        cell = self.CELL
+        return (range(rect.left // cell, rect.right // cell + 1),
+                range(rect.top // cell, rect.bottom // cell + 1))
+
+    def insert(self, sprite, rect):
+        columns, rows = self.cell_range(rect)
+        for column in columns:
+            for row in rows:
+                self.cells[column, row].append((sprite, rect))
+
+    def query(self, rect):
+        # Sprites whose rect overlaps rect, each once, in insertion order
+        columns, rows = self.cell_range(rect)
+        found = {}
+        for column in columns:
+            for row in rows:
+                for sprite, sprite_rect in self.cells.get((column, row), ()):
+                    if sprite not in found and sprite_rect.colliderect(rect):
+                        found[sprite] = sprite_rect
+        return found
+
+def sweep_collide(targets, projectiles, dokill_targets, dokill_projectiles):
+    """groupcollide() for projectiles: first target along the path"""
+    index = CollisionIndex(targets)
+    hits = {}
+    for projectile in list(projectiles):
+        earliest, first = None, None
+        for target in index.query(CollisionIndex.swept_rect(projectile)):
+            t = sweep_hit(projectile, target)
+            if t is not None and (earliest is None or t < earliest):
+                earliest, first = t, target
+        if first is not None:
+            hits.setdefault(first, []).append(projectile)
+            if dokill_projectiles:
+                projectile.kill()
+    if dokill_targets:
+        for target in hits:
+            target.kill()
+    return hits
+
+# Array-backed component storage for moving objects
+class ComponentStore:
+    """Typed component arrays for one archetype, one slot per live entity"""
+    COMPONENTS = {
+        'x': numpy.float64,  # Centre position
+        'y': numpy.float64,
+        'vx': numpy.float64,
+        'vy': numpy.float64,
+        'angle': numpy.float64,
+        'spin': numpy.float64,
+        'lifetime': numpy.int32,  # Frames left, for archetypes that expire
+        'frame': numpy.int32,  # Image index (rotation step or animation frame)
+        'width': numpy.int32,  # Current image size
+        'height': numpy.int32,
+        'active': numpy.bool_,  # Slot is in a sprite group and should be simulated
+    }
+
+    def __init__(self, archetype, capacity=64):
+        self.archetype = archetype
+        self.capacity = capacity
+        self.components = dict(self.COMPONENTS, **archetype.EXTRA_COMPONENTS)
+        for name, dtype in self.components.items():
+            setattr(self, name, numpy.zeros(capacity, dtype))
+        self.entities = [None] * capacity
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.count = 0
+
+    def allocate(self, entity):
+        if not self.free_slots:
+            self.grow()
+        slot = self.free_slots.pop()
+        self.entities[slot] = entity
+        self.count += 1
+        return slot
+
+    def free(self, slot):
+        for name in self.components:
+            getattr(self, name)[slot] = 0
+        self.entities[slot] = None
+        self.free_slots.append(slot)
+        self.count -= 1
+
+    def grow(self):
+        old_capacity = self.capacity
+        self.capacity *= 2
+        for name in self.components:
+            array = getattr(self, name)
+            grown = numpy.zeros(self.capacity, array.dtype)
+            grown[:old_capacity] = array
+            setattr(self, name, grown)
+        self.entities.extend([None] * old_capacity)
+        self.free_slots.extend(range(self.capacity - 1, old_capacity - 1, -1))
+
+    # Rect edges derived from the centre and image size
+    def left(self):
+        return self.x - self.width / 2
+
+    def right(self):
+        return self.x + self.width / 2
+
+    def top(self):
+        return self.y - self.height / 2
+
+    def bottom(self):
+        return self.y + self.height / 2
 
-# Explosion class
-class Explosion(pygame.sprite.Sprite):
-    def __init__(self, center_x, center_y):
-        super().__init__()
-        self.radius = 250  # Explosion radius increased to 250
-        self.current_radius = 0
-        self.growth_rate = 25  # Increased to match larger radius
-        self.max_frames = 10
-        self.frame = 0
-        self.center_x = center_x
-        self.center_y = center_y
-        
-        # Create surface for explosion
-        self.image = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
-        self.rect = self.image.get_rect()
-        self.rect.center = (center_x, center_y)
-    
     def update(self):
-        self.frame += 1
-        if self.frame > self.max_frames:
-            self.kill()
+        archetype = self.archetype
+        active = self.active
+        if not self.count or not active.any():
             return
         
-        self.current_radius = int((self.frame / self.max_frames) * self.radius)
-        self.image.fill((0, 0, 0, 0))  # Clear with transparent
-        pygame.draw.circle(self.image, (*ORANGE, 128), (self.radius, self.radius), self.current_radius)
+        # Movement, keeping where swept archetypes started the tick
+        if archetype.SWEPT:
+            self.last_x[:] = self.x
+            self.last_y[:] = self.y
+        numpy.add(self.x, self.vx, out=self.x, where=active)
+        numpy.add(self.y, self.vy, out=self.y, where=active)
+        
+        # Rotation, swapping images only for entities that crossed a rotation step
+        if archetype.ROTATION_STEP:
+            numpy.add(self.angle, self.spin, out=self.angle, where=active)
+            numpy.mod(self.angle, 360, out=self.angle)
+            frames = (self.angle // archetype.ROTATION_STEP).astype(numpy.int32)
+            for slot in numpy.flatnonzero(active & (frames != self.frame)):
+                self.frame[slot] = frames[slot]
+                self.entities[slot].set_frame(frames[slot])
+        
+        # Lifetime expiry and animation
+        if archetype.EXPIRES:
+            numpy.subtract(self.lifetime, 1, out=self.lifetime, where=active)
+            numpy.add(self.frame, 1, out=self.frame, where=active)
+            for slot in numpy.flatnonzero(active & (self.lifetime < 0)):
+                self.entities[slot].kill()
+            for slot in numpy.flatnonzero(self.active):
+                self.entities[slot].set_frame(self.frame[slot])
+        
+        # Leaving the screen respawns or removes the entity
+        gone = numpy.flatnonzero(self.active & archetype.offscreen(self))
+        if len(gone):
+            if archetype.RESPAWNS:
+                archetype.respawn(self, gone)
+            else:
+                for slot in gone:
+                    self.entities[slot].kill()
+        
+        archetype.system(self)
 
-class Asteroid(pygame.sprite.Sprite):
-    def __init__(self, level=1):
+class EntityStore:
+    """Owns one ComponentStore per archetype and runs their batched systems"""
+    def __init__(self):
+        self.stores = {}
+
+    def register(self, archetype):
+        archetype.store = self.stores[archetype] = ComponentStore(archetype)
+        return archetype
+
+    def update(self):
+        for store in self.stores.values():
+            store.update()
+
+    def reset(self):
+        # Release every slot left over from a previous game
+        for store in self.stores.values():
+            for entity in store.entities:
+                if entity is not None:
+                    entity.kill()
+
+    def counts(self):
+        return {archetype.__name__: store.count for archetype, store in self.stores.items()}
+
+entities = EntityStore()
+entity_rng = numpy.random.default_rng()  # Vectorised randomness for batched systems
+
+class ArrayEntity(pygame.sprite.Sprite):
+    """Sprite view over one slot of its archetype's component arrays"""
+    store = None  # Set by EntityStore.register()
+    EXTRA_COMPONENTS = {}
+    ROTATION_STEP = None  # Degrees per rotation frame, for archetypes that spin
+    EXPIRES = False  # Lifetime counts down and animates the frame index
+    RESPAWNS = False  # Re-enter from the top instead of dying off-screen
+    SWEPT = False  # Collide along each tick's path (needs last_x/last_y)
+    SAVED = ()  # Attributes saved besides components and image key
+    TIMERS = ()  # game_clock.ticks() timestamps, saved as ages
+
+    def __init__(self):
         super().__init__()
-        self.level = level
-        
-        # Size based on level
-        base_size = random.randint(30, 60)
-        size_multiplier = 1 + (level - 1) * 0.2  # Increase size with level
-        self.size = int(base_size * size_multiplier)
+        self.slot = self.store.allocate(self)
+        self.slot_rect = pygame.Rect(0, 0, 0, 0)  # Updated in place on each read
+
+    @property
+    def image(self):
+        # Looked up by key so display-format re-conversion reaches live sprites
+        return assets.images[self.image_key]
+
+    def place(self, centerx, centery, velocity_x=0, velocity_y=0):
+        store = self.store
+        store.x[self.slot] = centerx
+        store.y[self.slot] = centery
+        store.vx[self.slot] = velocity_x
+        store.vy[self.slot] = velocity_y
+        store.width[self.slot], store.height[self.slot] = self.image.get_size()
+        if self.SWEPT:
+            store.last_x[self.slot] = centerx
+            store.last_y[self.slot] = centery
+
+    @property
+    def rect(self):
+        # After kill() this keeps the last position, e.g. to spawn a power-up there
+        if self.slot is not None:
+            self.refresh_rect()
+        return self.slot_rect
+
+    def refresh_rect(self):
+        store, slot = self.store, self.slot
+        width, height = int(store.width[slot]), int(store.height[slot])
+        self.slot_rect.update(int(store.x[slot]) - width // 2, int(store.y[slot]) - height // 2, width, height)
+
+    def set_frame(self, frame):
+        pass
+
+    @classmethod
+    def restore(cls, image_key, attributes, components):
+        """Rebuild a saved entity without redrawing its art"""
+        entity = cls.__new__(cls)
+        entity.__dict__.update(attributes)
+        ArrayEntity.__init__(entity)
+        store = entity.store
+        for name, value in components.items():
+            getattr(store, name)[entity.slot] = value
+        entity.restored(image_key)
+        return entity
+
+    def restored(self, image_key):
+        self.image_key = image_key
+        assets.get(image_key, lambda: build_art(image_key))
+        self.mask = assets.mask(image_key)
+
+    def add_internal(self, group):
+        super().add_internal(group)
+        if self.slot is not None:
+            self.store.active[self.slot] = True  # Simulate once it joins the game
+
+    def remove_internal(self, group):
+        super().remove_internal(group)
+        if not self.alive() and self.slot is not None:
+            self.release()
+
+    def kill(self):
+        super().kill()
+        if self.slot is not None:
+            self.release()  # Built but never added to a group
+
+    def release(self):
+        self.refresh_rect()
+        self.store.free(self.slot)
+        self.slot = None
+
+    @classmethod
+    def offscreen(cls, store):
+        # Shared exit band for things that drift down the screen
+        return (store.top() > HEIGHT + 10) | (store.left() < -25) | (store.right() > WIDTH + 25)
+
+    @classmethod
+    def respawn(cls, store, slots):
+        pass
+
+    @classmethod
+    def system(cls, store):
+        pass
+
+# Explosion class
+@entities.register
+@memory_tracker.track
+class Explosion(ArrayEntity):
+    EXPIRES = True
+    SAVED = ('radius', 'max_frames')
+
+    def __init__(self, center_x, center_y, radius=250, max_frames=10):
+        self.radius = max(1, int(radius * ARGS.explosion_scale))  # Final radius of the blast
+        self.max_frames = max_frames
+        self.image_key = self.frame_image(self.radius, max_frames, 0)
+        super().__init__()
+        self.store.lifetime[self.slot] = max_frames
+        self.place(center_x, center_y)
+
+    @staticmethod
+    def frame_image(radius, max_frames, frame):
+        # Frames are shared between explosions of the same size
+        current_radius = int((frame / max_frames) * radius)
+        key = ('explosion', radius, current_radius)
+        assets.get(key, lambda: Explosion.create_image(current_radius))
+        return key
+
+    @staticmethod
+    def create_image(current_radius):
+        image = pygame.Surface((max(1, current_radius * 2), max(1, current_radius * 2)), pygame.SRCALPHA)
+        pygame.draw.circle(image, (*ORANGE, 128), (current_radius, current_radius), current_radius)
+        return image
+
+    def set_frame(self, frame):
+        self.image_key = self.frame_image(self.radius, self.max_frames, frame)
+        self.store.width[self.slot], self.store.height[self.slot] = self.image.get_size()
+
+    def restored(self, image_key):
+        self.image_key = self.frame_image(self.radius, self.max_frames, self.store.frame[self.slot])
+
+@memory_tracker.track
+class AsteroidTemplate:
+    """Shared asteroid artwork, drawn at most RASTER_LIMIT and scaled up"""
+    ROTATION_STEP = 3  # Degrees between rotation frames
+    BASE_SIZES = (30, 40, 50, 60)
+    GROWTH_LIMIT = 3.0  # Size multiplier cap, reached at level 11
+    RASTER_LIMIT = 96  # Largest radius drawn; bigger asteroids scale this art up
+    COLLISION_SCALE = 0.9  # Collision radius within the jagged outline
+    VARIANTS = 3  # Distinct shapes per size
+    LIMIT = 48  # Templates kept before the least recently used are dropped
+    cache = {}
+
+    @classmethod
+    def sizes(cls, level):
+        growth = min(1 + (level - 1) * 0.2, cls.GROWTH_LIMIT)  # Increase size with level, up to the cap
+        return [int(base * growth) for base in cls.BASE_SIZES]
+
+    @classmethod
+    def art_key(cls, size, variant):
+        return ('asteroid', min(size, cls.RASTER_LIMIT), variant)
+
+    @classmethod
+    def get(cls, level):
+        size = random.choice(cls.sizes(level))
+        return cls.lookup(('asteroid', size, random.randrange(cls.VARIANTS)))
+
+    @classmethod
+    def lookup(cls, key):
+        template = cls.cache.pop(key, None)
+        if template is None:
+            while len(cls.cache) >= cls.LIMIT and cls.evict():
+                pass
+            template = cls(key)
+        cls.cache[key] = template  # Most recently used last
+        return template
+
+    @classmethod
+    def evict(cls):
+        # Drop the least recently used template not in use; if all are, allow going over LIMIT
+        in_use = {entity.template.key for entity in Asteroid.store.entities if entity is not None}
+        key = next((key for key in cls.cache if key not in in_use), None)
+        if key is None:
+            return False
+        evicted = cls.cache.pop(key)
+        assets.discard(evicted.key)
+        if all(other.image_key != evicted.image_key for other in cls.cache.values()):
+            assets.discard(evicted.image_key)  # Sizes above the raster limit share art
+        return True
+
+    def __init__(self, key):
+        self.key = key
+        self.size = key[1]
+        self.image_key = self.art_key(*key[1:])
+        image, meta = asset_cache.art(self.image_key, self.create_image, *self.image_key[1:])
+        self.color = tuple(meta['color'])
+        assets.register(self.image_key, image)
+        if self.image_key != self.key:
+            # One smooth upscale per size, then fast rotation frames
+            assets.register(self.key, pygame.transform.smoothscale(image, (self.size * 2, self.size * 2)))
+        self.collision_radius = max(1, int(self.size * self.COLLISION_SCALE))
+
+    @staticmethod
+    def create_image(size, variant):
+        # Seeded per size and variant, so baked art matches
+        rng = random.Random(f"asteroid-{size}-{variant}")
         
         # Create surface with alpha for smooth edges
-        self.original_image = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-        self.image = self.original_image
-        self.rect = self.image.get_rect()
-        
-        # Random starting position
-        self.rect.x = random.randint(0, WIDTH - self.rect.width)
-        self.rect.y = -self.rect.height
+        image = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
         
         # Generate polygon points for irregular shape
-        num_points = random.randint(12, 16)
+        num_points = rng.randint(12, 16)
         angles = [i * (2 * math.pi / num_points) for i in range(num_points)]
-        self.points = []
+        points = []
         for angle in angles:
             # Add some noise to radius for irregularity
-            radius = self.size * (0.8 + random.random() * 0.4)
-            x = self.size + math.cos(angle) * radius
-            y = self.size + math.sin(angle) * radius
-            self.points.append((x, y))
+            radius = size * (0.8 + rng.random() * 0.4)
+            x = size + math.cos(angle) * radius
+            y = size + math.sin(angle) * radius
+            points.append((x, y))
         
         # Base color varies slightly with random grey tone
-        base_grey = random.randint(-20, 20)  # Random variation
-        self.color = (
+        base_grey = rng.randint(-20, 20)  # Random variation
+        color = (
             min(255, max(0, MEDIUM_GREY[0] + base_grey)),
             min(255, max(0, MEDIUM_GREY[1] + base_grey)),
             min(255, max(0, MEDIUM_GREY[2] + base_grey))
         )
         
         # Draw the asteroid
-        pygame.draw.polygon(self.original_image, self.color, self.points)
+        pygame.draw.polygon(image, color, points)
         
         # Add craters
-        num_craters = random.randint(3, 7)
+        num_craters = rng.randint(3, 7)
         for _ in range(num_craters):
-            crater_x = random.randint(self.size // 2, int(self.size * 1.5))
-            crater_y = random.randint(self.size // 2, int(self.size * 1.5))
-            crater_radius = random.randint(3, 8)
-            pygame.draw.circle(self.original_image, CRATER_GREY, (crater_x, crater_y), crater_radius)
+            crater_x = rng.randint(size // 2, int(size * 1.5))
+            crater_y = rng.randint(size // 2, int(size * 1.5))
+            crater_radius = rng.randint(3, 8)
+            pygame.draw.circle(image, CRATER_GREY, (crater_x, crater_y), crater_radius)
         
         # Add highlights for 3D effect
-        for point in self.points:
-            pygame.draw.circle(self.original_image, LIGHT_GREY, (int(point[0]), int(point[1])), 2)
-        
-        # Physics attributes
-        self.velocity_x = random.uniform(-2, 2)
-        self.velocity_y = random.uniform(2, 4) + level * 0.5
-        self.angle = random.uniform(0, 360)
-        self.rotation_speed = random.uniform(-3, 3)
+        for point in points:
+            pygame.draw.circle(image, LIGHT_GREY, (int(point[0]), int(point[1])), 2)
         
-        # Debris system
-        self.debris = []
-        self.last_debris = 0
-        self.debris_interval = 100  # Milliseconds between debris spawns
+        return image, {'color': color}
+
+    @property
+    def original_image(self):
+        return assets.images[self.key]
+
+    def rotated(self, step):
+        if not step:
+            return self.original_image
+        return pygame.transform.rotate(self.original_image, step * self.ROTATION_STEP)
+
+    def rotated_size(self, step):
+        # The size pygame.transform.rotate would give
+        width, height = self.original_image.get_size()
+        angle = step * self.ROTATION_STEP
+        if angle % 90 == 0:
+            return (width, height) if angle % 180 == 0 else (height, width)
+        radians = angle * .01745329251994329
+        sine, cosine = math.sin(radians), math.cos(radians)
+        return (int(abs(cosine * width) + abs(sine * height)),
+                int(abs(sine * width) + abs(cosine * height)))
+
+@entities.register
+@memory_tracker.track
+class Asteroid(ArrayEntity):
+    ROTATION_STEP = AsteroidTemplate.ROTATION_STEP
+    RESPAWNS = True
+    EXTRA_COMPONENTS = {'level': numpy.int32, 'debris_timer': numpy.int32}
+    SAVED = ('level',)
+    debris_interval = 100  # Frames between debris spawns
+
+    def __init__(self, level=1):
+        self.level = level
         
-    def update(self):
-        # Update position with velocity
-        self.rect.y += self.velocity_y
-        self.rect.x += self.velocity_x
+        # Shape, size and colour come from a shared template
+        self.template = AsteroidTemplate.get(level)
+        self.size = self.template.size
+        self.color = self.template.color
+        self.step = 0  # Rotation step
+        self.frame_image = None
+        self.collision_radius = self.template.collision_radius  # Collisions test this, not the texture
+        super().__init__()
         
-        # Rotate asteroid
-        self.angle = (self.angle + self.rotation_speed) % 360
-        self.image = pygame.transform.rotate(self.original_image, self.angle)
-        old_center = self.rect.center
-        self.rect = self.image.get_rect()
-        self.rect.center = old_center
-        
-        # Add occasional debris
-        self.last_debris += 1
-        if self.last_debris >= self.debris_interval:  # Every 100 frames
-            self.last_debris = 0
-            if random.random() < 0.3:  # 30% chance
-                self.debris.append({
-                    'x': self.rect.centerx,
-                    'y': self.rect.centery,
-                    'velocity_x': random.uniform(-1, 1),
-                    'velocity_y': random.uniform(-1, 1),
-                    'lifetime': 30,  # Frames the debris will exist
-                    'color': self.color
-                })
-        
-        # Update existing debris
-        for debris in self.debris[:]:  # Copy list to safely remove items
-            debris['x'] += debris['velocity_x']
-            debris['y'] += debris['velocity_y']
-            debris['lifetime'] -= 1
-            if debris['lifetime'] <= 0:
-                self.debris.remove(debris)
-        
-        # If asteroid goes off screen, respawn it
-        if (self.rect.top > HEIGHT + 10 or 
-            self.rect.left < -25 or 
-            self.rect.right > WIDTH + 25):
-            self.rect.x = random.randrange(WIDTH - self.rect.width)
-            self.rect.y = random.randrange(-100, -40)
-            self.velocity_y = random.uniform(2, 4) + self.level * 0.5
-            self.velocity_x = random.uniform(-2, 2)
-    
-    def draw_debris(self, surface):
-        for debris in self.debris:
-            alpha = min(255, debris['lifetime'] * 8)  # Fade out as lifetime decreases
-            color = debris['color'] + (alpha,)  # Add alpha value
-            pygame.draw.circle(surface, color, (int(debris['x']), int(debris['y'])), 1)
+        # Random starting position just above the screen, with physics attributes
+        width, height = self.image.get_size()
+        self.place(random.randint(0, WIDTH - width) + width / 2, -height / 2,
+                   random.uniform(-2, 2), random.uniform(2, 4) + level * 0.5)
+        store = self.store
+        store.angle[self.slot] = random.uniform(0, 360)
+        store.spin[self.slot] = random.uniform(-3, 3)
+        store.level[self.slot] = level
+
+    def set_frame(self, frame):
+        # Rotated only for surface views; the renderer rotates itself
+        self.step = frame
+        self.frame_image = None
+        self.store.width[self.slot], self.store.height[self.slot] = self.template.rotated_size(frame)
+
+    @property
+    def image(self):
+        if self.frame_image is None:
+            self.frame_image = self.template.rotated(self.step)
+        return self.frame_image
+
+    @property
+    def rotation_source(self):
+        # Unrotated art and angle, for views that rotate while drawing
+        return self.template.original_image, self.step * self.ROTATION_STEP
+
+    @property
+    def image_key(self):
+        return self.template.key  # The unrotated art, as with rotation_source
+
+    def restored(self, image_key):
+        self.template = AsteroidTemplate.lookup(image_key)
+        self.size = self.template.size
+        self.color = self.template.color
+        self.collision_radius = self.template.collision_radius
+        self.step = int(self.store.frame[self.slot])
+        self.frame_image = None
+
+    @classmethod
+    def respawn(cls, store, slots):
+        count = len(slots)
+        width = store.width[slots]
+        store.x[slots] = entity_rng.integers(0, numpy.maximum(WIDTH - width, 1)) + width / 2
+        store.y[slots] = entity_rng.integers(-100, -40, count) + store.height[slots] / 2
+        store.vy[slots] = entity_rng.uniform(2, 4, count) + store.level[slots] * 0.5
+        store.vx[slots] = entity_rng.uniform(-2, 2, count)
+
+    @classmethod
+    def system(cls, store):
+        # Occasional debris, emitted into the shared particle system in one batch
+        numpy.add(store.debris_timer, 1, out=store.debris_timer, where=store.active)
+        due = numpy.flatnonzero(store.debris_timer >= cls.debris_interval)
+        if not len(due):
+            return
+        store.debris_timer[due] = 0
+        shed = due[entity_rng.random(len(due)) < 0.3]  # 30% chance
+        if len(shed):
+            count = len(shed)
+            # Half depth keeps debris on the asteroid's plane: 1 px, no shadow
+            particle_system.add_particles(
+                store.x[shed], store.y[shed], [store.entities[slot].color for slot in shed],
+                entity_rng.uniform(-2, 2, count), entity_rng.uniform(-2, 2, count),
+                30, size=2, z=0.5)
 
 class EnemyShip(pygame.sprite.Sprite):
     def __init__(self, level=1):
@@ -651,17 +2393,25 @@ class EnemyShip(pygame.sprite.Sprite):
         if self.z >= 1.0:
             self.kill()
 
-class PowerUp(pygame.sprite.Sprite):
+@entities.register
+@memory_tracker.track
+class PowerUp(ArrayEntity):
     # Power-up types
     RAPID_FIRE = "rapid_fire"
     DOUBLE_SHOT = "double_shot"
     TRIPLE_SHOT = "triple_shot"
     SUPER_RAPID_FIRE = "super_rapid_fire"
     RAPID_MOVEMENT = "rapid_movement"
+    COLORS = {
+        RAPID_FIRE: YELLOW,
+        DOUBLE_SHOT: PURPLE,
+        TRIPLE_SHOT: RED,
+        SUPER_RAPID_FIRE: ORANGE,
+        RAPID_MOVEMENT: LIGHT_BLUE,
+    }
+    SAVED = ('type',)
     
     def __init__(self, x, y):
-        pygame.sprite.Sprite.__init__(self)
-        
         # Select power-up type with weighted probabilities
         self.type = random.choice([
             self.RAPID_FIRE,
@@ -671,58 +2421,52 @@ class PowerUp(pygame.sprite.Sprite):
             self.RAPID_MOVEMENT
         ])
         
+        self.image_key = ('power_up', self.type)
+        assets.get(self.image_key, lambda: asset_cache.art(self.image_key, self.create_image, self.type))
+        self.mask = assets.mask(self.image_key)
+        super().__init__()
+        
+        # Movement attributes
+        self.place(x, y, random.randrange(-2, 2), random.randrange(2, 5))
+
+    @classmethod
+    def create_image(cls, power_up_type):
         size = 30
-        self.image = pygame.Surface((size, size), pygame.SRCALPHA)
+        image = pygame.Surface((size, size), pygame.SRCALPHA)
         
         # Draw power-up based on type
-        if self.type == self.RAPID_FIRE:
+        if power_up_type == cls.RAPID_FIRE:
             color = YELLOW
             # Draw lightning bolt
             points = [(size//2, 0), (size, size//2), (size*2//3, size*3//5), (size, size), 
                      (0, size*3//5), (size//3, size*2//5)]
-            pygame.draw.polygon(self.image, color, points)
-        elif self.type == self.DOUBLE_SHOT:
+            pygame.draw.polygon(image, color, points)
+        elif power_up_type == cls.DOUBLE_SHOT:
             color = PURPLE
             # Draw double circle
-            pygame.draw.circle(self.image, color, (size//4, size//2), size//4)
-            pygame.draw.circle(self.image, color, (size*3//4, size//2), size//4)
-        elif self.type == self.TRIPLE_SHOT:
+            pygame.draw.circle(image, color, (size//4, size//2), size//4)
+            pygame.draw.circle(image, color, (size*3//4, size//2), size//4)
+        elif power_up_type == cls.TRIPLE_SHOT:
             color = RED
             # Draw triple circle
-            pygame.draw.circle(self.image, color, (size//5, size//2), size//5)
-            pygame.draw.circle(self.image, color, (size//2, size//4), size//5)
-            pygame.draw.circle(self.image, color, (size*4//5, size//2), size//5)
-        elif self.type == self.SUPER_RAPID_FIRE:
+            pygame.draw.circle(image, color, (size//5, size//2), size//5)
+            pygame.draw.circle(image, color, (size//2, size//4), size//5)
+            pygame.draw.circle(image, color, (size*4//5, size//2), size//5)
+        elif power_up_type == cls.SUPER_RAPID_FIRE:
             color = ORANGE
             # Draw double lightning bolt
             points1 = [(size//4, 0), (size//2, size//2), (size//3, size*3//5), 
                       (size//2, size), (0, size*3//5), (size//6, size//2)]
             points2 = [(size*3//4, 0), (size, size//2), (size*5//6, size*3//5), 
                       (size, size), (size//2, size*3//5), (size*2//3, size//2)]
-            pygame.draw.polygon(self.image, color, points1)
-            pygame.draw.polygon(self.image, color, points2)
+            pygame.draw.polygon(image, color, points1)
+            pygame.draw.polygon(image, color, points2)
         else:  # RAPID_MOVEMENT
             color = LIGHT_BLUE
             # Draw speed arrows
-            pygame.draw.polygon(self.image, color, [(0, size//2), (size//2, size//4), (size//2, size*3//4)])
-            pygame.draw.polygon(self.image, color, [(size//2, size//2), (size, size//4), (size, size*3//4)])
-        
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.centery = y
-        
-        # Movement attributes
-        self.speedy = random.randrange(2, 5)
-        self.speedx = random.randrange(-2, 2)
-
-    def update(self):
-        # Move the power-up
-        self.rect.y += self.speedy
-        self.rect.x += self.speedx
-        
-        # Remove if it goes off screen
-        if self.rect.top > HEIGHT + 10 or self.rect.left < -25 or self.rect.right > WIDTH + 25:
-            self.kill()
+            pygame.draw.polygon(image, color, [(0, size//2), (size//2, size//4), (size//2, size*3//4)])
+            pygame.draw.polygon(image, color, [(size//2, size//2), (size, size//4), (size, size*3//4)])
+        return image
 
 class StrayBomb(pygame.sprite.Sprite):
     def __init__(self, x, y):
@@ -748,16 +2492,163 @@ class StrayBomb(pygame.sprite.Sprite):
         self.z = random.uniform(0.1, 0.3)
         self.z_speed = 0.005
 
-    def update(self):
-        self.update_perspective()
-        if self.z >= 1.0:
-            self.kill()
+    def update(self):
+        self.update_perspective()
+        if self.z >= 1.0:
+            self.kill()
+
+# Input sampling: events and held keys, read once per tick
+class InputSampler:
+    """Per-tick input snapshot and key press to flip latency"""
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, history=1000):
+        self.events = []
+        self.keys = pygame.key.get_pressed()
+        self.held = None  # Keys held by the autopilot, read in place of the keyboard
+        self.last_sample = time.perf_counter()
+        self.pending = []  # (arrival, earliest arrival) of presses not yet shown
+        self.latency = deque(maxlen=history)  # ms from arrival to flip
+        self.latency_bound = deque(maxlen=history)  # ms from the previous sample to flip
+
+    def sample(self):
+        now = time.perf_counter()
+        self.events = pygame.event.get()
+        self.keys = self.held if self.held is not None else pygame.key.get_pressed()
+        ticks = pygame.time.get_ticks()
+        for event in self.events:
+            if event.type == pygame.KEYDOWN:
+                # Event timestamp in get_ticks() ms if pygame passes it, else now
+                stamp = getattr(event, 'timestamp', None)
+                arrival = now - (ticks - stamp) / 1000 if stamp is not None else now
+                self.pending.append((arrival, self.last_sample))
+        self.last_sample = now
+        return self.events
+
+    def presented(self):
+        # This tick's key presses are now on screen
+        if not self.pending:
+            return
+        now = time.perf_counter()
+        for arrival, earliest in self.pending:
+            self.latency.append((now - arrival) * 1000)
+            self.latency_bound.append((now - earliest) * 1000)
+        self.pending.clear()
+
+    def skip(self):
+        # Presses seen on an idle frame aren't latency samples
+        self.pending.clear()
+
+    def percentiles(self):
+        """(measured, upper bound) latency percentiles in ms, or None before any key press"""
+        if not self.latency:
+            return None
+        return (numpy.percentile(self.latency, self.PERCENTILES),
+                numpy.percentile(self.latency_bound, self.PERCENTILES))
+
+    def report(self):
+        percentiles = self.percentiles()
+        if percentiles:
+            measured, bound = percentiles
+            labels = "/".join(f"p{p}" for p in self.PERCENTILES)
+            logger.info("Input-to-flip latency %s over %d presses: %s ms (upper bound incl. queue wait %s ms)",
+                        labels, len(self.latency), "/".join(f"{ms:.1f}" for ms in measured),
+                        "/".join(f"{ms:.1f}" for ms in bound))
+        self.reset()
+
+    def reset(self):
+        self.pending.clear()
+        self.latency.clear()
+        self.latency_bound.clear()
+
+input_sampler = InputSampler()
+
+# Simulation time
+class GameClock:
+    """Game time in ms, TICK_MS per simulation step, with pause, scaling and timers"""
+    TICK_MS = 1000 / 60  # The step speeds are tuned for
+    SCALES = (0.25, 0.5, 1.0, 2.0, 4.0)  # Slow motion to fast-forward
+    PAUSED_SLEEP = 0.05  # Seconds per frame while paused
+
+    class Timer:
+        """A scheduled callback; cancel() drops it when it comes due"""
+        __slots__ = ('callback', 'args', 'cancelled')
+
+        def __init__(self, callback, args):
+            self.callback = callback
+            self.args = args
+            self.cancelled = False
+
+        def cancel(self):
+            self.cancelled = True
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # Each game starts at zero, running at normal speed, with nothing scheduled
+        self.now = 0.0
+        self.scale = 1.0
+        self.paused = False
+        self.owed = 0.0  # Fraction of a step carried over to the next frame
+        self.timers = []  # Heap of (due, sequence, Timer)
+        self.sequence = 0
+
+    def ticks(self):
+        """Game time in whole ms, in place of pygame.time.get_ticks()"""
+        return int(self.now)
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def change_scale(self, direction):
+        # One notch slower (-1) or faster (+1) through SCALES
+        index = self.SCALES.index(self.scale) + direction
+        self.scale = self.SCALES[min(max(index, 0), len(self.SCALES) - 1)]
+
+    def steps(self):
+        """Simulation steps to run this frame"""
+        if self.paused:
+            return 0
+        self.owed += self.scale
+        steps = int(self.owed)
+        self.owed -= steps
+        return steps
+
+    def advance(self):
+        """Move on one step and run the timers that have come due, earliest first"""
+        self.now += self.TICK_MS
+        timers = self.timers
+        while timers and timers[0][0] <= self.now:
+            timer = heapq.heappop(timers)[2]
+            if not timer.cancelled:
+                timer.callback(*timer.args)
+
+    def schedule_at(self, due, callback, *args):
+        """Run callback(*args) on the first step at or after game time due"""
+        timer = self.Timer(callback, args)
+        self.sequence += 1
+        heapq.heappush(self.timers, (due, self.sequence, timer))
+        return timer
+
+    def schedule(self, delay, callback, *args):
+        return self.schedule_at(self.now + delay, callback, *args)
+
+game_clock = GameClock()
 
 # Ship class
+@memory_tracker.track
 class Ship(pygame.sprite.Sprite):
-    def __init__(self, image, speed, player_name=""):
+    # Saved state as (attribute, struct code)
+    SAVED_FIELDS = (('velocity_x', 'd'), ('velocity_y', 'd'), ('rotation', 'd'), ('speed', 'd'),
+                    ('base_speed', 'd'), ('shoot_delay', 'i'), ('base_shoot_delay', 'i'),
+                    ('power_up_duration', 'i'), ('shield_time', 'd'), ('is_invincible', '?'), ('extra_health', 'i'))
+    TIMERS = ('last_shot', 'power_up_start', 'shield_start')  # game_clock.ticks() timestamps, saved as ages
+
+    def __init__(self, image_key, speed, player_name=""):
         super().__init__()
-        self.image = image
+        self.image_key = image_key  # Ship art lives in the asset registry
+        self.mask = assets.mask(image_key)  # Built once per ship
         self.rect = self.image.get_rect()
         self.rect.centerx = WIDTH // 2
         self.rect.bottom = HEIGHT - 100
@@ -775,7 +2666,7 @@ class Ship(pygame.sprite.Sprite):
         self.base_shoot_delay = int(250 / fire_rate_boost)
         self.shoot_delay = self.base_shoot_delay
         
-        self.last_shot = pygame.time.get_ticks()
+        self.last_shot = game_clock.ticks()
         
         # Apply extra health from shop
         self.extra_health = next((item.effect_value for item in SHOP_ITEMS 
@@ -786,7 +2677,7 @@ class Ship(pygame.sprite.Sprite):
                                if item.effect_type == "shield_time" and item.purchased), 0)
         if self.shield_time > 0:
             self.is_invincible = True
-            self.shield_start = pygame.time.get_ticks()
+            self.shield_start = game_clock.ticks()
         else:
             self.is_invincible = player_name == "12345"  # Set initial invincibility
         
@@ -815,19 +2706,36 @@ class Ship(pygame.sprite.Sprite):
         
         # Add deceleration when no keys are pressed
         self.deceleration = 0.92  # New attribute for quick stopping
+        
+        self.timers = []
+        self.schedule_timers()
     
-    def update(self):
-        # Update shield timer
+    def schedule_timers(self):
+        # Power-up and shield expiry timers; redone when start times change
+        for timer in self.timers:
+            timer.cancel()
+        self.timers = []
+        if self.power_ups:
+            self.timers.append(game_clock.schedule_at(self.power_up_start + self.power_up_duration,
+                                                      self.power_ups_expired))
         if self.shield_time > 0:
-            now = pygame.time.get_ticks()
-            if now - self.shield_start > self.shield_time * 1000:  # Convert to milliseconds
-                self.shield_time = 0
-                # Only disable invincibility if not using the special name
-                if self.player_name != "12345":
-                    self.is_invincible = False
-        
-        # Get keyboard input
-        keys = pygame.key.get_pressed()
+            self.timers.append(game_clock.schedule_at(self.shield_start + self.shield_time * 1000,  # In seconds
+                                                      self.shield_expired))
+
+    def power_ups_expired(self):
+        self.power_ups.clear()
+        self.shoot_delay = self.base_shoot_delay
+        self.speed = self.base_speed
+
+    def shield_expired(self):
+        self.shield_time = 0
+        # Only disable invincibility if not using the special name
+        if self.player_name != "12345":
+            self.is_invincible = False
+
+    def update(self):
+        # Held keys from this tick's input sample
+        keys = input_sampler.keys
         movement_speed = self.speed * 2 if PowerUp.RAPID_MOVEMENT in self.power_ups else self.speed
         
         # Track if any movement keys are pressed
@@ -889,13 +2797,6 @@ class Ship(pygame.sprite.Sprite):
         if self.rect.bottom > self.max_y:
             self.rect.bottom = self.max_y
             self.velocity_y = -abs(self.velocity_y) * 0.2  # Reduced bounce
-            
-        # Check power-up duration
-        now = pygame.time.get_ticks()
-        if self.power_ups and now - self.power_up_start > self.power_up_duration:
-            self.power_ups.clear()
-            self.shoot_delay = self.base_shoot_delay
-            self.speed = self.base_speed
         
         # Maintain invincibility for special name
         if self.player_name == "12345":
@@ -904,9 +2805,14 @@ class Ship(pygame.sprite.Sprite):
         # Rest of the update code...
         super().update()
 
+    @property
+    def image(self):
+        return assets.images[self.image_key]
+
     def add_power_up(self, power_up_type):
         self.power_ups.add(power_up_type)
-        self.power_up_start = pygame.time.get_ticks()
+        self.power_up_start = game_clock.ticks()
+        self.schedule_timers()
         
         # Handle shooting power-ups
         if power_up_type == PowerUp.RAPID_FIRE:
@@ -920,21 +2826,20 @@ class Ship(pygame.sprite.Sprite):
         # as they are handled in the shoot() method
         
         # Play power-up sound
-        sound_manager.play_powerup()
+        sound_manager.play_powerup(self.rect.center)
         
-        # Print debug info
-        print(f"Power-up collected: {power_up_type}")
-        print(f"Active power-ups: {self.power_ups}")
-        print(f"Current shoot delay: {self.shoot_delay}")
-        print(f"Current speed: {self.speed}")
+        # Tally the pickup; the details only reach the log at debug level
+        event_counts[f"power_up.{power_up_type}"] += 1
+        logger.debug("Power-up collected: %s (active %s, shoot delay %s, speed %s)",
+                     power_up_type, self.power_ups, self.shoot_delay, self.speed)
 
     def shoot(self):
-        now = pygame.time.get_ticks()
+        now = game_clock.ticks()
         if now - self.last_shot > self.shoot_delay:
             self.last_shot = now
-            sound_manager.play_laser()  # Play laser sound
+            sound_manager.play_laser(self.rect.center)  # Play laser sound
             
-            bullets = []
+            shots = []  # (x, y, angle) of each bullet in the volley
             # Count number of double shot power-ups for multiplicative effect
             double_shot_count = sum(1 for pu in self.power_ups if pu == PowerUp.DOUBLE_SHOT)
             shot_multiplier = 2 ** double_shot_count  # 1 double shot = 2x, 2 double shots = 4x, etc.
@@ -942,113 +2847,254 @@ class Ship(pygame.sprite.Sprite):
             if PowerUp.TRIPLE_SHOT in self.power_ups:
                 # Base triple shot pattern
                 base_pattern = [
-                    (self.rect.centerx, self.rect.top, -1, 0),  # Center
-                    (self.rect.centerx - 20, self.rect.top, -1, -15),  # Left
-                    (self.rect.centerx + 20, self.rect.top, -1, 15)   # Right
+                    (self.rect.centerx, self.rect.top, 0),  # Center
+                    (self.rect.centerx - 20, self.rect.top, -15),  # Left
+                    (self.rect.centerx + 20, self.rect.top, 15)   # Right
                 ]
                 # Multiply pattern based on double shot count
                 for _ in range(shot_multiplier):
                     offset = _ * 10  # Slight offset for each multiplication
-                    for x, y, dir, angle in base_pattern:
-                        bullets.append(Bullet(x + offset, y, dir, angle=angle))
-                        bullets.append(Bullet(x - offset, y, dir, angle=angle))
+                    for x, y, angle in base_pattern:
+                        shots.append((x + offset, y, angle))
+                        shots.append((x - offset, y, angle))
             else:
                 # Regular shot with multiplier
                 base_x = self.rect.centerx
                 spacing = 15  # Space between bullet pairs
                 for i in range(shot_multiplier):
                     offset = (i - (shot_multiplier - 1) / 2) * spacing
-                    bullets.append(Bullet(base_x + offset, self.rect.top, -1))
+                    shots.append((base_x + offset, self.rect.top, 0))
             
-            return bullets
+            # Wide volleys fire as one beam, a lane per bullet path
+            lanes = Beam.layout([(x - self.rect.centerx, angle) for x, _, angle in shots])
+            if len(lanes) >= Beam.MIN_LANES:
+                return [Beam(self.rect.centerx, self.rect.top, lanes)]
+            return [Bullet(x, y, -1, angle=angle) for x, y, angle in shots]
         return []
 
 # Enemy ship class
-class EnemyShip(pygame.sprite.Sprite):
+@entities.register
+@memory_tracker.track
+class EnemyShip(ArrayEntity):
+    RESPAWNS = True
+    SAVED = ('shoot_delay',)
+    TIMERS = ('last_shot',)
+
     def __init__(self, level=1):
+        self.image_key = 'enemy_ship'
+        assets.get(self.image_key, self.create_image)
+        self.mask = assets.mask(self.image_key)
         super().__init__()
-        size = 40
-        self.image = pygame.Surface((size, size), pygame.SRCALPHA)
-        # Draw enemy ship as red inverted triangle
-        pygame.draw.polygon(self.image, RED, [(size//2, size), (0, 0), (size, 0)])
-        
-        self.rect = self.image.get_rect()
-        self.rect.x = random.randrange(WIDTH - self.rect.width)
-        self.rect.y = random.randrange(-100, -40)
         
         # Base speed increased by 25% per level
+        width, height = self.image.get_size()
         base_speed = random.randrange(1, 3)
         level_multiplier = 1 + (0.25 * (level - 1))
-        self.speedy = base_speed * level_multiplier
-        self.speedx = random.randrange(-2, 2) * level_multiplier
+        self.place(random.randrange(WIDTH - width) + width / 2, random.randrange(-100, -40) + height / 2,
+                   random.randrange(-2, 2) * level_multiplier, base_speed * level_multiplier)
         
         self.shoot_delay = max(300, 1500 - (level * 50))  # Shoot faster at higher levels
-        self.last_shot = pygame.time.get_ticks()
+        self.last_shot = game_clock.ticks()
 
-    def update(self):
-        self.rect.y += self.speedy
-        self.rect.x += self.speedx
-        
-        # If enemy goes off screen, respawn it
-        if self.rect.top > HEIGHT + 10 or self.rect.left < -25 or self.rect.right > WIDTH + 25:
-            self.rect.x = random.randrange(WIDTH - self.rect.width)
-            self.rect.y = random.randrange(-100, -40)
-            self.speedy = random.randrange(1, 3)
-            self.speedx = random.randrange(-2, 2)
+    @staticmethod
+    def create_image():
+        size = 40
+        image = pygame.Surface((size, size), pygame.SRCALPHA)
+        # Draw enemy ship as red inverted triangle
+        pygame.draw.polygon(image, RED, [(size//2, size), (0, 0), (size, 0)])
+        return image
+
+    @classmethod
+    def respawn(cls, store, slots):
+        # Respawned enemies lose their level speed bonus
+        count = len(slots)
+        width = store.width[slots]
+        store.x[slots] = entity_rng.integers(0, WIDTH - width) + width / 2
+        store.y[slots] = entity_rng.integers(-100, -40, count) + store.height[slots] / 2
+        store.vy[slots] = entity_rng.integers(1, 3, count)
+        store.vx[slots] = entity_rng.integers(-2, 2, count)
     
     def shoot(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_shot > self.shoot_delay:
-            self.last_shot = now
-            return Bullet(self.rect.centerx, self.rect.bottom, 1, RED)
-        return None
+        # Called by the scene's timer for this enemy once the gun has reloaded
+        self.last_shot = game_clock.ticks()
+        return Bullet(self.rect.centerx, self.rect.bottom, 1, RED)
 
 # Bullet class
-class Bullet(pygame.sprite.Sprite):
+@entities.register
+@memory_tracker.track
+class Bullet(ArrayEntity):
+    SWEPT = True
+    EXTRA_COMPONENTS = {'last_x': numpy.float64, 'last_y': numpy.float64}
+    SAVED = ('direction',)
+    SPEED = 10
+
     def __init__(self, x, y, direction, color=GREEN, angle=0):
+        self.image_key = ('bullet', color)
+        assets.get(self.image_key, lambda: self.create_image(color))
+        self.mask = assets.mask(self.image_key)
         super().__init__()
-        self.image = pygame.Surface((5, 10))
-        self.image.fill(color)
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.bottom = y
-        self.speed = 10
         self.direction = direction  # 1 for down (enemy), -1 for up (player)
         
         # Add angle for spread shots
-        self.angle = math.radians(angle)  # Convert to radians
-        self.speedx = math.sin(self.angle) * self.speed
-        self.speedy = math.cos(self.angle) * self.speed * direction
-        self.x = float(x)  # Store exact position
-        self.y = float(y)
+        speed = self.SPEED
+        angle = math.radians(angle)  # Convert to radians
+        self.place(x, y - self.image.get_height() / 2,
+                   math.sin(angle) * speed, math.cos(angle) * speed * direction)
 
-    def update(self):
-        # Update position using floating point coordinates
-        self.x += self.speedx
-        self.y += self.speedy
-        self.rect.x = int(self.x)
-        self.rect.y = int(self.y)
-        # Kill if it moves off the screen
-        if self.rect.bottom < 0 or self.rect.top > HEIGHT:
-            self.kill()
+    @staticmethod
+    def create_image(color):
+        image = pygame.Surface((5, 10))
+        image.fill(color)
+        return image
+
+    @classmethod
+    def offscreen(cls, store):
+        return (store.bottom() < 0) | (store.top() > HEIGHT)
+
+@entities.register
+@memory_tracker.track
+class Beam(ArrayEntity):
+    """One volley as hitscan lanes to the top of the screen; each hits like its bullets"""
+    EXPIRES = True
+    SAVED = ('lanes', 'struck')
+    MIN_LANES = 4  # Volleys with this many distinct bullet paths become a beam
+    LANE_WIDTH = 5  # A bullet's width
+    FRAMES = 6  # Shown after its hits land
+    DAMAGE = 10  # Boss damage per bullet, and so per lane weight
+    LIMIT = 4  # Full-height lane images kept
+    images = {}  # Registry keys, least recently used first
+
+    def __init__(self, x, top, lanes):
+        self.lanes = lanes
+        self.struck = False
+        self.image_key = ('beam', lanes)
+        self.lookup(self.image_key)
+        self.mask = assets.mask(self.image_key)
+        super().__init__()
+        self.store.lifetime[self.slot] = self.FRAMES
+        self.place(x, top - self.image.get_height() / 2)
+
+    @staticmethod
+    def layout(shots):
+        """Lanes for (offset, angle) shots, weighted by bullets per path"""
+        return tuple(sorted((offset, angle, weight) for (offset, angle), weight
+                            in Counter((int(round(offset)), angle) for offset, angle in shots).items()))
+
+    @classmethod
+    def lookup(cls, key):
+        # LRU like asteroid templates, never evicting a live beam's image
+        if key in cls.images:
+            del cls.images[key]
+        else:
+            in_use = {entity.image_key for entity in cls.store.entities if entity is not None}
+            while len(cls.images) >= cls.LIMIT:
+                evicted = next((image_key for image_key in cls.images if image_key not in in_use), None)
+                if evicted is None:
+                    break
+                del cls.images[evicted]
+                assets.discard(evicted)
+        cls.images[key] = None
+        assets.get(key, lambda: cls.create_image(key[1]))
+
+    def restored(self, image_key):
+        self.image_key = image_key
+        self.lookup(image_key)
+        self.mask = assets.mask(image_key)
+
+    @classmethod
+    def lane_end(cls, offset, angle, height):
+        # Lane x offset after climbing height
+        return offset + math.tan(math.radians(angle)) * height
+
+    @classmethod
+    def create_image(cls, lanes):
+        # Full height once per layout; the RLE colorkey keeps blits cheap
+        reach = max(max(abs(offset), abs(cls.lane_end(offset, angle, HEIGHT))) for offset, angle, _ in lanes)
+        reach = int(math.ceil(reach)) + cls.LANE_WIDTH
+        image = pygame.Surface((reach * 2, HEIGHT))
+        image.set_colorkey(BLACK, pygame.RLEACCEL)
+        for offset, angle, weight in lanes:
+            start = (reach + offset, HEIGHT)
+            end = (reach + cls.lane_end(offset, angle, HEIGHT), 0)
+            pygame.draw.line(image, GREEN, start, end, cls.LANE_WIDTH)
+            if weight > 1:
+                pygame.draw.line(image, LIGHT_GREEN, start, end)
+        return image
+
+    @staticmethod
+    def footprint():
+        # A lane hits wherever its bullet would: same shape, launched from the same point
+        key = ('bullet', GREEN)
+        assets.get(key, lambda: Bullet.create_image(GREEN))
+        return assets.mask(key)
+
+    @classmethod
+    def offscreen(cls, store):
+        # Beams leave by expiring, wherever the ship was
+        return numpy.zeros(store.capacity, bool)
+
+    def strike(self, *groups, kills=True):
+        """First call only: target -> [((x, y), weight)], lanes landing in bullet order"""
+        if self.struck:
+            return {}
+        self.struck = True
+        index = CollisionIndex([sprite for group in groups for sprite in group])
+        footprint = self.footprint()
+        width, height = footprint.get_size()
+        rect = self.rect
+        start, end = rect.bottom - height / 2, -height / 2  # Bullet centre at launch and exit
+        
+        # Targets each lane crosses, nearest first
+        crossings = []
+        for offset, angle, weight in self.lanes:
+            x0, x1 = rect.centerx + offset, rect.centerx + self.lane_end(offset, angle, start - end)
+            lane = pygame.Rect(min(x0, x1), end, abs(x1 - x0), start - end).inflate(width, height)
+            length = math.hypot(x1 - x0, end - start)
+            found = []
+            for target in index.query(lane):
+                t = path_hit(x0, start, x1, end, footprint, target)
+                if t is not None:
+                    point = (int(x0 + (x1 - x0) * t), int(start + (end - start) * t))
+                    found.append((int(t * length / Bullet.SPEED), t, target, point))
+            found.sort(key=lambda crossing: crossing[:2])
+            crossings.append((found, weight))
+        
+        # Replay the flight tick by tick: a lane stops at its first target still standing
+        hits, gone = {}, set()
+        arrivals = [(found[0][0], lane, 0) for lane, (found, _) in enumerate(crossings) if found]
+        heapq.heapify(arrivals)
+        while arrivals:
+            tick = arrivals[0][0]
+            taken = set()
+            while arrivals and arrivals[0][0] == tick:
+                _, lane, position = heapq.heappop(arrivals)
+                found, weight = crossings[lane]
+                _, _, target, point = found[position]
+                if target in gone:
+                    if position + 1 < len(found):
+                        heapq.heappush(arrivals, (found[position + 1][0], lane, position + 1))
+                    continue
+                hits.setdefault(target, []).append((point, weight))
+                taken.add(target)
+            if kills:
+                gone |= taken
+        return hits
 
 # Boss class
+@memory_tracker.track
 class Boss(pygame.sprite.Sprite):
+    # Saved state beyond what Boss(level) sets up
+    SAVED_FIELDS = (('health', 'd'), ('movement_pattern', 'i'), ('movement_offset', 'd'),
+                    ('target_x', 'd'), ('target_y', 'd'), ('current_pattern', 'i'))
+    TIMERS = ('movement_timer', 'pattern_time', 'last_shot')
+
     def __init__(self, level):
         super().__init__()
-        self.boss_level = level // 5  # Regular boss level calculation
-        
-        # Check if this is a mega-boss (every 50 levels)
-        self.is_mega_boss = level % 50 == 0
-        self.mega_boss_tier = level // 50  # 1 for level 50, 2 for level 100, etc.
+        self.boss_level, self.is_mega_boss, self.mega_boss_tier, self.size = self.design(level)
         
-        # Size scales with level, mega-bosses are even larger
-        if self.is_mega_boss:
-            self.size = 400 + (self.mega_boss_tier * 50)  # Bigger for each tier
-        else:
-            self.size = 180 + (self.boss_level * 20)
-        
-        self.image = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+        # Boss artwork is registered once per level
+        self.image_key = ('boss', level)
+        image = assets.get(self.image_key, lambda: asset_cache.art(self.image_key, self.create_image, level))
         
         # Set health based on boss type
         if self.is_mega_boss:
@@ -1067,7 +3113,7 @@ class Boss(pygame.sprite.Sprite):
         
         # Initialize movement pattern variables
         self.movement_pattern = 0
-        self.movement_timer = pygame.time.get_ticks()
+        self.movement_timer = game_clock.ticks()
         self.movement_duration = 3000  # Switch movement every 3 seconds
         self.original_x = WIDTH // 2
         self.original_y = HEIGHT // 4
@@ -1076,43 +3122,91 @@ class Boss(pygame.sprite.Sprite):
         self.move_speed = 2
         
         # Initialize boss position at the top of the screen
-        self.rect = self.image.get_rect()
+        self.rect = image.get_rect()
         self.rect.centerx = WIDTH // 2
         self.rect.top = -self.size  # Start above the screen
         
         # Initialize shooting variables
         self.shoot_delay = 300 if self.is_mega_boss else max(300, 1500 - (self.boss_level * 100))
-        self.last_shot = pygame.time.get_ticks()
-        self.pattern_time = pygame.time.get_ticks()
+        self.last_shot = game_clock.ticks()
+        self.pattern_time = game_clock.ticks()
         self.pattern_duration = 2000 if self.is_mega_boss else 3000
         self.current_pattern = 0
         self.movement_offset = 0
         
+        self.mask = assets.mask(self.image_key)
+        
+        self.timers = []
+        self.schedule_timers()
+
+    def schedule_timers(self):
+        # Movement and pattern switch timers; redone when start times change
+        for timer in self.timers:
+            timer.cancel()
+        self.timers = [game_clock.schedule_at(self.movement_timer + self.movement_duration, self.switch_movement),
+                       game_clock.schedule_at(self.pattern_time + self.pattern_duration, self.switch_pattern)]
+
+    def switch_movement(self):
+        if not self.alive():
+            return  # Defeated: the switches stop here
+        self.movement_pattern = (self.movement_pattern + 1) % 4
+        self.movement_timer = game_clock.ticks()
+        self.movement_offset = 0
+        self.timers[0] = game_clock.schedule_at(self.movement_timer + self.movement_duration, self.switch_movement)
+
+    def switch_pattern(self):
+        if not self.alive():
+            return
+        self.current_pattern = (self.current_pattern + 1) % 4
+        self.pattern_time = game_clock.ticks()
+        self.timers[1] = game_clock.schedule_at(self.pattern_time + self.pattern_duration, self.switch_pattern)
+
+    @staticmethod
+    def design(level):
+        boss_level = level // 5  # Regular boss level calculation
+        
+        # Check if this is a mega-boss (every 50 levels)
+        is_mega_boss = level % 50 == 0
+        mega_boss_tier = level // 50  # 1 for level 50, 2 for level 100, etc.
+        
+        # Size scales with level, mega-bosses are even larger
+        if is_mega_boss:
+            size = 400 + (mega_boss_tier * 50)  # Bigger for each tier
+        else:
+            size = 180 + (boss_level * 20)
+        return boss_level, is_mega_boss, mega_boss_tier, size
+
+    @staticmethod
+    def create_image(level):
+        boss_level, is_mega_boss, mega_boss_tier, size = Boss.design(level)
+        
         # Draw boss appearance based on type
-        if self.is_mega_boss:  # Mega-boss design
+        image = pygame.Surface((size, size), pygame.SRCALPHA)
+        
+        if is_mega_boss:  # Mega-boss design
             # Core color gets more intense with level
-            core_hue = (self.mega_boss_tier * 30) % 360
+            core_hue = (mega_boss_tier * 30) % 360
             core_color = pygame.Color(0)
             core_color.hsva = (core_hue, 100, 100, 100)
             
             # Draw core
-            pygame.draw.circle(self.image, core_color, (self.size//2, self.size//2), self.size//3)
+            pygame.draw.circle(image, core_color, (size//2, size//2), size//3)
             
             # Draw rotating rings with color based on level
-            ring_count = min(3 + self.mega_boss_tier, 8)  # More rings at higher levels
+            ring_count = min(3 + mega_boss_tier, 8)  # More rings at higher levels
             for i in range(ring_count):
-                radius = self.size//3 + i * (self.size//8)
+                radius = size//3 + i * (size//8)
                 ring_hue = (core_hue + i * 30) % 360
                 ring_color = pygame.Color(0)
                 ring_color.hsva = (ring_hue, 100, 100, 100)
-                pygame.draw.circle(self.image, ring_color, (self.size//2, self.size//2), radius, 4)
+                pygame.draw.circle(image, ring_color, (size//2, size//2), radius, 4)
             
             # Add energy crystals that increase with level
-            crystal_count = min(4 + self.mega_boss_tier, 8)
+            crystal_count = min(4 + mega_boss_tier, 8)
             for i in range(crystal_count):
                 angle = 2 * math.pi * i / crystal_count
-                x = self.size//2 + math.cos(angle) * (self.size//2 - 40)
-                y = self.size//2 + math.sin(angle) * (self.size//2 - 40)
+                x = size//2 + math.cos(angle) * (size//2 - 40)
+                y = size//2 + math.sin(angle) * (size//2 - 40)
                 crystal_color = pygame.Color(0)
                 crystal_color.hsva = ((core_hue + 180) % 360, 100, 100, 100)
                 
@@ -1124,70 +3218,76 @@ class Boss(pygame.sprite.Sprite):
                         x + math.cos(crystal_angle) * 40,
                         y + math.sin(crystal_angle) * 40
                     ))
-                pygame.draw.polygon(self.image, crystal_color, points)
+                pygame.draw.polygon(image, crystal_color, points)
             
             # Add glowing eyes that get more intense with level
-            eye_size = 30 + self.mega_boss_tier * 5
+            eye_size = 30 + mega_boss_tier * 5
             eye_color = pygame.Color(0)
             eye_color.hsva = ((core_hue + 120) % 360, 100, 100, 100)
-            pygame.draw.circle(self.image, eye_color, (self.size//3, self.size//3), eye_size)
-            pygame.draw.circle(self.image, eye_color, (2*self.size//3, self.size//3), eye_size)
+            pygame.draw.circle(image, eye_color, (size//3, size//3), eye_size)
+            pygame.draw.circle(image, eye_color, (2*size//3, size//3), eye_size)
             
             # Add energy beams that increase with level
-            beam_count = min(8 + self.mega_boss_tier * 2, 16)
+            beam_count = min(8 + mega_boss_tier * 2, 16)
             beam_color = pygame.Color(0)
             beam_color.hsva = ((core_hue + 60) % 360, 100, 100, 100)
             for i in range(beam_count):
                 angle = 2 * math.pi * i / beam_count
-                start = (self.size//2, self.size//2)
+                start = (size//2, size//2)
                 end = (
-                    self.size//2 + math.cos(angle) * self.size//2,
-                    self.size//2 + math.sin(angle) * self.size//2
+                    size//2 + math.cos(angle) * size//2,
+                    size//2 + math.sin(angle) * size//2
                 )
-                pygame.draw.line(self.image, beam_color, start, end, 6)
+                pygame.draw.line(image, beam_color, start, end, 6)
         
         else:  # Regular boss designs
-            if self.boss_level == 1:  # Level 5 boss
+            if boss_level == 1:  # Level 5 boss
                 # Draw large red pentagon with glowing core
                 points = []
                 for i in range(5):
                     angle = 2 * math.pi * i / 5 - math.pi / 2
                     points.append((
-                        self.size/2 + math.cos(angle) * self.size/2,
-                        self.size/2 + math.sin(angle) * self.size/2
+                        size/2 + math.cos(angle) * size/2,
+                        size/2 + math.sin(angle) * size/2
                     ))
-                pygame.draw.polygon(self.image, RED, points)
-                pygame.draw.circle(self.image, ORANGE, (self.size//2, self.size//2), self.size//4)
+                pygame.draw.polygon(image, RED, points)
+                pygame.draw.circle(image, ORANGE, (size//2, size//2), size//4)
             
-            elif self.boss_level == 2:  # Level 10 boss
+            elif boss_level == 2:  # Level 10 boss
                 # Draw dark purple crystal-like shape
                 points = []
                 for i in range(8):
                     angle = 2 * math.pi * i / 8
-                    r = self.size/2 if i % 2 == 0 else self.size/3
+                    r = size/2 if i % 2 == 0 else size/3
                     points.append((
-                        self.size/2 + math.cos(angle) * r,
-                        self.size/2 + math.sin(angle) * r
+                        size/2 + math.cos(angle) * r,
+                        size/2 + math.sin(angle) * r
                     ))
-                pygame.draw.polygon(self.image, PURPLE, points)
-                pygame.draw.circle(self.image, (255, 0, 255), (self.size//3, self.size//3), 15)
-                pygame.draw.circle(self.image, (255, 0, 255), (2*self.size//3, self.size//3), 15)
+                pygame.draw.polygon(image, PURPLE, points)
+                pygame.draw.circle(image, (255, 0, 255), (size//3, size//3), 15)
+                pygame.draw.circle(image, (255, 0, 255), (2*size//3, size//3), 15)
             
             else:  # Higher level regular bosses
                 # Draw a more intimidating boss with level-based colors
-                hue = (self.boss_level * 30) % 360
+                hue = (boss_level * 30) % 360
                 main_color = pygame.Color(0)
                 main_color.hsva = (hue, 100, 100, 100)
                 
                 # Main core
-                pygame.draw.circle(self.image, main_color, (self.size//2, self.size//2), self.size//2)
+                pygame.draw.circle(image, main_color, (size//2, size//2), size//2)
                 
                 # Pulsing rings with complementary colors
                 for i in range(4):
-                    radius = self.size//2 - (i * 15)
+                    radius = size//2 - (i * 15)
                     ring_color = pygame.Color(0)
                     ring_color.hsva = ((hue + i * 30) % 360, 100, 100, 100)
-                    pygame.draw.circle(self.image, ring_color, (self.size//2, self.size//2), radius, 5)
+                    pygame.draw.circle(image, ring_color, (size//2, size//2), radius, 5)
+        
+        return image
+
+    @property
+    def image(self):
+        return assets.images[self.image_key]
 
     def update(self):
         # Boss entrance movement
@@ -1195,14 +3295,6 @@ class Boss(pygame.sprite.Sprite):
             self.rect.y += 2
             return
         
-        now = pygame.time.get_ticks()
-        
-        # Switch movement patterns periodically
-        if now - self.movement_timer > self.movement_duration:
-            self.movement_pattern = (self.movement_pattern + 1) % 4
-            self.movement_timer = now
-            self.movement_offset = 0
-        
         # Different movement patterns
         if self.is_mega_boss:
             if self.mega_boss_tier == 1:  # Omega Boss
@@ -1269,185 +3361,963 @@ class Boss(pygame.sprite.Sprite):
         self.rect.clamp_ip(pygame.Rect(0, 50, WIDTH, HEIGHT//2))
 
     def shoot(self, player=None):
-        now = pygame.time.get_ticks()
-        if now - self.last_shot > self.shoot_delay:
-            self.last_shot = now
-            bullets = []
-            
-            if self.is_mega_boss:
-                # Check if enough time has passed to switch patterns
-                if now - self.pattern_time > self.pattern_duration:
-                    self.current_pattern = (self.current_pattern + 1) % 4
-                    self.pattern_time = now
+        # Called by the scene's shot timer
+        self.last_shot = game_clock.ticks()
+        bullets = []
+        
+        if self.is_mega_boss:
+            if self.mega_boss_tier == 1:  # Level 50 - Omega Boss
+                if self.current_pattern == 0:  # Spiral pattern
+                    for i in range(8):
+                        angle = 2 * math.pi * i / 8 + self.movement_offset
+                        speed = 8
+                        speed_x = math.cos(angle) * speed
+                        speed_y = math.sin(angle) * speed
+                        bullet = BossBullet(self.rect.centerx, self.rect.centery, 
+                                          speed_x, speed_y, (255, 0, 0))  # Red bullets
+                        bullets.append(bullet)
+                    self.movement_offset += 0.2  # Rotate the pattern
                 
-                if self.mega_boss_tier == 1:  # Level 50 - Omega Boss
-                    if self.current_pattern == 0:  # Spiral pattern
-                        for i in range(8):
-                            angle = 2 * math.pi * i / 8 + self.movement_offset
-                            speed = 8
-                            speed_x = math.cos(angle) * speed
-                            speed_y = math.sin(angle) * speed
-                            bullet = BossBullet(self.rect.centerx, self.rect.centery, 
-                                              speed_x, speed_y, (255, 0, 0))  # Red bullets
-                            bullets.append(bullet)
-                        self.movement_offset += 0.2  # Rotate the pattern
-                    
-                    elif self.current_pattern == 1:  # Cross beam pattern
-                        angles = [0, math.pi/2, math.pi, 3*math.pi/2]
-                        for angle in angles:
-                            for speed in range(4, 12, 2):  # Multiple bullets along each beam
-                                speed_x = math.cos(angle) * speed
-                                speed_y = math.sin(angle) * speed
-                                bullet = BossBullet(self.rect.centerx, self.rect.centery,
-                                                  speed_x, speed_y, (255, 0, 255))  # Purple bullets
-                                bullets.append(bullet)
-                    
-                    elif self.current_pattern == 2:  # Homing missiles
-                        if player:
-                            for i in range(3):  # Launch 3 homing missiles
-                                dx = player.rect.centerx - self.rect.centerx
-                                dy = player.rect.centery - self.rect.centery
-                                dist = math.sqrt(dx * dx + dy * dy)
-                                if dist > 0:
-                                    speed = 6
-                                    speed_x = dx / dist * speed
-                                    speed_y = dy / dist * speed
-                                    # Add slight spread to the missiles
-                                    spread = (i - 1) * math.pi / 6
-                                    new_speed_x = speed_x * math.cos(spread) - speed_y * math.sin(spread)
-                                    new_speed_y = speed_x * math.sin(spread) + speed_y * math.cos(spread)
-                                    bullet = BossBullet(self.rect.centerx, self.rect.centery,
-                                                      new_speed_x, new_speed_y, (0, 255, 255))  # Cyan bullets
-                                    bullets.append(bullet)
-                    
-                    else:  # Scatter shot
-                        for _ in range(12):
-                            angle = random.uniform(0, 2 * math.pi)
-                            speed = random.uniform(3, 8)
+                elif self.current_pattern == 1:  # Cross beam pattern
+                    angles = [0, math.pi/2, math.pi, 3*math.pi/2]
+                    for angle in angles:
+                        for speed in range(4, 12, 2):  # Multiple bullets along each beam
                             speed_x = math.cos(angle) * speed
                             speed_y = math.sin(angle) * speed
                             bullet = BossBullet(self.rect.centerx, self.rect.centery,
-                                              speed_x, speed_y, (255, 255, 0))  # Yellow bullets
+                                              speed_x, speed_y, (255, 0, 255))  # Purple bullets
                             bullets.append(bullet)
                 
-                # ... rest of mega-boss patterns ...
-            
-            else:  # Regular boss patterns
-                if self.current_pattern == 0:  # Basic spread shot
-                    for i in range(-2, 3):
-                        angle = math.pi/6 * i
-                        speed = 6
-                        speed_x = math.sin(angle) * speed
-                        speed_y = math.cos(angle) * speed
-                        bullet = BossBullet(self.rect.centerx, self.rect.centery,
-                                          speed_x, speed_y, RED)
-                        bullets.append(bullet)
+                elif self.current_pattern == 2:  # Homing missiles
+                    if player:
+                        for i in range(3):  # Launch 3 homing missiles
+                            dx = player.rect.centerx - self.rect.centerx
+                            dy = player.rect.centery - self.rect.centery
+                            dist = math.sqrt(dx * dx + dy * dy)
+                            if dist > 0:
+                                speed = 6
+                                speed_x = dx / dist * speed
+                                speed_y = dy / dist * speed
+                                # Add slight spread to the missiles
+                                spread = (i - 1) * math.pi / 6
+                                new_speed_x = speed_x * math.cos(spread) - speed_y * math.sin(spread)
+                                new_speed_y = speed_x * math.sin(spread) + speed_y * math.cos(spread)
+                                bullet = BossBullet(self.rect.centerx, self.rect.centery,
+                                                  new_speed_x, new_speed_y, (0, 255, 255))  # Cyan bullets
+                                bullets.append(bullet)
                 
-                elif self.current_pattern == 1:  # Circle shot
-                    for i in range(8):
-                        angle = 2 * math.pi * i / 8
-                        speed = 5
+                else:  # Scatter shot
+                    for _ in range(12):
+                        angle = random.uniform(0, 2 * math.pi)
+                        speed = random.uniform(3, 8)
                         speed_x = math.cos(angle) * speed
                         speed_y = math.sin(angle) * speed
                         bullet = BossBullet(self.rect.centerx, self.rect.centery,
-                                          speed_x, speed_y, PURPLE)
+                                          speed_x, speed_y, (255, 255, 0))  # Yellow bullets
                         bullets.append(bullet)
-                
-                elif self.current_pattern == 2:  # Aimed shot
-                    if player:
-                        dx = player.rect.centerx - self.rect.centerx
-                        dy = player.rect.centery - self.rect.centery
-                        dist = math.sqrt(dx * dx + dy * dy)
-                        if dist > 0:
-                            speed = 7
-                            speed_x = dx / dist * speed
-                            speed_y = dy / dist * speed
-                            bullet = BossBullet(self.rect.centerx, self.rect.centery,
-                                              speed_x, speed_y, ORANGE)
-                            bullets.append(bullet)
-                
-                else:  # Random spray
-                    for _ in range(5):
-                        angle = random.uniform(math.pi/4, 3*math.pi/4)
-                        speed = random.uniform(4, 7)
-                        speed_x = math.cos(angle) * speed
-                        speed_y = math.sin(angle) * speed
+            
+            # ... rest of mega-boss patterns ...
+        
+        else:  # Regular boss patterns
+            if self.current_pattern == 0:  # Basic spread shot
+                for i in range(-2, 3):
+                    angle = math.pi/6 * i
+                    speed = 6
+                    speed_x = math.sin(angle) * speed
+                    speed_y = math.cos(angle) * speed
+                    bullet = BossBullet(self.rect.centerx, self.rect.centery,
+                                      speed_x, speed_y, RED)
+                    bullets.append(bullet)
+            
+            elif self.current_pattern == 1:  # Circle shot
+                for i in range(8):
+                    angle = 2 * math.pi * i / 8
+                    speed = 5
+                    speed_x = math.cos(angle) * speed
+                    speed_y = math.sin(angle) * speed
+                    bullet = BossBullet(self.rect.centerx, self.rect.centery,
+                                      speed_x, speed_y, PURPLE)
+                    bullets.append(bullet)
+            
+            elif self.current_pattern == 2:  # Aimed shot
+                if player:
+                    dx = player.rect.centerx - self.rect.centerx
+                    dy = player.rect.centery - self.rect.centery
+                    dist = math.sqrt(dx * dx + dy * dy)
+                    if dist > 0:
+                        speed = 7
+                        speed_x = dx / dist * speed
+                        speed_y = dy / dist * speed
                         bullet = BossBullet(self.rect.centerx, self.rect.centery,
-                                          speed_x, speed_y, RED)
+                                          speed_x, speed_y, ORANGE)
                         bullets.append(bullet)
-                
-                # Switch patterns periodically
-                if now - self.pattern_time > self.pattern_duration:
-                    self.current_pattern = (self.current_pattern + 1) % 4
-                    self.pattern_time = now
             
-            return bullets
-        return []
+            else:  # Random spray
+                for _ in range(5):
+                    angle = random.uniform(math.pi/4, 3*math.pi/4)
+                    speed = random.uniform(4, 7)
+                    speed_x = math.cos(angle) * speed
+                    speed_y = math.sin(angle) * speed
+                    bullet = BossBullet(self.rect.centerx, self.rect.centery,
+                                      speed_x, speed_y, RED)
+                    bullets.append(bullet)
+        
+        return bullets
+
+# Boss Bullet class
+@entities.register
+@memory_tracker.track
+class BossBullet(ArrayEntity):
+    SWEPT = True
+    EXTRA_COMPONENTS = {'last_x': numpy.float64, 'last_y': numpy.float64}
+
+    def __init__(self, x, y, speed_x, speed_y, color):
+        self.image_key = ('boss_bullet', color)
+        assets.get(self.image_key, lambda: self.create_image(color))
+        self.mask = assets.mask(self.image_key)
+        super().__init__()
+        self.place(x, y, speed_x, speed_y)
+
+    @staticmethod
+    def create_image(color):
+        image = pygame.Surface((10, 10), pygame.SRCALPHA)
+        pygame.draw.circle(image, color, (5, 5), 5)
+        return image
+
+    @classmethod
+    def offscreen(cls, store):
+        return ((store.left() < -100) | (store.right() > WIDTH + 100) |
+                (store.top() < -100) | (store.bottom() > HEIGHT + 100))
+
+# Incremental spawner for waves and respawns
+class SpawnScheduler:
+    """Build sprites a few at a time so a new wave never lands in one frame"""
+    def __init__(self, budget_ms=4.0):
+        self.budget_ms = budget_ms  # Time allowed for construction per frame
+        self.pending = deque()  # (factory, groups, staged) waiting to be built
+        self.staged = []  # (sprite, groups) built but held back until hand_over()
+
+    def queue(self, factory, count, *groups, staged=True):
+        # Staged sprites wait for hand_over()
+        for _ in range(count):
+            self.pending.append((factory, groups, staged))
+
+    def clear(self):
+        self.pending.clear()
+        for sprite, groups in self.staged:
+            sprite.kill()  # Frees its component slot
+        self.staged.clear()
+
+    def build_next(self, joined):
+        factory, groups, staged = self.pending.popleft()
+        sprite = factory()
+        if staged:
+            self.staged.append((sprite, groups))
+        else:
+            for group in groups:
+                group.add(sprite)
+            joined.append(sprite)
+
+    def run(self):
+        # At least one sprite per call, however slow the machine
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        joined = []
+        while self.pending:
+            self.build_next(joined)
+            if time.perf_counter() >= deadline:
+                break
+        return joined
+
+    def hand_over(self):
+        # Finish the queue and release the staged wave; returns the sprites that joined
+        joined = []
+        while self.pending:
+            self.build_next(joined)
+        for sprite, groups in self.staged:
+            for group in groups:
+                group.add(sprite)
+            joined.append(sprite)
+        self.staged.clear()
+        return joined
+
+# Scenes: every screen is a Scene, run by SceneManager
+class Scene:
+    """A screen: enter(), update(events) and draw() each frame, resume() after a pop, exit()"""
+    def __init__(self):
+        self.manager = None
+
+    def enter(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def update(self, events):
+        pass
+
+    def draw(self):
+        pass
+
+class SceneManager:
+    """Scene stack; only the top scene runs"""
+    def __init__(self):
+        self.stack = []
+        self.pacer = FramePacer(ARGS.pacing, ARGS.fps)
+        self.autopilot = Autopilot(ARGS.pilot_name, ARGS.soak_hours, ARGS.soak_levels,
+                                   ARGS.soak_report) if ARGS.autopilot else None
+
+    def push(self, scene):
+        scene.manager = self
+        self.stack.append(scene)
+        scene.enter()
+
+    def pop(self):
+        scene = self.stack.pop()
+        scene.exit()
+        scene.manager = None
+        if self.stack:
+            self.stack[-1].resume()
+        return scene
+
+    def replace(self, scene):
+        self.pop()
+        self.push(scene)
+
+    def clear(self):
+        while self.stack:
+            self.pop()
+
+    def run(self, scene):
+        """Run the top scene each frame until the stack is empty"""
+        self.push(scene)
+        while self.stack:
+            if self.autopilot:
+                self.autopilot.drive(self.stack[-1])
+            events = input_sampler.sample()
+            if any(event.type == pygame.QUIT for event in events):
+                self.clear()
+                break
+            scene = self.stack[-1]
+            idle = game_clock.paused  # No frame deadline to keep
+            scene.update(events)
+            if self.stack and self.stack[-1] is scene:  # A scene that just handed over isn't drawn
+                scene.draw()
+                present_display()
+                if idle:
+                    input_sampler.skip()
+                else:
+                    input_sampler.presented()
+                memory_tracker.end_frame()
+            if idle:
+                self.pacer.idle(GameClock.PAUSED_SLEEP)
+            else:
+                self.pacer.tick()
+        if self.autopilot:
+            self.autopilot.finish()
+
+# Autopilot: plays unattended for soak tests
+class Autopilot:
+    """Plays through menus and levels, reporting per level"""
+    LOOKAHEAD = 30  # Frames of hazard motion considered when dodging
+    MARGIN = 40  # Clearance kept around the ship, in pixels
+    DEADZONE = 0.15  # Steering force below which no key is held
+    HOME_Y = 0.8  # Resting height, as a fraction of the screen
+    FRAME_BIN_MS = 0.1  # Frame time histogram bin width
+    FRAME_BINS = 10000
+    PERCENTILES = (50, 90, 99)
+    GROUPS = ('all_sprites', 'asteroids', 'enemies', 'bullets', 'beams', 'enemy_bullets', 'power_ups',
+              'bombs', 'explosions', 'boss_group', 'boss_bullets')
+    HAZARDS = ('asteroids', 'enemies', 'enemy_bullets', 'boss_bullets', 'bombs', 'boss_group')
+
+    class Keys(set):
+        """Held keys, indexed like pygame.key.get_pressed()"""
+        def __getitem__(self, key):
+            return key in self
+
+    def __init__(self, name, hours=None, levels=None, report_path='soak_report.json'):
+        self.name = name
+        self.deadline = time.perf_counter() + hours * 3600 if hours else None
+        self.max_levels = levels
+        self.report_path = report_path
+        self.keys = self.Keys()
+        input_sampler.held = self.keys
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.last_frame = None
+        self.frame_histogram = numpy.zeros(self.FRAME_BINS, numpy.int64)
+        self.positions = {}  # Hazard -> centre last frame, for estimating its velocity
+        self.games = 0
+        self.game = None  # GameScene being played
+        self.level = None  # Running totals for the level being played
+        self.levels = []  # Finished level records
+        self.rss_start = self.rss_peak = current_rss()
+        self.quitting = False
+
+    def drive(self, scene):
+        """Post this tick's events and set the held keys"""
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            frame_bin = min(int((now - self.last_frame) * 1000 / self.FRAME_BIN_MS), self.FRAME_BINS - 1)
+            self.frame_histogram[frame_bin] += 1
+            if self.level:
+                self.level['frame_histogram'][frame_bin] += 1
+        self.last_frame = now
+        self.keys.clear()
+        if self.quitting:
+            return
+        
+        if isinstance(scene, GameScene):
+            if scene is not self.game:
+                self.game = scene
+                self.games += 1
+            if self.level is None or self.level['level'] != scene.level:
+                self.end_level()
+                if self.finished():
+                    self.quit()
+                    return
+                self.begin_level(scene)
+            self.count_sprites(scene)
+            self.fly(scene)
+        else:
+            self.end_level()
+            self.game = None
+            self.positions.clear()
+            self.navigate(scene)
+        
+        if self.finished():
+            self.quit()
+
+    def quit(self):
+        # Same as closing the window
+        self.quitting = True
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    def press(self, key, unicode=''):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0, scancode=0))
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, unicode=unicode, mod=0, scancode=0))
+
+    def navigate(self, scene):
+        if isinstance(scene, NameEntryScene):
+            if not scene.text:
+                if not scene.active:
+                    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=scene.input_box.center, button=1))
+                for character in self.name:
+                    self.press(ord(character.lower()), character)
+                self.press(pygame.K_RETURN, '\r')
+        elif isinstance(scene, WelcomeScene):
+            self.press(pygame.K_SPACE, ' ')
+        elif isinstance(scene, SelectShipScene):
+            self.press(pygame.K_1 + self.games % len(scene.ships))  # Take each ship in turn
+        else:
+            self.press(pygame.K_ESCAPE)  # Back to the welcome screen
+
+    def fly(self, scene):
+        player = scene.player
+        px, py = player.rect.center
+        reach = max(player.rect.size) / 2 + self.MARGIN
+        force_x, force_y = 0.0, (HEIGHT * self.HOME_Y - py) / HEIGHT  # Drift back to the resting height
+        
+        # Push away from hazards, harder the sooner they arrive
+        positions = {}
+        for name in self.HAZARDS:
+            for sprite in getattr(scene, name):
+                rect = sprite.rect
+                x, y = rect.center
+                positions[sprite] = x, y
+                last_x, last_y = self.positions.get(sprite, (x, y))
+                vx, vy = x - last_x, y - last_y
+                speed2 = vx * vx + vy * vy
+                t = min(max(((px - x) * vx + (py - y) * vy) / speed2, 0), self.LOOKAHEAD) if speed2 else 0
+                dx, dy = px - (x + vx * t), py - (y + vy * t)
+                distance = math.hypot(dx, dy)
+                clearance = 2 * (reach + max(rect.size) / 2)
+                if distance < clearance:
+                    urgency = (clearance - distance) / clearance * (1 - t / (2 * self.LOOKAHEAD))
+                    # Prefer sideways: there is more room across
+                    force_x += math.copysign(2 * urgency, dx if abs(dx) > 1 else WIDTH / 2 - px)
+                    force_y += urgency * dy / (distance or 1)
+        self.positions = positions
+        
+        if scene.power_ups:
+            # Head for the nearest power-up
+            target = min(scene.power_ups, key=lambda power_up: math.dist(power_up.rect.center, (px, py)))
+            dx, dy = target.rect.centerx - px, target.rect.centery - py
+            distance = math.hypot(dx, dy) or 1
+            force_x += 0.6 * dx / distance
+            force_y += 0.6 * dy / distance
+        else:
+            # Line up under the closest thing to shoot
+            targets = [sprite for name in ('boss_group', 'enemies', 'asteroids')
+                       for sprite in getattr(scene, name) if sprite.rect.centery < py]
+            if targets:
+                target = max(targets, key=lambda sprite: sprite.rect.centery)
+                force_x += 0.5 * max(-1, min(1, (target.rect.centerx - px) / 200))
+        
+        if force_x < -self.DEADZONE:
+            self.keys.add(pygame.K_LEFT)
+        elif force_x > self.DEADZONE:
+            self.keys.add(pygame.K_RIGHT)
+        if force_y < -self.DEADZONE:
+            self.keys.add(pygame.K_UP)
+        elif force_y > self.DEADZONE:
+            self.keys.add(pygame.K_DOWN)
+        
+        # Tap fire whenever the gun is ready
+        if not scene.level_transition and game_clock.ticks() - player.last_shot > player.shoot_delay:
+            self.press(pygame.K_SPACE, ' ')
+
+    def begin_level(self, scene):
+        self.level = {
+            'game': self.games,
+            'level': scene.level,
+            'ship': scene.ship_key[1],
+            'start': time.perf_counter(),
+            'frame_histogram': numpy.zeros(self.FRAME_BINS, numpy.int64),
+            'sprites': {},
+            'sprites_peak': Counter(),
+        }
+
+    def count_sprites(self, scene):
+        counts = {name: len(getattr(scene, name)) for name in self.GROUPS}
+        counts['particles'] = len(particle_system.particles)
+        self.level['sprites'] = counts
+        peak = self.level['sprites_peak']
+        for name, count in counts.items():
+            peak[name] = max(peak[name], count)
+
+    def end_level(self):
+        level = self.level
+        if level is None:
+            return
+        self.level = None
+        rss = current_rss()
+        if rss is not None:
+            self.rss_peak = max(self.rss_peak or 0, rss)
+        record = {
+            'game': level['game'],
+            'level': level['level'],
+            'ship': level['ship'],
+            'seconds': round(time.perf_counter() - level['start'], 2),
+            'frames': int(level['frame_histogram'].sum()),
+            'frame_ms': self.histogram_percentiles(level['frame_histogram']),
+            'rss_mb': self.megabytes(rss),
+            'sprites': level['sprites'],
+            'sprites_peak': dict(level['sprites_peak']),
+        }
+        self.levels.append(record)
+        logger.info("Soak game %d level %d: %d frames, frame p50/p99 %s/%s ms, RSS %s MB, %d sprites",
+                    record['game'], record['level'], record['frames'], record['frame_ms'].get('p50'),
+                    record['frame_ms'].get('p99'), record['rss_mb'], record['sprites'].get('all_sprites', 0))
+        self.write_report()
+
+    def finished(self):
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return True
+        return self.max_levels is not None and len(self.levels) >= self.max_levels
+
+    def histogram_percentiles(self, histogram):
+        # Upper edge of the bin each percentile falls in
+        total = histogram.sum()
+        if not total:
+            return {}
+        cumulative = numpy.cumsum(histogram)
+        result = {f"p{p}": round((int(numpy.searchsorted(cumulative, total * p / 100)) + 1) * self.FRAME_BIN_MS, 2)
+                  for p in self.PERCENTILES}
+        result['max'] = round((int(numpy.flatnonzero(histogram)[-1]) + 1) * self.FRAME_BIN_MS, 2)
+        return result
+
+    @staticmethod
+    def megabytes(size):
+        return None if size is None else round(size / 2**20, 1)
+
+    def report(self):
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'hours': round((time.perf_counter() - self.start) / 3600, 3),
+            'games': self.games,
+            'levels_played': len(self.levels),
+            'frames': int(self.frame_histogram.sum()),
+            'frame_ms': self.histogram_percentiles(self.frame_histogram),
+            'rss_mb': {
+                'start': self.megabytes(self.rss_start),
+                'end': self.levels[-1]['rss_mb'] if self.levels else None,
+                'peak': self.megabytes(self.rss_peak),
+            },
+            'levels': self.levels,
+        }
+
+    def write_report(self):
+        # Rewritten after every level
+        try:
+            temporary = self.report_path + '.tmp'
+            with open(temporary, 'w') as f:
+                json.dump(self.report(), f, indent=2)
+            os.replace(temporary, self.report_path)
+        except OSError as e:
+            logger.error("Error writing soak report: %s", e)
+
+    def finish(self):
+        self.end_level()
+        self.write_report()
+        input_sampler.held = None
+        report = self.report()
+        logger.info("Soak run: %d games, %d levels in %.2f h; frame p50/p99 %s/%s ms; RSS %s -> %s MB (peak %s)",
+                    report['games'], report['levels_played'], report['hours'], report['frame_ms'].get('p50'),
+                    report['frame_ms'].get('p99'), report['rss_mb']['start'], report['rss_mb']['end'],
+                    report['rss_mb']['peak'])
+
+# Asset keys as JSON, for save states and the spectator stream
+def json_key(value):
+    """An asset key read back from JSON, lists turned back into tuples"""
+    return tuple(json_key(item) for item in value) if isinstance(value, list) else value
+
+def build_art(key):
+    """Image for an asset key, via the asset cache"""
+    kind = key if isinstance(key, str) else key[0]
+    try:
+        if kind == 'asteroid':
+            return AsteroidTemplate.lookup(key).original_image
+        elif kind == 'bullet':
+            return Bullet.create_image(key[1])
+        elif kind == 'boss_bullet':
+            return BossBullet.create_image(key[1])
+        elif kind == 'beam':
+            return Beam.create_image(key[1])
+        elif kind == 'enemy_ship':
+            return EnemyShip.create_image()
+        elif kind == 'power_up':
+            return asset_cache.art(key, PowerUp.create_image, key[1])
+        elif kind == 'boss':
+            return asset_cache.art(key, Boss.create_image, key[1])
+        elif kind == 'explosion':
+            return Explosion.create_image(key[2])
+        elif kind == 'ship':
+            create_ship = next(create for ship_key, create, *_ in SHIP_DESIGNS if ship_key == key)
+            return asset_cache.art(key, create_ship)[0]
+    except Exception as e:
+        logger.error("Can't draw art for %r: %s", key, e)
+    else:
+        logger.warning("Unknown art key %r", key)
+    placeholder = pygame.Surface((10, 10))
+    placeholder.fill(PURPLE)
+    return placeholder
+
+# Spectator stream: binary game snapshots over TCP
+class SnapshotStream:
+    """Sends each tick to spectators as a keyframe or a delta; messages are HEADER then payload"""
+    KEYFRAME, DELTA, ART = 1, 2, 3
+    KEYFRAME_INTERVAL = 300  # Ticks between keyframes
+    MAX_BACKLOG = 1 << 20  # Unsent bytes before a spectator is dropped
+    NO_BOSS = 0xFFFF
+    HEADER = struct.Struct('<IBI')  # Length of the rest, type, tick
+    STATE = struct.Struct('<IHH')  # Score, level, boss health in thousandths (NO_BOSS without one)
+    COUNT = struct.Struct('<H')  # Also art and entity ids
+    ENTITY = struct.Struct('<HHhhB')  # Id, art, x, y, angle in 1/256 turns
+    # Delta field flags, in order: int8 steps or int16 positions
+    STEP_X, MOVE_X, STEP_Y, MOVE_Y, TURN, REART = 1, 2, 4, 8, 16, 32
+    FIELDS = ((STEP_X, 'b'), (MOVE_X, 'h'), (STEP_Y, 'b'), (MOVE_Y, 'h'), (TURN, 'B'), (REART, 'H'))
+    STATS_HISTORY = 3600  # Ticks kept for percentiles
+
+    def __init__(self, port, host='127.0.0.1'):
+        self.address = (host, port)
+        self.server = None
+        self.clients = {}  # Socket -> bytes not yet accepted by it
+        self.joined = []  # Clients waiting for the art table and a keyframe
+        self.tick = 0
+        self.reset()
+        self.reset_stats()
+
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def change_format(cls, flags):
+        return struct.Struct('<HB' + ''.join(code for flag, code in cls.FIELDS if flags & flag))
+
+    def reset(self):
+        # Forget every id and art number; only done with nobody watching
+        self.ids = {}  # Sprite -> entity id
+        self.free_ids = []  # Heap of ids whose removal has been sent
+        self.issued = 0
+        self.sent = {}  # Entity id -> (art, x, y, angle) as the spectators have it
+        self.arts = {}  # Image key -> art number
+        self.art_messages = []
+        self.last_keyframe = None
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.keyframes = 0
+        self.keyframe_bytes = 0
+        self.delta_bytes = 0
+        self.delta_sizes = deque(maxlen=self.STATS_HISTORY)
+        self.encode_ms = deque(maxlen=self.STATS_HISTORY)
+        self.peak_clients = 0
+
+    def listen(self):
+        try:
+            self.server = socket.create_server(self.address)
+            self.server.setblocking(False)
+            logger.info("Spectator stream listening on %s:%d", *self.address)
+        except OSError as e:
+            logger.error("Can't serve spectators on %s:%d: %s", *self.address, e)
+
+    def close(self):
+        for client in list(self.clients):
+            self.drop(client)
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    def accept(self):
+        while True:
+            try:
+                client, address = self.server.accept()
+            except OSError:
+                return  # Nobody else waiting
+            client.setblocking(False)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.clients[client] = bytearray()
+            self.joined.append(client)
+            logger.info("Spectator joined from %s:%d", *address[:2])
+
+    def drop(self, client, reason=None):
+        if reason:
+            logger.warning("Spectator dropped: %s", reason)
+        self.clients.pop(client, None)
+        if client in self.joined:
+            self.joined.remove(client)
+        client.close()
+
+    def send(self, client, data):
+        backlog = self.clients[client]
+        backlog += data
+        try:
+            sent = client.send(backlog)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self.drop(client)
+            return
+        del backlog[:sent]
+        if len(backlog) > self.MAX_BACKLOG:
+            self.drop(client, f"{len(backlog)} bytes behind")
+
+    def message(self, kind, *parts):
+        payload = b''.join(parts)
+        return self.HEADER.pack(len(payload) + 5, kind, self.tick) + payload
+
+    def art(self, key):
+        art = self.arts.get(key)
+        if art is None:
+            art = self.arts[key] = len(self.arts)
+            self.art_messages.append(self.message(self.ART, self.COUNT.pack(art), json.dumps(key).encode()))
+        return art
+
+    def change(self, entity_id, previous, record):
+        art, x, y, angle = record
+        old_art, old_x, old_y, old_angle = previous or (None, None, None, None)
+        flags, values = 0, []
+        for value, old, step, move in ((x, old_x, self.STEP_X, self.MOVE_X), (y, old_y, self.STEP_Y, self.MOVE_Y)):
+            if old is not None and -128 <= value - old <= 127:
+                if value != old:
+                    flags |= step
+                    values.append(value - old)
+            else:
+                flags |= move
+                values.append(value)
+        if angle != old_angle:
+            flags |= self.TURN
+            values.append(angle)
+        if art != old_art:
+            flags |= self.REART
+            values.append(art)
+        return self.change_format(flags).pack(entity_id, flags, *values)
+
+    def publish(self, scene):
+        """Call once per game tick, after the simulation step"""
+        if self.server is None:
+            return
+        self.accept()
+        if not self.clients:
+            self.reset()  # Whoever joins next starts from a clean slate
+            return
+        start = time.perf_counter()
+        self.tick += 1
+        boss = next(iter(scene.boss_group), None)
+        boss_health = self.NO_BOSS if boss is None else max(0, min(1000, int(boss.health * 1000 // boss.max_health)))
+        state = self.STATE.pack(min(scene.score, 0xFFFFFFFF), min(scene.level, 0xFFFF), boss_health)
+
+        # Positions are the drawn rect centre in whole pixels
+        ids, sent, free_ids = self.ids, self.sent, self.free_ids
+        art_count = len(self.art_messages)
+        current, changes = {}, []
+        for sprite in scene.all_sprites:
+            entity_id = ids.get(sprite)
+            if entity_id is None:
+                if free_ids:
+                    entity_id = heapq.heappop(free_ids)
+                else:
+                    entity_id = self.issued
+                    self.issued += 1
+                ids[sprite] = entity_id
+            x, y = sprite.rect.center
+            source = getattr(sprite, 'rotation_source', None)
+            record = (self.art(sprite.image_key), max(-32768, min(x, 32767)), max(-32768, min(y, 32767)),
+                      int(source[1] * 256 / 360) & 0xFF if source else 0)
+            current[entity_id] = record
+            previous = sent.get(entity_id)
+            if previous != record:
+                changes.append(self.change(entity_id, previous, record))
+        removed = [ids.pop(sprite) for sprite in [sprite for sprite, entity_id in ids.items() if entity_id not in current]]
+
+        keyframe_due = self.last_keyframe is None or self.tick - self.last_keyframe >= self.KEYFRAME_INTERVAL
+        keyframe = delta = None
+        if keyframe_due or self.joined:
+            keyframe = self.message(self.KEYFRAME, state, self.COUNT.pack(len(current)),
+                                    *(self.ENTITY.pack(entity_id, *record) for entity_id, record in current.items()))
+        if not keyframe_due:
+            delta = self.message(self.DELTA, state, self.COUNT.pack(len(removed)),
+                                 *(self.COUNT.pack(entity_id) for entity_id in removed),
+                                 self.COUNT.pack(len(changes)), *changes)
+        new_art = b''.join(self.art_messages[art_count:])
+        self.encode_ms.append((time.perf_counter() - start) * 1000)
+
+        self.peak_clients = max(self.peak_clients, len(self.clients))
+        for client in list(self.clients):
+            if client in self.joined:
+                self.send(client, b''.join(self.art_messages) + keyframe)
+            else:
+                self.send(client, new_art + (keyframe if keyframe_due else delta))
+        self.joined.clear()
+
+        # Ids go back to the pool only once their removal is on its way
+        self.sent = current
+        for entity_id in removed:
+            heapq.heappush(free_ids, entity_id)
+        if keyframe_due:
+            self.last_keyframe = self.tick
+            self.keyframes += 1
+            self.keyframe_bytes += len(keyframe)
+        else:
+            self.delta_bytes += len(delta)
+            self.delta_sizes.append(len(delta))
+        self.ticks += 1
+
+    def report(self):
+        if self.ticks and self.delta_sizes:
+            per_tick = (self.keyframe_bytes + self.delta_bytes) / self.ticks
+            encode = numpy.percentile(self.encode_ms, (50, 99))
+            logger.info("Spectator stream over %d ticks to up to %d spectators: keyframes %d x %.0f B, "
+                        "deltas mean %.0f B / p99 %.0f B, %.0f B/tick per spectator (%.1f KB/s at %d fps), "
+                        "encode p50/p99 %.2f/%.2f ms",
+                        self.ticks, self.peak_clients, self.keyframes, self.keyframe_bytes / max(self.keyframes, 1),
+                        numpy.mean(self.delta_sizes), numpy.percentile(self.delta_sizes, 99),
+                        per_tick, per_tick * ARGS.fps / 1024, ARGS.fps, *encode)
+        self.reset_stats()
+
+snapshot_stream = SnapshotStream(ARGS.stream_port, ARGS.stream_host) if ARGS.stream_port else None
+
+class SpectatorScene(Scene):
+    """Viewer for a SnapshotStream; ESC quits"""
+    RETRY_MS = 1000  # Between connection attempts
+
+    def __init__(self, address):
+        super().__init__()
+        host, _, port = address.rpartition(':')
+        self.address = (host or '127.0.0.1', int(port))
+
+    def enter(self):
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        self.connection = None
+        self.last_attempt = None
+        self.images = {}  # Art number -> surface
+        self.reset()
+
+    def reset(self):
+        self.buffer = bytearray()
+        self.entities = {}  # Entity id -> [art, x, y, angle]
+        self.score = self.level = self.tick = 0
+        self.boss_health = SnapshotStream.NO_BOSS
+        self.received = deque()  # (time, bytes) over the last second
+
+    def exit(self):
+        self.disconnect()
+        viewport_culler.report()
+
+    def connect(self):
+        now = pygame.time.get_ticks()
+        if self.last_attempt is not None and now - self.last_attempt < self.RETRY_MS:
+            return
+        self.last_attempt = now
+        try:
+            self.connection = socket.create_connection(self.address, timeout=0.5)
+            self.connection.setblocking(False)
+            logger.info("Watching %s:%d", *self.address)
+        except OSError:
+            self.connection = None
+
+    def disconnect(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        self.images.clear()  # Art numbers start over with the next connection
+        self.reset()
+
+    def update(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.manager.clear()
+                    return
+                elif event.key == pygame.K_F11:
+                    toggle_fullscreen()
+
+        if self.connection is None:
+            self.connect()
+            return
+        while True:
+            try:
+                data = self.connection.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b''
+            if not data:
+                self.disconnect()  # The game quit; wait for it to come back
+                return
+            self.buffer += data
+            self.received.append((time.perf_counter(), len(data)))
+
+        # Apply every complete message; a partial one waits for the rest
+        buffer, offset, header = self.buffer, 0, SnapshotStream.HEADER
+        while len(buffer) - offset >= header.size:
+            length, kind, tick = header.unpack_from(buffer, offset)
+            if len(buffer) - offset - 4 < length:
+                break
+            self.apply(kind, tick, bytes(buffer[offset + header.size:offset + 4 + length]))
+            offset += 4 + length
+        del buffer[:offset]
 
-# Boss Bullet class
-class BossBullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, speed_x, speed_y, color):
-        super().__init__()
-        self.image = pygame.Surface((10, 10), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, color, (5, 5), 5)
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.centery = y
-        self.speed_x = speed_x
-        self.speed_y = speed_y
-        
-    def update(self):
-        self.rect.x += self.speed_x
-        self.rect.y += self.speed_y
-        # Kill if off screen
-        if (self.rect.left < -100 or self.rect.right > WIDTH + 100 or
-            self.rect.top < -100 or self.rect.bottom > HEIGHT + 100):
-            self.kill()
+    def apply(self, kind, tick, payload):
+        stream = SnapshotStream
+        if kind == stream.ART:
+            art, = stream.COUNT.unpack_from(payload)
+            self.images[art] = build_art(json_key(json.loads(payload[stream.COUNT.size:])))
+            return
+        self.tick = tick
+        self.score, self.level, self.boss_health = stream.STATE.unpack_from(payload)
+        offset = stream.STATE.size
+        count, = stream.COUNT.unpack_from(payload, offset)
+        offset += stream.COUNT.size
+        if kind == stream.KEYFRAME:
+            self.entities = {}
+            for _ in range(count):
+                entity_id, *record = stream.ENTITY.unpack_from(payload, offset)
+                self.entities[entity_id] = record
+                offset += stream.ENTITY.size
+            return
+
+        # Delta: removals, then changed and new entities
+        for entity_id, in stream.COUNT.iter_unpack(payload[offset:offset + count * stream.COUNT.size]):
+            self.entities.pop(entity_id, None)
+        offset += count * stream.COUNT.size
+        count, = stream.COUNT.unpack_from(payload, offset)
+        offset += stream.COUNT.size
+        for _ in range(count):
+            flags = payload[offset + 2]
+            layout = stream.change_format(flags)
+            entity_id, _, *values = layout.unpack_from(payload, offset)
+            offset += layout.size
+            record = self.entities.setdefault(entity_id, [0, 0, 0, 0])
+            values = iter(values)
+            if flags & stream.STEP_X:
+                record[1] += next(values)
+            elif flags & stream.MOVE_X:
+                record[1] = next(values)
+            if flags & stream.STEP_Y:
+                record[2] += next(values)
+            elif flags & stream.MOVE_Y:
+                record[2] = next(values)
+            if flags & stream.TURN:
+                record[3] = next(values)
+            if flags & stream.REART:
+                record[0] = next(values)
+
+    def draw(self):
+        screen.fill(BLACK)
+        images = self.images
+        for art, x, y, angle in self.entities.values():
+            image = images.get(art)
+            if image is None:
+                continue
+            # Culled before rotating, by the rotation's bounding square
+            reach = math.ceil(math.hypot(*image.get_size())) if angle else max(image.get_size())
+            if not viewport_culler.visible('spectated', pygame.Rect(x - reach // 2, y - reach // 2, reach, reach)):
+                continue
+            if angle:
+                image = pygame.transform.rotate(image, angle * 360 / 256)
+            screen.blit(image, image.get_rect(center=(x, y)))
+
+        if self.boss_health != SnapshotStream.NO_BOSS:
+            pygame.draw.rect(screen, (64, 64, 64), (WIDTH//2 - 400, 50, 800, 20))
+            pygame.draw.rect(screen, RED, (WIDTH//2 - 400, 50, 800 * self.boss_health // 1000, 20))
+        screen.blit(self.font.render(f"Score: {self.score}", True, WHITE), (10, 10))
+        screen.blit(self.font.render(f"Level: {self.level}", True, WHITE), (10, 50))
+
+        # Stream status
+        now = time.perf_counter()
+        while self.received and now - self.received[0][0] > 1.0:
+            self.received.popleft()
+        if self.connection is None:
+            status = f"Waiting for {self.address[0]}:{self.address[1]}..."
+        else:
+            status = (f"Spectating {self.address[0]}:{self.address[1]}  tick {self.tick}  "
+                      f"{len(self.entities)} entities  {sum(size for _, size in self.received) / 1024:.1f} KB/s")
+        status_text = self.small_font.render(status, True, LIGHT_GREY)
+        screen.blit(status_text, (WIDTH - status_text.get_width() - 10, HEIGHT - 30))
 
-# Function to get player name
+# Player name entry
 PLAYER_NAME = None  # Global variable to store player name
 
-def get_player_name():
-    global PLAYER_NAME
-    if PLAYER_NAME:  # If we already have a name, return it
-        return PLAYER_NAME
-        
-    font = pygame.font.Font(None, 36)
-    input_box = pygame.Rect(WIDTH//2 - 100, HEIGHT//2, 200, 32)
-    color_inactive = pygame.Color('lightskyblue3')
-    color_active = pygame.Color('dodgerblue2')
-    color = color_inactive
-    active = False
-    text = ''
-    done = False
-    
-    while not done:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+class NameEntryScene(Scene):
+    """Asks for the player's name, then moves on to the welcome screen"""
+    def enter(self):
+        self.font = pygame.font.Font(None, 36)
+        self.input_box = pygame.Rect(WIDTH//2 - 100, HEIGHT//2, 200, 32)
+        self.color_inactive = pygame.Color('lightskyblue3')
+        self.color_active = pygame.Color('dodgerblue2')
+        self.color = self.color_inactive
+        self.active = False
+        self.text = ''
+
+    def update(self, events):
+        global PLAYER_NAME
+        for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN:
-                active = input_box.collidepoint(event.pos)
-                color = color_active if active else color_inactive
+                self.active = self.input_box.collidepoint(event.pos)
+                self.color = self.color_active if self.active else self.color_inactive
             if event.type == pygame.KEYDOWN:
-                if active:
-                    if event.key == pygame.K_RETURN and text.strip():
-                        PLAYER_NAME = text  # Store the name globally
-                        return text
+                if self.active:
+                    if event.key == pygame.K_RETURN and self.text.strip():
+                        PLAYER_NAME = self.text  # Store the name globally
+                        self.manager.replace(WelcomeScene())
+                        return
                     elif event.key == pygame.K_BACKSPACE:
-                        text = text[:-1]
+                        self.text = self.text[:-1]
                     else:
-                        text += event.unicode
-        
+                        self.text += event.unicode
+
+    def draw(self):
         screen.fill(BLACK)
-        txt_surface = font.render("Enter your name:", True, WHITE)
+        txt_surface = self.font.render("Enter your name:", True, WHITE)
         width = max(200, txt_surface.get_width()+10)
-        input_box.w = width
+        self.input_box.w = width
         screen.blit(txt_surface, (WIDTH//2 - txt_surface.get_width()//2, HEIGHT//2 - 50))
-        txt_surface = font.render(text, True, color)
-        screen.blit(txt_surface, (input_box.x+5, input_box.y+5))
-        pygame.draw.rect(screen, color, input_box, 2)
-        pygame.display.flip()
+        txt_surface = self.font.render(self.text, True, self.color)
+        screen.blit(txt_surface, (self.input_box.x+5, self.input_box.y+5))
+        pygame.draw.rect(screen, self.color, self.input_box, 2)
 
 # Function to load high scores
 def load_high_scores():
@@ -1474,193 +4344,201 @@ def update_high_scores(player_name, score, level):
     save_high_scores(high_scores)
     return high_scores
 
-# Function to display high scores
-def display_high_scores(high_scores):
-    font_title = pygame.font.Font(None, 48)
-    font = pygame.font.Font(None, 36)
-    
-    title = font_title.render("HIGH SCORES", True, YELLOW)
-    
-    # Clear screen
-    screen.fill(BLACK)
-    screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 100))
-    
-    # Display each high score
-    y_pos = 180
-    for i, entry in enumerate(high_scores):
-        rank_text = font.render(f"{i+1}.", True, WHITE)
-        name_text = font.render(entry["name"], True, WHITE)
-        score_text = font.render(str(entry["score"]), True, WHITE)
-        level_text = font.render(f"Level {entry.get('level', 1)}", True, WHITE)
-        
-        screen.blit(rank_text, (WIDTH // 2 - 250, y_pos))
-        screen.blit(name_text, (WIDTH // 2 - 200, y_pos))
-        screen.blit(score_text, (WIDTH // 2 + 50, y_pos))
-        screen.blit(level_text, (WIDTH // 2 + 150, y_pos))
-        
-        y_pos += 40
-    
-    continue_text = font.render("Press any key to continue", True, WHITE)
-    screen.blit(continue_text, (WIDTH // 2 - continue_text.get_width() // 2, HEIGHT - 100))
-    
-    pygame.display.flip()
-    
-    # Wait for key press
-    # Create a clock outside the loop
-    clock = pygame.time.Clock()
-    waiting = True
-    while waiting:
-        clock.tick(60)  # Limit the loop to 60 FPS
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
-                waiting = False
-        
-        # No need to call pygame.event.pump() as pygame.event.get() already processes the event queue
-        pygame.display.update()  # Make sure the display updates
-    
-    # Return to welcome screen after viewing high scores
-    welcome_screen()
+# High score table, shown over the welcome screen until a key or click
+class HighScoresScene(Scene):
+    def __init__(self, high_scores):
+        super().__init__()
+        self.high_scores = high_scores
 
-# Ship selection screen
-def select_ship():
-    # Create detailed ship designs
-    def create_fighter_ship():
-        ship = pygame.Surface((60, 60), pygame.SRCALPHA)
-        # Main body
-        pygame.draw.polygon(ship, (100, 100, 255), [
-            (30, 0),   # Nose
-            (40, 20),  # Right hull
-            (45, 40),  # Right wing
-            (35, 45),  # Right engine
-            (25, 45),  # Left engine
-            (15, 40),  # Left wing
-            (20, 20)   # Left hull
-        ])
-        # Cockpit
-        pygame.draw.polygon(ship, (200, 200, 255), [
-            (30, 10),  # Top
-            (35, 25),  # Right
-            (25, 25)   # Left
-        ])
-        # Engine glow
-        pygame.draw.circle(ship, (255, 165, 0), (30, 45), 5)
-        pygame.draw.circle(ship, (255, 69, 0), (30, 45), 3)
-        return ship, 5  # Balanced speed
-
-    def create_interceptor_ship():
-        ship = pygame.Surface((60, 60), pygame.SRCALPHA)
-        # Main body
-        pygame.draw.polygon(ship, (100, 255, 100), [
-            (30, 0),   # Nose
-            (45, 30),  # Right hull
-            (40, 45),  # Right engine
-            (20, 45),  # Left engine
-            (15, 30)   # Left hull
-        ])
-        # Wings
-        pygame.draw.polygon(ship, (50, 200, 50), [
-            (45, 30),  # Right top
-            (55, 40),  # Right tip
-            (40, 45)   # Right bottom
-        ])
-        pygame.draw.polygon(ship, (50, 200, 50), [
-            (15, 30),  # Left top
-            (5, 40),   # Left tip
-            (20, 45)   # Left bottom
-        ])
-        # Cockpit
-        pygame.draw.ellipse(ship, (200, 255, 200), (25, 15, 10, 15))
-        # Engine glow
-        pygame.draw.circle(ship, (255, 165, 0), (30, 45), 6)
-        pygame.draw.circle(ship, (255, 69, 0), (30, 45), 4)
-        return ship, 7  # Fast speed
-
-    def create_assault_ship():
-        ship = pygame.Surface((60, 60), pygame.SRCALPHA)
-        # Main body
-        pygame.draw.polygon(ship, (255, 100, 100), [
-            (30, 0),   # Nose
-            (50, 25),  # Right hull
-            (45, 45),  # Right engine
-            (15, 45),  # Left engine
-            (10, 25)   # Left hull
-        ])
-        # Heavy armor plates
-        pygame.draw.polygon(ship, (200, 50, 50), [
-            (40, 15),  # Right top
-            (50, 25),  # Right middle
-            (45, 35)   # Right bottom
-        ])
-        pygame.draw.polygon(ship, (200, 50, 50), [
-            (20, 15),  # Left top
-            (10, 25),  # Left middle
-            (15, 35)   # Left bottom
-        ])
-        # Cockpit
-        pygame.draw.polygon(ship, (255, 200, 200), [
-            (30, 10),  # Top
-            (35, 20),  # Right
-            (25, 20)   # Left
-        ])
-        # Triple engine glow
-        pygame.draw.circle(ship, (255, 165, 0), (22, 45), 4)
-        pygame.draw.circle(ship, (255, 165, 0), (30, 45), 4)
-        pygame.draw.circle(ship, (255, 165, 0), (38, 45), 4)
-        pygame.draw.circle(ship, (255, 69, 0), (22, 45), 2)
-        pygame.draw.circle(ship, (255, 69, 0), (30, 45), 2)
-        pygame.draw.circle(ship, (255, 69, 0), (38, 45), 2)
-        return ship, 3  # Heavy but slow
-
-    ships = [
-        (create_fighter_ship(), "Fighter", "Balanced speed and maneuverability"),
-        (create_interceptor_ship(), "Interceptor", "Fast but fragile"),
-        (create_assault_ship(), "Assault", "Heavy armor, powerful weapons")
-    ]
-    
-    font = pygame.font.Font(None, 36)
-    title = font.render("Select Your Ship", True, WHITE)
-    
-    clock = pygame.time.Clock()
-    running = True
-    
-    while running:
+    def enter(self):
+        self.font_title = pygame.font.Font(None, 48)
+        self.font = pygame.font.Font(None, 36)
+        self.title = self.font_title.render("HIGH SCORES", True, YELLOW)
+
+    def update(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
+                # Back to the welcome screen
+                self.manager.pop()
+                return
+
+    def draw(self):
+        font = self.font
+        
+        # Clear screen
         screen.fill(BLACK)
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 50))
+        screen.blit(self.title, (WIDTH // 2 - self.title.get_width() // 2, 100))
+        
+        # Display each high score
+        y_pos = 180
+        for i, entry in enumerate(self.high_scores):
+            rank_text = font.render(f"{i+1}.", True, WHITE)
+            name_text = font.render(entry["name"], True, WHITE)
+            score_text = font.render(str(entry["score"]), True, WHITE)
+            level_text = font.render(f"Level {entry.get('level', 1)}", True, WHITE)
+            
+            screen.blit(rank_text, (WIDTH // 2 - 250, y_pos))
+            screen.blit(name_text, (WIDTH // 2 - 200, y_pos))
+            screen.blit(score_text, (WIDTH // 2 + 50, y_pos))
+            screen.blit(level_text, (WIDTH // 2 + 150, y_pos))
+            
+            y_pos += 40
         
-        # Handle events first
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
+        continue_text = font.render("Press any key to continue", True, WHITE)
+        screen.blit(continue_text, (WIDTH // 2 - continue_text.get_width() // 2, HEIGHT - 100))
+
+# Detailed ship designs, each returning its artwork and movement speed
+def create_fighter_ship():
+    ship = pygame.Surface((60, 60), pygame.SRCALPHA)
+    # Main body
+    pygame.draw.polygon(ship, (100, 100, 255), [
+        (30, 0),   # Nose
+        (40, 20),  # Right hull
+        (45, 40),  # Right wing
+        (35, 45),  # Right engine
+        (25, 45),  # Left engine
+        (15, 40),  # Left wing
+        (20, 20)   # Left hull
+    ])
+    # Cockpit
+    pygame.draw.polygon(ship, (200, 200, 255), [
+        (30, 10),  # Top
+        (35, 25),  # Right
+        (25, 25)   # Left
+    ])
+    # Engine glow
+    pygame.draw.circle(ship, (255, 165, 0), (30, 45), 5)
+    pygame.draw.circle(ship, (255, 69, 0), (30, 45), 3)
+    return ship, 5  # Balanced speed
+
+def create_interceptor_ship():
+    ship = pygame.Surface((60, 60), pygame.SRCALPHA)
+    # Main body
+    pygame.draw.polygon(ship, (100, 255, 100), [
+        (30, 0),   # Nose
+        (45, 30),  # Right hull
+        (40, 45),  # Right engine
+        (20, 45),  # Left engine
+        (15, 30)   # Left hull
+    ])
+    # Wings
+    pygame.draw.polygon(ship, (50, 200, 50), [
+        (45, 30),  # Right top
+        (55, 40),  # Right tip
+        (40, 45)   # Right bottom
+    ])
+    pygame.draw.polygon(ship, (50, 200, 50), [
+        (15, 30),  # Left top
+        (5, 40),   # Left tip
+        (20, 45)   # Left bottom
+    ])
+    # Cockpit
+    pygame.draw.ellipse(ship, (200, 255, 200), (25, 15, 10, 15))
+    # Engine glow
+    pygame.draw.circle(ship, (255, 165, 0), (30, 45), 6)
+    pygame.draw.circle(ship, (255, 69, 0), (30, 45), 4)
+    return ship, 7  # Fast speed
+
+def create_assault_ship():
+    ship = pygame.Surface((60, 60), pygame.SRCALPHA)
+    # Main body
+    pygame.draw.polygon(ship, (255, 100, 100), [
+        (30, 0),   # Nose
+        (50, 25),  # Right hull
+        (45, 45),  # Right engine
+        (15, 45),  # Left engine
+        (10, 25)   # Left hull
+    ])
+    # Heavy armor plates
+    pygame.draw.polygon(ship, (200, 50, 50), [
+        (40, 15),  # Right top
+        (50, 25),  # Right middle
+        (45, 35)   # Right bottom
+    ])
+    pygame.draw.polygon(ship, (200, 50, 50), [
+        (20, 15),  # Left top
+        (10, 25),  # Left middle
+        (15, 35)   # Left bottom
+    ])
+    # Cockpit
+    pygame.draw.polygon(ship, (255, 200, 200), [
+        (30, 10),  # Top
+        (35, 20),  # Right
+        (25, 20)   # Left
+    ])
+    # Triple engine glow
+    pygame.draw.circle(ship, (255, 165, 0), (22, 45), 4)
+    pygame.draw.circle(ship, (255, 165, 0), (30, 45), 4)
+    pygame.draw.circle(ship, (255, 165, 0), (38, 45), 4)
+    pygame.draw.circle(ship, (255, 69, 0), (22, 45), 2)
+    pygame.draw.circle(ship, (255, 69, 0), (30, 45), 2)
+    pygame.draw.circle(ship, (255, 69, 0), (38, 45), 2)
+    return ship, 3  # Heavy but slow
+
+# Registry key, creator, display name and description for each selectable ship
+SHIP_DESIGNS = [
+    (('ship', 'fighter'), create_fighter_ship, "Fighter", "Balanced speed and maneuverability"),
+    (('ship', 'interceptor'), create_interceptor_ship, "Interceptor", "Fast but fragile"),
+    (('ship', 'assault'), create_assault_ship, "Assault", "Heavy armor, powerful weapons")
+]
+
+# Ship selection screen
+class SelectShipScene(Scene):
+    """Picks a ship and starts the game with it; ESC goes back"""
+    def enter(self):
+        def register(key, create_ship):
+            # Ship art from the asset cache, handed to Ship by key
+            image, speed = asset_cache.art(key, create_ship)
+            assets.register(key, image)
+            return key, speed
+        
+        self.ships = [
+            (register(key, create_ship), name, desc)
+            for key, create_ship, name, desc in SHIP_DESIGNS
+        ]
+        
+        self.font = pygame.font.Font(None, 36)
+        self.title = self.font.render("Select Your Ship", True, WHITE)
+
+    def choose(self, ship_key, speed):
+        self.manager.replace(GameScene(ship_key, speed))
+
+    def update(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    return None
+                    self.manager.pop()
+                    return
                 elif event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
                     index = event.key - pygame.K_1
-                    if 0 <= index < len(ships):
-                        return ships[index][0]
+                    if 0 <= index < len(self.ships):
+                        self.choose(*self.ships[index][0])
+                        return
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click
                     mouse_pos = pygame.mouse.get_pos()
                     # Check each ship's click area
-                    for i, ((ship_img, speed), name, desc) in enumerate(ships):
+                    for i, ((ship_key, speed), name, desc) in enumerate(self.ships):
                         x = WIDTH // 4 * (i + 1)
                         y = HEIGHT // 2
                         # Create a larger click area
                         click_rect = pygame.Rect(x - 70, y - 70, 140, 140)
                         if click_rect.collidepoint(mouse_pos):
-                            return (ship_img, speed)
+                            self.choose(ship_key, speed)
+                            return
+
+    def draw(self):
+        font = self.font
+        screen.fill(BLACK)
+        screen.blit(self.title, (WIDTH//2 - self.title.get_width()//2, 50))
         
         # Display ship options
-        for i, ((ship_img, speed), name, desc) in enumerate(ships):
+        for i, ((ship_key, speed), name, desc) in enumerate(self.ships):
             x = WIDTH // 4 * (i + 1)
             y = HEIGHT // 2
             
             # Draw ship
+            ship_img = assets.images[ship_key]
             ship_rect = ship_img.get_rect(center=(x, y))
             screen.blit(ship_img, ship_rect)
             
@@ -1678,188 +4556,188 @@ def select_ship():
                         100 + int(abs(math.sin(pygame.time.get_ticks() * 0.003)) * 155),
                         255)
             pygame.draw.rect(screen, box_color, (x - 70, y - 70, 140, 140), 2)
-        
-        pygame.display.flip()
-        clock.tick(60)
-    
-    return None
 
-# Welcome screen function
-def welcome_screen():
-    global ESC_QUIT_GAME
-    
-    running = True
-    clock = pygame.time.Clock()
-    
-    while running:
+# Welcome screen: the base of the scene stack once a name is entered
+class WelcomeScene(Scene):
+    def enter(self):
+        self.title_font = pygame.font.Font(None, 74)
+        self.name_font = pygame.font.Font(None, 36)
+        self.menu_font = pygame.font.Font(None, 48)
+        self.resume()
+
+    def resume(self):
+        # A game may have saved or ended its run since the menu last showed
+        self.can_continue = SaveState.exists()
+
+    def update(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.manager.clear()  # Quit
+                    return
+                elif event.key == pygame.K_SPACE:
+                    # Start game flow: ship selection hands over to the game
+                    self.manager.push(SelectShipScene())
+                    return
+                elif event.key == pygame.K_c and self.can_continue:
+                    # Resume the saved run with its own ship
+                    saved = SaveState.load()
+                    if saved:
+                        self.manager.push(GameScene(saved.ship_key, saved.ship_speed, saved))
+                        return
+                    self.can_continue = False  # Unreadable, and discarded
+                elif event.key == pygame.K_s:
+                    self.manager.push(ShopScene())
+                    return
+                elif event.key == pygame.K_h:
+                    self.manager.push(HighScoresScene(load_high_scores()))
+                    return
+
+    def draw(self):
         screen.fill(BLACK)
         
         # Draw title with glow effect
-        title_font = pygame.font.Font(None, 74)
-        title = title_font.render("SPACE SHOOTER", True, WHITE)
+        title = self.title_font.render("SPACE SHOOTER", True, WHITE)
         # Create glow effect
         glow_color = (100 + int(abs(math.sin(pygame.time.get_ticks() * 0.003)) * 155),
                      100 + int(abs(math.sin(pygame.time.get_ticks() * 0.003)) * 155),
                      255)
-        glow_title = title_font.render("SPACE SHOOTER", True, glow_color)
+        glow_title = self.title_font.render("SPACE SHOOTER", True, glow_color)
         
         # Draw glow and main title
         screen.blit(glow_title, (WIDTH//2 - title.get_width()//2 + 2, HEIGHT//4 + 2))
         screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//4))
         
         # Draw player name
-        name_font = pygame.font.Font(None, 36)
-        name_text = name_font.render(f"Player: {PLAYER_NAME}", True, WHITE)
+        name_text = self.name_font.render(f"Player: {PLAYER_NAME}", True, WHITE)
         screen.blit(name_text, (WIDTH//2 - name_text.get_width()//2, HEIGHT//2))
         
         # Draw menu options with glow effect
-        menu_font = pygame.font.Font(None, 48)
         options = [
             ("Press SPACE to Play", pygame.K_SPACE),
+            *([("Press C to Continue", pygame.K_c)] if self.can_continue else []),
             ("Press S for Shop", pygame.K_s),
             ("Press H for High Scores", pygame.K_h),
             ("Press ESC to Quit", pygame.K_ESCAPE)
         ]
         
         for i, (text, key) in enumerate(options):
-            text_surface = menu_font.render(text, True, WHITE)
+            text_surface = self.menu_font.render(text, True, WHITE)
             y_pos = HEIGHT * 2//3 + i * 50
             screen.blit(text_surface, (WIDTH//2 - text_surface.get_width()//2, y_pos))
-        
-        pygame.display.flip()
-        clock.tick(60)
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                ESC_QUIT_GAME = True
-                return
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    ESC_QUIT_GAME = True
-                    return
-                elif event.key == pygame.K_SPACE:
-                    # Start game flow
-                    ship_info = select_ship()
-                    if ship_info:
-                        game()
-                        # Don't return here, let the welcome screen continue
-                elif event.key == pygame.K_s:
-                    shop_screen()
-                elif event.key == pygame.K_h:
-                    high_scores = load_high_scores()
-                    display_high_scores(high_scores)
 
-def display_rating_screen():
-    font_title = pygame.font.Font(None, 72)
-    font = pygame.font.Font(None, 36)
-    small_font = pygame.font.Font(None, 24)
-    
-    title = font_title.render("Rate The Game", True, YELLOW)
-    stars = 0  # Current rating
+class RatingScene(Scene):
+    """Rating after each game; five stars unlocks a level skip"""
     max_stars = 5
-    submitted = False
-    skip_levels = 0  # Number of levels to skip
-    choosing_levels = False  # Whether we're in level selection mode
-    
-    # Create star surfaces
-    empty_star = pygame.Surface((40, 40), pygame.SRCALPHA)
-    pygame.draw.polygon(empty_star, WHITE, [(20, 0), (25, 15), (40, 15), (28, 25),
-                                          (33, 40), (20, 30), (7, 40), (12, 25),
-                                          (0, 15), (15, 15)], 2)
-    
-    filled_star = pygame.Surface((40, 40), pygame.SRCALPHA)
-    pygame.draw.polygon(filled_star, YELLOW, [(20, 0), (25, 15), (40, 15), (28, 25),
-                                            (33, 40), (20, 30), (7, 40), (12, 25),
-                                            (0, 15), (15, 15)])
-    
-    clock = pygame.time.Clock()
-    running = True
-    
-    while running:
-        clock.tick(60)
-        screen.fill(BLACK)
-        
+
+    def enter(self):
+        self.font_title = pygame.font.Font(None, 72)
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        
+        self.title = self.font_title.render("Rate The Game", True, YELLOW)
+        self.stars = 0  # Current rating
+        self.submitted = False
+        self.skip_levels = 0  # Number of levels to skip
+        self.choosing_levels = False  # Whether we're in level selection mode
+        
+        # Create star surfaces
+        def create_star(filled):
+            star = pygame.Surface((40, 40), pygame.SRCALPHA)
+            pygame.draw.polygon(star, YELLOW if filled else WHITE,
+                                [(20, 0), (25, 15), (40, 15), (28, 25),
+                                 (33, 40), (20, 30), (7, 40), (12, 25),
+                                 (0, 15), (15, 15)], 0 if filled else 2)
+            return star
+        
+        self.empty_star = assets.get(('rating_star', False), lambda: create_star(False))
+        self.filled_star = assets.get(('rating_star', True), lambda: create_star(True))
+
+    def start_skipped_game(self):
+        # Save the level skip value to a file, then start the game flow from ship selection
+        try:
+            with open('level_skip.json', 'w') as f:
+                json.dump({'skip_levels': self.skip_levels}, f)
+            self.manager.replace(SelectShipScene())
+        except Exception as e:
+            logger.error("Error saving level skip: %s", e)
+
+    def update(self, events):
+        font = self.font
+        max_stars = self.max_stars
         mouse_x, mouse_y = pygame.mouse.get_pos()
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if not submitted and not choosing_levels:
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if not self.submitted and not self.choosing_levels:
                     # Star rating area
                     star_x = WIDTH//2 - (max_stars * 50)//2
                     star_y = HEIGHT//2 - 50
                     for i in range(max_stars):
                         star_rect = pygame.Rect(star_x + i * 50, star_y, 40, 40)
                         if star_rect.collidepoint(mouse_x, mouse_y):
-                            stars = i + 1
+                            self.stars = i + 1
                             sound_manager.play_powerup()  # Play sound when selecting stars
                 
                 # Submit button
                 submit_text = font.render("Submit", True, GREEN)
                 submit_rect = submit_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
-                if submit_rect.collidepoint(mouse_x, mouse_y) and not submitted and not choosing_levels:
-                    submitted = True
+                if submit_rect.collidepoint(mouse_x, mouse_y) and not self.submitted and not self.choosing_levels:
+                    self.submitted = True
                     sound_manager.play_powerup()
-                    if stars == 5:
-                        choosing_levels = True
+                    if self.stars == 5:
+                        self.choosing_levels = True
                 
                 # Level skip buttons when choosing levels
-                if choosing_levels:
+                if self.choosing_levels:
                     # Increase/decrease level skip buttons
                     if HEIGHT//2 - 50 <= mouse_y <= HEIGHT//2 + 50:
                         if WIDTH//2 - 100 <= mouse_x <= WIDTH//2 - 20:  # Left button
-                            skip_levels = max(0, skip_levels - 1)
+                            self.skip_levels = max(0, self.skip_levels - 1)
                             sound_manager.play_powerup()
                         elif WIDTH//2 + 20 <= mouse_x <= WIDTH//2 + 100:  # Right button
-                            skip_levels += 1
+                            self.skip_levels += 1
                             sound_manager.play_powerup()
                     
                     # Confirm button
                     confirm_text = font.render("Confirm", True, GREEN)
                     confirm_rect = confirm_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 100))
                     if confirm_rect.collidepoint(mouse_x, mouse_y):
-                        # Save the level skip value to a file
-                        try:
-                            with open('level_skip.json', 'w') as f:
-                                json.dump({'skip_levels': skip_levels}, f)
-                            game()  # Start the game immediately
-                            return  # Exit the rating screen
-                        except Exception as e:
-                            print(f"Error saving level skip: {e}")
+                        self.start_skipped_game()
+                        return
             
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    if choosing_levels:
-                        choosing_levels = False
-                        submitted = False
+                    if self.choosing_levels:
+                        self.choosing_levels = False
+                        self.submitted = False
                     else:
-                        running = False
-                elif event.key == pygame.K_RETURN and choosing_levels:
-                    # Save the level skip value to a file
-                    try:
-                        with open('level_skip.json', 'w') as f:
-                            json.dump({'skip_levels': skip_levels}, f)
-                        game()  # Start the game immediately
-                        return  # Exit the rating screen
-                    except Exception as e:
-                        print(f"Error saving level skip: {e}")
+                        # Back to the welcome screen
+                        self.manager.pop()
+                        return
+                elif event.key == pygame.K_RETURN and self.choosing_levels:
+                    self.start_skipped_game()
+                    return
+
+    def draw(self):
+        font = self.font
+        max_stars = self.max_stars
+        screen.fill(BLACK)
         
         # Draw title
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 100))
+        screen.blit(self.title, (WIDTH//2 - self.title.get_width()//2, 100))
         
-        if not choosing_levels:
+        if not self.choosing_levels:
             # Draw stars
             star_x = WIDTH//2 - (max_stars * 50)//2
             star_y = HEIGHT//2 - 50
             for i in range(max_stars):
-                if i < stars:
-                    screen.blit(filled_star, (star_x + i * 50, star_y))
+                if i < self.stars:
+                    screen.blit(self.filled_star, (star_x + i * 50, star_y))
                 else:
-                    screen.blit(empty_star, (star_x + i * 50, star_y))
+                    screen.blit(self.empty_star, (star_x + i * 50, star_y))
             
-            if not submitted:
+            if not self.submitted:
                 # Draw submit button
                 submit_text = font.render("Submit", True, GREEN)
                 screen.blit(submit_text, submit_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50)))
@@ -1873,14 +4751,14 @@ def display_rating_screen():
             screen.blit(skip_title, skip_title.get_rect(center=(WIDTH//2, HEIGHT//2 - 100)))
             
             # Draw decrease/increase buttons and level count
-            pygame.draw.polygon(screen, WHITE, [(WIDTH//2 - 100, HEIGHT//2), 
+            pygame.draw.polygon(screen, WHITE, [(WIDTH//2 - 100, HEIGHT//2),
                                              (WIDTH//2 - 20, HEIGHT//2 - 50),
                                              (WIDTH//2 - 20, HEIGHT//2 + 50)], 2)  # Left arrow
             pygame.draw.polygon(screen, WHITE, [(WIDTH//2 + 100, HEIGHT//2),
                                              (WIDTH//2 + 20, HEIGHT//2 - 50),
                                              (WIDTH//2 + 20, HEIGHT//2 + 50)], 2)  # Right arrow
             
-            level_text = font.render(str(skip_levels), True, WHITE)
+            level_text = font.render(str(self.skip_levels), True, WHITE)
             screen.blit(level_text, level_text.get_rect(center=(WIDTH//2, HEIGHT//2)))
             
             # Draw confirm button
@@ -1888,10 +4766,8 @@ def display_rating_screen():
             screen.blit(confirm_text, confirm_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 100)))
             
             # Draw instruction
-            instruction = small_font.render("Press ESC to go back or ENTER to confirm", True, WHITE)
+            instruction = self.small_font.render("Press ESC to go back or ENTER to confirm", True, WHITE)
             screen.blit(instruction, instruction.get_rect(center=(WIDTH//2, HEIGHT - 50)))
-        
-        pygame.display.flip()
 
 def load_level_skip():
     """Load the number of levels to skip"""
@@ -1901,210 +4777,540 @@ def load_level_skip():
                 data = json.load(f)
                 return data.get('skip_levels', 0)
     except Exception as e:
-        print(f"Error loading level skip: {e}")
+        logger.error("Error loading level skip: %s", e)
     return 0
 
-# Update game function to handle level skipping
-def game():
-    # Import math here for asteroid polygon generation
-    import math
-    import random
-    
-    # Load level skip value at game start
-    skip_levels = load_level_skip()
-    
-    # Initialize game objects and variables
-    star_field = StarField()
-    particle_system = ParticleSystem()
-    all_sprites = pygame.sprite.Group()
-    asteroids = pygame.sprite.Group()
-    enemies = pygame.sprite.Group()
-    bullets = pygame.sprite.Group()
-    enemy_bullets = pygame.sprite.Group()
-    power_ups = pygame.sprite.Group()
-    bombs = pygame.sprite.Group()
-    explosions = pygame.sprite.Group()
-    boss_group = pygame.sprite.Group()
-    boss_bullets = pygame.sprite.Group()
-    
-    # Get player name and select ship
-    player_name = get_player_name()
-    ship_img, ship_speed = select_ship()
-    
-    # Create player
-    player = Ship(ship_img, ship_speed, player_name)
-    all_sprites.add(player)
-    
-    # Initialize game state
-    score = 0
-    level = 1 + skip_levels  # Start at skipped level
-    game_over = False
-    game_paused = False
-    level_transition = True  # Start with transition to show skipped level
-    transition_start_time = pygame.time.get_ticks()
-    transition_duration = 1000  # 1 second
-    just_defeated_boss = False
-    
-    # Level settings
-    level_score_threshold = 1000 * level  # Scale threshold with skipped levels
-    asteroid_count = 6 + level  # Scale with level
-    enemy_count = 2 + level // 2  # Add enemy every 2 levels
-    
-    # Clear the level skip after using it
-    try:
-        with open('level_skip.json', 'w') as f:
-            json.dump({'skip_levels': 0}, f)
-    except Exception as e:
-        print(f"Error clearing level skip: {e}")
-    
-    # Create off-screen buffer for better performance
-    buffer_surface = pygame.Surface((WIDTH, HEIGHT))
-    
-    # Set up double buffering
-    pygame.display.set_mode((WIDTH, HEIGHT), pygame.DOUBLEBUF)
-    
-    # Initialize clock
-    clock = pygame.time.Clock()
-    
-    # Main game loop
-    running = True
-    while running:
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
+# Save states: the running game in a versioned binary file
+class SaveState:
+    """MAGIC and VERSION, then (tag, length, body) sections; keys go in a JSON table, timers as ages"""
+    MAGIC = b'SSAV'
+    VERSION = 1
+    PATH = 'savegame.bin'
+    HEADER = struct.Struct('<4sH')
+    SECTION = struct.Struct('<4sI')  # Tag, body length
+    # Score, level, threshold, counts, boss defeated, transition, ship, speed, name
+    GAME = struct.Struct('<qIqII??iHdH')
+    ARCHETYPE = struct.Struct('<HI')  # Class name key, entity count
+    PENDING = struct.Struct('<HH?')  # (class name, args) key, group mask, staged
+    PYTHON_RANDOM = struct.Struct('<i625I?d')
+    GROUPS = ('all_sprites', 'asteroids', 'enemies', 'bullets', 'enemy_bullets', 'power_ups', 'bombs',
+              'explosions', 'boss_group', 'boss_bullets', 'beams')  # New groups go last
+    STAGED = 1 << 15  # Group mask bit: built by the spawner, not handed over yet
+
+    def __init__(self, sections=None, path=PATH):
+        self.sections = sections or {}
+        self.path = path
+        self.keys = []
+        self.index = {}
+
+    def key(self, value):
+        index = self.index.get(value)
+        if index is None:
+            index = self.index[value] = len(self.keys)
+            self.keys.append(value)
+        return index
+
+    @staticmethod
+    def fields_format(cls):
+        return struct.Struct('<' + ''.join(code for _, code in cls.SAVED_FIELDS) + 'ii' + 'i' * len(cls.TIMERS))
+
+    @staticmethod
+    def timer_ages(sprite, now):
+        return [now - getattr(sprite, name, now) for name in sprite.TIMERS]
+
+    def group_bits(self, scene):
+        return {id(getattr(scene, name)): 1 << bit for bit, name in enumerate(self.GROUPS)}
+
+    def groups_of(self, scene, mask):
+        return [getattr(scene, name) for bit, name in enumerate(self.GROUPS) if mask & (1 << bit)]
+
+    # Writing
+    @classmethod
+    def save(cls, scene, path=PATH):
+        start = time.perf_counter()
+        state = cls()
+        now = game_clock.ticks()
+        sections = [state.write_game(scene, now), state.write_ship(scene.player, now), state.write_entities(scene, now),
+                    state.write_spawner(scene), state.write_random()]
+        boss = next(iter(scene.boss_group), None)
+        if boss is not None:
+            sections.append(state.write_boss(boss, now))
+        sections.append((b'KEYS', json.dumps(state.keys).encode()))
+        data = b''.join([cls.HEADER.pack(cls.MAGIC, cls.VERSION)] +
+                        [cls.SECTION.pack(tag, len(body)) + body for tag, body in sections])
+        try:
+            temporary = path + '.tmp'
+            with open(temporary, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.error("Error writing save state: %s", e)
+            return False
+        logger.info("Saved level %d to %s: %d bytes in %.2f ms", scene.level, path, len(data),
+                    (time.perf_counter() - start) * 1000)
+        return True
+
+    def write_game(self, scene, now):
+        transition_age = now - scene.transition_start_time if scene.level_transition else 0
+        return b'GAME', self.GAME.pack(scene.score, scene.level, scene.level_score_threshold, scene.asteroid_count,
+                                       scene.enemy_count, scene.just_defeated_boss, scene.level_transition,
+                                       transition_age, self.key(scene.ship_key), scene.ship_speed,
+                                       self.key(scene.player_name))
+
+    def write_ship(self, ship, now):
+        values = [getattr(ship, name) for name, _ in ship.SAVED_FIELDS]
+        body = self.fields_format(Ship).pack(*values, *ship.rect.topleft, *self.timer_ages(ship, now))
+        return b'SHIP', body + struct.pack('<H', self.key(tuple(sorted(ship.power_ups))))
+
+    def write_boss(self, boss, now):
+        values = [getattr(boss, name) for name, _ in boss.SAVED_FIELDS]
+        body = self.fields_format(Boss).pack(*values, *boss.rect.topleft, *self.timer_ages(boss, now))
+        return b'BOSS', struct.pack('<H', self.key(boss.image_key)) + body
+
+    def write_entities(self, scene, now):
+        # Everything in play, then the spawner's queue
+        bits = self.group_bits(scene)
+        staged = {sprite: sum(bits[id(group)] for group in groups) | self.STAGED
+                  for sprite, groups in scene.spawner.staged}
+        rows = defaultdict(list)  # Archetype -> [(order, slot, group mask, key, timer ages)]
+        for order, sprite in enumerate(list(scene.all_sprites) + list(staged)):
+            if not isinstance(sprite, ArrayEntity) or sprite.slot is None:
+                continue
+            archetype = type(sprite)
+            mask = staged.get(sprite) or sum(bits.get(id(group), 0) for group in sprite.groups())
+            key = self.key((sprite.image_key, *(getattr(sprite, name) for name in archetype.SAVED)))
+            rows[archetype].append((order, sprite.slot, mask, key, self.timer_ages(sprite, now)))
+
+        parts = []
+        for archetype, entries in rows.items():
+            store = archetype.store
+            orders, slots, masks, keys, ages = zip(*entries)
+            slots = numpy.array(slots)
+            parts.append(self.ARCHETYPE.pack(self.key(archetype.__name__), len(entries)))
+            parts.append(numpy.array(orders, numpy.uint32).tobytes())
+            parts.append(numpy.array(masks, numpy.uint16).tobytes())
+            parts.append(numpy.array(keys, numpy.uint16).tobytes())
+            parts.append(numpy.array(ages, numpy.int32).reshape(len(entries), len(archetype.TIMERS)).tobytes())
+            parts.extend(getattr(store, name)[slots].tobytes() for name in store.components)
+        return b'ENTS', b''.join(parts)
+
+    def write_spawner(self, scene):
+        bits = self.group_bits(scene)
+        parts = [struct.pack('<I', len(scene.spawner.pending))]
+        for factory, groups, staged in scene.spawner.pending:
+            key = self.key((factory.func.__name__, factory.args))  # Waves are queued as functools.partial
+            parts.append(self.PENDING.pack(key, sum(bits[id(group)] for group in groups), staged))
+        return b'SPWN', b''.join(parts)
+
+    def write_random(self):
+        version, internal, gauss = random.getstate()
+        python_state = self.PYTHON_RANDOM.pack(version, *internal, gauss is not None, gauss or 0.0)
+        return b'RAND', python_state + json.dumps(entity_rng.bit_generator.state).encode()
+
+    # Reading
+    @classmethod
+    def load(cls, path=PATH):
+        """The save state at path, or None if there isn't a usable one"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, version = cls.HEADER.unpack_from(data)
+            if magic != cls.MAGIC or version != cls.VERSION:
+                logger.warning("Discarding save state %s: format %r version %d", path, magic, version)
+                cls.discard(path)
+                return None
+            sections, offset = {}, cls.HEADER.size
+            while offset < len(data):
+                tag, length = cls.SECTION.unpack_from(data, offset)
+                offset += cls.SECTION.size
+                sections[tag] = data[offset:offset + length]
+                offset += length
+            state = cls(sections, path)
+            state.keys = [json_key(key) for key in json.loads(sections[b'KEYS'])]
+            game = cls.GAME.unpack_from(sections[b'GAME'])
+            state.level, state.ship_key, state.ship_speed = game[1], state.keys[game[8]], game[9]
+            boss_key = state.keys[struct.unpack_from('<H', sections[b'BOSS'])[0]] if b'BOSS' in sections else None
+        except OSError as e:
+            logger.error("Error reading save state %s: %s", path, e)
+            return None
+        except (struct.error, KeyError, IndexError, ValueError) as e:
+            logger.error("Discarding damaged save state %s: %s", path, e)
+            cls.discard(path)
+            return None
+        # Resuming skips ship selection, so register the art here
+        for key in (state.ship_key, boss_key):
+            if key is not None:
+                assets.get(key, lambda: build_art(key))
+        return state
+
+    @classmethod
+    def exists(cls, path=PATH):
+        return os.path.exists(path)
+
+    @classmethod
+    def discard(cls, path=PATH):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error("Error removing save state: %s", e)
+
+    def restore(self, scene):
+        """Put the saved game into a fresh GameScene; False if damaged"""
+        start = time.perf_counter()
+        try:
+            self.restore_sections(scene)
+        except (struct.error, KeyError, IndexError, ValueError) as e:
+            logger.error("Discarding damaged save state %s: %s", self.path, e)
+            self.discard(self.path)
+            return False
+        logger.info("Resumed level %d in %.2f ms", scene.level, (time.perf_counter() - start) * 1000)
+        return True
+
+    def restore_sections(self, scene):
+        now = game_clock.ticks()
+        keys, sections = self.keys, self.sections
+        (scene.score, scene.level, scene.level_score_threshold, scene.asteroid_count, scene.enemy_count,
+         scene.just_defeated_boss, scene.level_transition, transition_age, _, _, name) = self.GAME.unpack(sections[b'GAME'])
+        scene.transition_start_time = now - transition_age
+        scene.player_name = scene.player.player_name = keys[name]
+        self.restore_fields(scene.player, sections[b'SHIP'][:-2], now)
+        scene.player.power_ups = set(keys[struct.unpack('<H', sections[b'SHIP'][-2:])[0]])
+        scene.player.schedule_timers()  # From the restored start times
+
+        if b'BOSS' in sections:
+            body = sections[b'BOSS']
+            boss = Boss(keys[struct.unpack_from('<H', body)[0]][1])  # Art registered by load()
+            self.restore_fields(boss, body[2:], now)
+            boss.schedule_timers()
+            scene.all_sprites.add(boss)
+            scene.boss_group.add(boss)
+
+        self.restore_entities(scene, sections[b'ENTS'], now)
+        body = sections[b'SPWN']
+        archetypes = {archetype.__name__: archetype for archetype in entities.stores}
+        offset = 4
+        for _ in range(struct.unpack_from('<I', body)[0]):
+            key, mask, staged = self.PENDING.unpack_from(body, offset)
+            offset += self.PENDING.size
+            name, args = keys[key]
+            scene.spawner.pending.append((functools.partial(archetypes[name], *args),
+                                          tuple(self.groups_of(scene, mask)), staged))
+        self.restore_random(sections[b'RAND'])
+
+    def restore_fields(self, sprite, body, now):
+        cls = type(sprite)
+        values = self.fields_format(cls).unpack(body)
+        count = len(cls.SAVED_FIELDS)
+        for (name, _), value in zip(cls.SAVED_FIELDS, values):
+            setattr(sprite, name, value)
+        sprite.rect.topleft = values[count:count + 2]
+        for name, age in zip(cls.TIMERS, values[count + 2:]):
+            setattr(sprite, name, now - age)
+
+    def restore_entities(self, scene, body, now):
+        archetypes = {archetype.__name__: archetype for archetype in entities.stores}
+        placed, offset = [], 0
+        while offset < len(body):
+            name, count = self.ARCHETYPE.unpack_from(body, offset)
+            offset += self.ARCHETYPE.size
+            archetype = archetypes[self.keys[name]]
+            store = archetype.store
+
+            def column(dtype, width=1):
+                nonlocal offset
+                values = numpy.frombuffer(body, dtype, count * width, offset)
+                offset += values.nbytes
+                return values.reshape(count, width)
+
+            orders, masks, keys = column(numpy.uint32), column(numpy.uint16), column(numpy.uint16)
+            ages = column(numpy.int32, len(archetype.TIMERS))
+            components = {name: column(dtype)[:, 0] for name, dtype in store.components.items()}
+            for row in range(count):
+                image_key, *saved = self.keys[keys[row, 0]]
+                attributes = dict(zip(archetype.SAVED, saved))
+                attributes.update((name, now - int(age)) for name, age in zip(archetype.TIMERS, ages[row]))
+                entity = archetype.restore(image_key, attributes,
+                                           {name: values[row] for name, values in components.items()})
+                placed.append((int(orders[row, 0]), entity, int(masks[row, 0])))
+
+        # Back into the groups in drawing order
+        for _, entity, mask in sorted(placed, key=lambda entry: entry[0]):
+            groups = self.groups_of(scene, mask)
+            if mask & self.STAGED:
+                scene.spawner.staged.append((entity, tuple(groups)))
+                entity.store.active[entity.slot] = False
+            else:
+                for group in groups:
+                    group.add(entity)
+
+    def restore_random(self, body):
+        version, *values = self.PYTHON_RANDOM.unpack_from(body)
+        internal, has_gauss, gauss = values[:625], values[625], values[626]
+        random.setstate((version, tuple(internal), gauss if has_gauss else None))
+        entity_rng.bit_generator.state = json.loads(body[self.PYTHON_RANDOM.size:])
+
+# Game scene
+class GameScene(Scene):
+    """One play-through with the chosen ship"""
+    def __init__(self, ship_key, ship_speed, saved=None):
+        super().__init__()
+        self.ship_key = ship_key
+        self.ship_speed = ship_speed
+        self.saved = saved  # SaveState to resume instead of starting afresh
+
+    def enter(self):
+        # Load level skip value at game start
+        self.skip_levels = load_level_skip()
+        
+        # Initialize game objects and variables
+        entities.reset()
+        game_clock.reset()  # Game time, and every timer, start afresh with the game
+        self.star_field = StarField(ARGS.stars)
+        particle_system.clear()
+        self.all_sprites = pygame.sprite.Group()
+        self.asteroids = pygame.sprite.Group()
+        self.enemies = pygame.sprite.Group()
+        self.bullets = pygame.sprite.Group()
+        self.beams = pygame.sprite.Group()
+        self.enemy_bullets = pygame.sprite.Group()
+        self.power_ups = pygame.sprite.Group()
+        self.bombs = pygame.sprite.Group()
+        self.explosions = pygame.sprite.Group()
+        self.boss_group = pygame.sprite.Group()
+        self.boss_bullets = pygame.sprite.Group()
+        
+        # Create player with the ship picked in SelectShipScene
+        self.player_name = PLAYER_NAME
+        self.player = Ship(self.ship_key, self.ship_speed, self.player_name)
+        self.all_sprites.add(self.player)
+        
+        # Initialize game state
+        self.score = 0
+        self.level = 1 + self.skip_levels  # Start at skipped level
+        self.game_over = False
+        self.level_transition = True  # Start with transition to show skipped level
+        self.transition_start_time = game_clock.ticks()
+        self.transition_duration = 1000  # 1 second
+        self.just_defeated_boss = False
+        self.show_memory = False  # F3 memory statistics overlay (needs --memstats)
+        
+        # Level settings
+        self.level_score_threshold = 1000 * self.level  # Scale threshold with skipped levels
+        self.asteroid_count = 6 + self.level  # Scale with level
+        self.enemy_count = 2 + self.level // 2  # Add enemy every 2 levels
+        
+        # Build each wave in the background while the level transition plays
+        self.spawner = SpawnScheduler()
+        self.saved_time = None  # When F5 last saved, for the HUD note
+        resumed = self.saved is not None
+        if self.saved:
+            # A resumed run keeps its own level; a level skip waits
+            saved, self.saved = self.saved, None
+            if not saved.restore(self):
+                return self.enter()  # A fresh game with the same ship
+            self.arm(self.enemies)
+            self.arm(self.boss_group)
+        else:
+            self.queue_wave()
+            
+            # Clear the level skip after using it
+            try:
+                with open('level_skip.json', 'w') as f:
+                    json.dump({'skip_levels': 0}, f)
+            except Exception as e:
+                logger.error("Error clearing level skip: %s", e)
+        
+        # Set up double buffering
+        set_display_mode(pygame.DOUBLEBUF)
+        
+        # World layer, drawn at the configured render scale or by the texture renderer
+        self.render_view = TextureView(texture_display) if texture_display else RenderView(ARGS.render_scale)
+        
+        # Input latency and frame pacing are reported for this game alone
+        input_sampler.reset()
+        self.manager.pacer.reset()
+        self.running = True
+        self.frame_start = time.perf_counter()
+        telemetry.begin_run(self, resumed)
+
+    def queue_wave(self):
+        # Boss levels clear the field instead, so there is nothing to prebuild
+        if self.level % 5 == 0 and not self.just_defeated_boss:
+            return
+        self.spawner.queue(functools.partial(Asteroid, self.level), self.asteroid_count, self.all_sprites, self.asteroids)
+        self.spawner.queue(functools.partial(EnemyShip, self.level), self.enemy_count, self.all_sprites, self.enemies)
+
+    def arm(self, sprites):
+        # Each enemy's and boss's next shot is a game clock timer
+        for sprite in sprites:
+            if isinstance(sprite, EnemyShip):
+                game_clock.schedule_at(sprite.last_shot + sprite.shoot_delay, self.enemy_fire, sprite)
+            elif isinstance(sprite, Boss):
+                game_clock.schedule_at(sprite.last_shot + sprite.shoot_delay, self.boss_fire, sprite)
+
+    def enemy_fire(self, enemy):
+        if not enemy.alive():
+            return  # Gone; the timer lapses
+        bullet = enemy.shoot()
+        self.all_sprites.add(bullet)
+        self.enemy_bullets.add(bullet)
+        game_clock.schedule_at(enemy.last_shot + enemy.shoot_delay, self.enemy_fire, enemy)
+
+    def boss_fire(self, boss):
+        if not boss.alive():
+            return
+        bullets = boss.shoot(self.player)
+        self.all_sprites.add(bullets)
+        self.boss_bullets.add(bullets)
+        game_clock.schedule_at(boss.last_shot + boss.shoot_delay, self.boss_fire, boss)
+
+    def update(self, events):
+        self.frame_start = time.perf_counter()  # Frame work time, to the end of draw()
+        
+        # This tick's input sample
+        for event in events:
+            if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     # Kill player when ESC is pressed
-                    running = False
+                    self.running = False
+                    telemetry.died(self, 'self_destruct')
                     # Create explosion effect
-                    explosion = Explosion(player.rect.centerx, player.rect.centery)
-                    explosion.radius = 400
-                    explosion.growth_rate = 40
-                    all_sprites.add(explosion)
-                    explosions.add(explosion)
-                    sound_manager.play_explosion()
+                    explosion = Explosion(self.player.rect.centerx, self.player.rect.centery, radius=400)
+                    self.all_sprites.add(explosion)
+                    self.explosions.add(explosion)
+                    sound_manager.play_explosion(self.player.rect.center)
                     # Wait for explosion animation
                     pygame.time.wait(500)
-                elif event.key == pygame.K_SPACE and not game_paused and not level_transition:
-                    # Player shooting
-                    new_bullets = player.shoot()
-                    for bullet in new_bullets:
-                        all_sprites.add(bullet)
-                        bullets.add(bullet)
+                elif event.key == pygame.K_SPACE and not game_clock.paused and not self.level_transition:
+                    # Player shooting: bullets, or one beam for a wide volley
+                    for shot in self.player.shoot():
+                        self.all_sprites.add(shot)
+                        (self.beams if isinstance(shot, Beam) else self.bullets).add(shot)
                 elif event.key == pygame.K_F11:
                     toggle_fullscreen()
+                elif event.key == pygame.K_F3:
+                    self.show_memory = not self.show_memory
+                elif event.key == pygame.K_F5:
+                    if SaveState.save(self):
+                        self.saved_time = pygame.time.get_ticks()
+                elif event.key == pygame.K_p:
+                    game_clock.toggle_pause()
+                elif event.key == pygame.K_MINUS:
+                    game_clock.change_scale(-1)  # Slow motion
+                elif event.key == pygame.K_EQUALS:
+                    game_clock.change_scale(1)  # Fast-forward
+        
+        # The game clock decides how many steps this frame runs: none while paused
+        for _ in range(game_clock.steps()):
+            self.step()
+            if not self.running:
+                break
+        if self.manager is None:
+            return  # The Omega Boss reset has already gone back to the menu
         
-        if game_paused:
-            # Draw pause menu
-            pause_font = pygame.font.Font(None, 74)
-            pause_text = pause_font.render("PAUSED", True, WHITE)
-            screen.blit(pause_text, (WIDTH//2 - pause_text.get_width()//2, HEIGHT//2))
-            pygame.display.flip()
-            continue
+        # Spectators get this frame's outcome
+        if snapshot_stream:
+            snapshot_stream.publish(self)
+        
+        # Game over - Show rating screen
+        if not self.running:
+            self.manager.replace(RatingScene())
+
+    def step(self):
+        """One simulation step: advance the clock, then move and collide"""
+        game_clock.advance()
         
         # Handle level transition
-        if level_transition:
-            current_time = pygame.time.get_ticks()
-            if current_time - transition_start_time > transition_duration:
-                level_transition = False
+        if self.level_transition:
+            current_time = game_clock.ticks()
+            if current_time - self.transition_start_time > self.transition_duration:
+                self.level_transition = False
+                self.arm(self.spawner.hand_over())
+                memory_tracker.sample(f"level {self.level}")
+                telemetry.level_start(self)
                 
                 # Spawn boss if it's a boss level
-                if level % 5 == 0 and not boss_group and not just_defeated_boss:
+                if self.level % 5 == 0 and not self.boss_group and not self.just_defeated_boss:
                     # Clear all enemies and asteroids
-                    for sprite in [asteroids, enemies, power_ups, bombs]:
+                    for sprite in [self.asteroids, self.enemies, self.power_ups, self.bombs]:
                         for obj in sprite:
                             obj.kill()
                     
                     # Create boss
-                    boss = Boss(level)
-                    all_sprites.add(boss)
-                    boss_group.add(boss)
+                    boss = Boss(self.level)
+                    self.all_sprites.add(boss)
+                    self.boss_group.add(boss)
+                    self.arm([boss])
+                    telemetry.boss_spawn(self, boss)
                     
                     # Special effects for boss entrance
-                    if level == 50:  # Omega Boss entrance
+                    if self.level == 50:  # Omega Boss entrance
                         for _ in range(5):
                             x = random.randint(0, WIDTH)
                             y = random.randint(0, HEIGHT//2)
-                            explosion = Explosion(x, y)
-                            explosion.radius = 200
-                            explosion.growth_rate = 30
-                            all_sprites.add(explosion)
-                            explosions.add(explosion)
-                        sound_manager.play_explosion()
+                            explosion = Explosion(x, y, radius=200)
+                            self.all_sprites.add(explosion)
+                            self.explosions.add(explosion)
+                        sound_manager.play_explosion((x, y))
                         pygame.time.wait(100)
-                        sound_manager.play_explosion()
+                        sound_manager.play_explosion(boss.rect.center)
                     else:
-                        sound_manager.play_explosion()
-                else:
-                    # Spawn regular enemies and asteroids
-                    for i in range(asteroid_count):
-                        asteroid = Asteroid(level)
-                        all_sprites.add(asteroid)
-                        asteroids.add(asteroid)
-                    
-                    for i in range(enemy_count):
-                        enemy = EnemyShip(level)
-                        all_sprites.add(enemy)
-                        enemies.add(enemy)
-        
-        # Update game state
-        all_sprites.update()
-        
-        # Enemy shooting
-        for enemy in enemies:
-            bullet = enemy.shoot()
-            if bullet:
-                all_sprites.add(bullet)
-                enemy_bullets.add(bullet)
-        
-        # Boss shooting and updates
-        if boss_group:
-            # Boss shooting
-            for boss in boss_group:
-                new_bullets = boss.shoot(player)
-                for bullet in new_bullets:
-                    all_sprites.add(bullet)
-                    boss_bullets.add(bullet)
-            
-            # Check for player bullet hits on boss
-            hits = pygame.sprite.groupcollide(boss_group, bullets, False, True)
-            for boss, bullets_hit in hits.items():
-                boss.health -= 10 * len(bullets_hit)
-                sound_manager.play_collision()
+                        sound_manager.play_explosion(boss.rect.center)
+            else:
+                # Build part of the next wave within this frame's budget
+                self.spawner.run()
+        elif self.spawner.pending:
+            # Respawns queued by collisions
+            self.arm(self.spawner.run())
+        
+        # Player and boss update themselves, everything else in batches
+        self.player.update()
+        self.boss_group.update()
+        entities.update()
+        sound_manager.listener = self.player.rect.center
+        particle_system.update()
+        self.star_field.update(self.player.velocity_x, self.player.velocity_y)
+        
+        # Boss hits and updates; the boss fires by its shot timer (see boss_fire)
+        if self.boss_group:
+            # Check for player bullet and beam hits on boss, as (point, bullets' worth) each
+            hits = sweep_collide(self.boss_group, self.bullets, False, True)
+            strikes = {boss: [(bullet.rect.center, 1) for bullet in bullets_hit] for boss, bullets_hit in hits.items()}
+            for beam in self.beams:
+                for boss, lanes in beam.strike(self.boss_group, kills=False).items():
+                    strikes.setdefault(boss, []).extend(lanes)
+            for boss, struck in strikes.items():
+                boss.health -= Beam.DAMAGE * sum(weight for _, weight in struck)
+                sound_manager.play_collision(struck[0][0])
                 
                 # Create explosion effect for each hit
-                for bullet in bullets_hit:
-                    explosion = Explosion(bullet.rect.centerx, bullet.rect.centery)
-                    explosion.radius = 30
-                    explosion.growth_rate = 5
-                    explosion.max_frames = 5
-                    all_sprites.add(explosion)
-                    explosions.add(explosion)
+                for (x, y), _ in struck:
+                    explosion = Explosion(x, y, radius=30, max_frames=5)
+                    self.all_sprites.add(explosion)
+                    self.explosions.add(explosion)
                 
                 # Check if boss is defeated
                 if boss.health <= 0:
                     boss.kill()
+                    telemetry.boss_defeat(self, boss)
                     # Create massive explosion
-                    explosion = Explosion(boss.rect.centerx, boss.rect.centery)
-                    explosion.radius = 400
-                    explosion.growth_rate = 40
-                    all_sprites.add(explosion)
-                    explosions.add(explosion)
-                    sound_manager.play_explosion()
+                    explosion = Explosion(boss.rect.centerx, boss.rect.centery, radius=400)
+                    self.all_sprites.add(explosion)
+                    self.explosions.add(explosion)
+                    sound_manager.play_explosion(boss.rect.center)
                     
                     # Check if this was the Omega Boss (Level 50)
-                    if level == 50 and player_name != "0987654321hq":
+                    if self.level == 50 and self.player_name != "0987654321hq":
                         # Create multiple explosions for epic effect
                         for _ in range(10):
                             x = random.randint(0, WIDTH)
                             y = random.randint(0, HEIGHT)
-                            explosion = Explosion(x, y)
-                            explosion.radius = 300
-                            explosion.growth_rate = 35
-                            all_sprites.add(explosion)
-                            explosions.add(explosion)
-                            sound_manager.play_explosion()
+                            explosion = Explosion(x, y, radius=300)
+                            self.all_sprites.add(explosion)
+                            self.explosions.add(explosion)
+                            sound_manager.play_explosion((x, y))
                             pygame.time.wait(100)
                         
                         # Show congratulations message
@@ -2117,7 +5323,7 @@ def game():
                         screen.blit(congrats_text, (WIDTH//2 - congrats_text.get_width()//2, HEIGHT//2 - 100))
                         screen.blit(omega_text, (WIDTH//2 - omega_text.get_width()//2, HEIGHT//2))
                         screen.blit(reset_text, (WIDTH//2 - reset_text.get_width()//2, HEIGHT//2 + 100))
-                        pygame.display.flip()
+                        present_display()
                         pygame.time.wait(5000)  # Wait 5 seconds
                         
                         # Reset everything
@@ -2138,23 +5344,24 @@ def game():
                             with open('high_scores.json', 'w') as f:
                                 json.dump([], f)
                             
-                            # Return to main menu
-                            running = False
-                            return score
+                            # Return to main menu; nothing to resume
+                            self.running = False
+                            self.manager.pop()
+                            return
                             
                         except Exception as e:
-                            print(f"Error resetting game state: {e}")
+                            logger.error("Error resetting game state: %s", e)
                     
                     # Regular boss defeat rewards
-                    boss_bonus = 5000 * (level // 5)
-                    score += boss_bonus
+                    boss_bonus = 5000 * (self.level // 5)
+                    self.score += boss_bonus
                     
                     # Special message for secret name player passing level 50
-                    if level >= 50 and player_name == "0987654321hq":
+                    if self.level >= 50 and self.player_name == "0987654321hq":
                         font = pygame.font.Font(None, 48)
                         secret_text = font.render("Secret Mode: Beyond Level 50!", True, PURPLE)
                         screen.blit(secret_text, (WIDTH//2 - secret_text.get_width()//2, HEIGHT//2))
-                        pygame.display.flip()
+                        present_display()
                         pygame.time.wait(2000)
                     
                     # Spawn power-ups
@@ -2162,149 +5369,141 @@ def game():
                         x = boss.rect.centerx + random.randint(-100, 100)
                         y = boss.rect.centery + random.randint(-100, 100)
                         power_up = PowerUp(x, y)
-                        all_sprites.add(power_up)
-                        power_ups.add(power_up)
+                        self.all_sprites.add(power_up)
+                        self.power_ups.add(power_up)
                     
                     # Set next level threshold and flag
-                    level_score_threshold = score + 1000
-                    just_defeated_boss = True
+                    self.level_score_threshold = self.score + 1000
+                    self.just_defeated_boss = True
                     
                     # Move to next level
-                    level += 1
-                    level_transition = True
-                    transition_start_time = pygame.time.get_ticks()
+                    telemetry.level_end(self, 'cleared')
+                    self.level += 1
+                    self.level_transition = True
+                    self.transition_start_time = game_clock.ticks()
+                    self.spawner.clear()
+                    self.queue_wave()
         
         # Check for collisions in regular levels
-        if not boss_group:
-            # Player bullet hits asteroid
-            hits = pygame.sprite.groupcollide(asteroids, bullets, True, True)
-            for hit in hits:
-                score += 50
-                # Create new asteroid
-                asteroid = Asteroid(level)
-                all_sprites.add(asteroid)
-                asteroids.add(asteroid)
+        if not self.boss_group:
+            # Beams first: each lane takes the first asteroid or enemy in its path
+            struck = {}
+            for beam in self.beams:
+                struck.update(beam.strike(self.asteroids, self.enemies))
+            struck_asteroids = [target for target in struck if self.asteroids.has(target)]
+            struck_enemies = [target for target in struck if self.enemies.has(target)]
+            for target in struck:
+                target.kill()
+            
+            # Player bullet hits asteroid, swept so fast shots can't tunnel
+            hits = sweep_collide(self.asteroids, self.bullets, True, True)
+            for hit in [*struck_asteroids, *hits]:
+                self.score += 50
+                # Queue a replacement asteroid
+                self.spawner.queue(functools.partial(Asteroid, self.level), 1, self.all_sprites, self.asteroids, staged=False)
                 
                 # Small chance to spawn power-up from asteroid
                 if random.random() < 0.1:  # 10% chance
                     power_up = PowerUp(hit.rect.centerx, hit.rect.centery)
-                    all_sprites.add(power_up)
-                    power_ups.add(power_up)
+                    self.all_sprites.add(power_up)
+                    self.power_ups.add(power_up)
             
             # Player bullet hits enemy
-            hits = pygame.sprite.groupcollide(enemies, bullets, True, True)
-            for hit in hits:
-                score += 100
-                # Create new enemy
-                enemy = EnemyShip(level)
-                all_sprites.add(enemy)
-                enemies.add(enemy)
+            hits = sweep_collide(self.enemies, self.bullets, True, True)
+            for hit in [*struck_enemies, *hits]:
+                self.score += 100
+                # Queue a replacement enemy
+                self.spawner.queue(functools.partial(EnemyShip, self.level), 1, self.all_sprites, self.enemies, staged=False)
                 
                 # Higher chance to spawn power-up from enemy
                 if random.random() < 0.3:  # 30% chance
                     power_up = PowerUp(hit.rect.centerx, hit.rect.centery)
-                    all_sprites.add(power_up)
-                    power_ups.add(power_up)
+                    self.all_sprites.add(power_up)
+                    self.power_ups.add(power_up)
         
         # Check if player collects power-up
-        power_up_hits = pygame.sprite.spritecollide(player, power_ups, True)
+        power_up_hits = pygame.sprite.spritecollide(self.player, self.power_ups, True)
         for power_up in power_up_hits:
-            player.add_power_up(power_up.type)
-            score += 25  # Bonus points for collecting power-up
+            self.player.add_power_up(power_up.type)
+            telemetry.power_up(self, power_up.type)
+            self.score += 25  # Bonus points for collecting power-up
         
         # Check if player is hit
-        if not player.is_invincible:
-            # Check collisions with all hazards
-            for hazard_group in [asteroids, enemies, enemy_bullets, boss_bullets]:
-                if pygame.sprite.spritecollide(player, hazard_group, True):
-                    running = False
+        if not self.player.is_invincible:
+            # Check collisions with all hazards, bullets swept
+            for cause in ('asteroids', 'enemies', 'enemy_bullets', 'boss_bullets'):
+                if pygame.sprite.spritecollide(self.player, getattr(self, cause), True, collide_swept):
+                    self.running = False
+                    telemetry.died(self, cause)
         
         # Check for level advancement in regular levels
-        if not boss_group and score >= level_score_threshold and not level_transition:
-            level += 1
-            level_transition = True
-            transition_start_time = pygame.time.get_ticks()
+        if not self.boss_group and self.score >= self.level_score_threshold and not self.level_transition:
+            telemetry.level_end(self, 'cleared')
+            self.level += 1
+            self.level_transition = True
+            self.transition_start_time = game_clock.ticks()
             
             # Update level settings
-            level_score_threshold = score + 1000
-            asteroid_count = 6 + level
-            enemy_count = 2 + level // 2
+            self.level_score_threshold = self.score + 1000
+            self.asteroid_count = 6 + self.level
+            self.enemy_count = 2 + self.level // 2
             
             # Clear existing enemies and asteroids
-            for sprite in asteroids:
+            for sprite in self.asteroids:
                 sprite.kill()
-            for sprite in enemies:
+            for sprite in self.enemies:
                 sprite.kill()
+            
+            # Drop stale respawns and start building the next wave
+            self.spawner.clear()
+            self.queue_wave()
+
+    def draw(self):
+        if game_clock.paused:
+            # Draw pause menu
+            pause_font = pygame.font.Font(None, 74)
+            pause_text = pause_font.render("PAUSED", True, WHITE)
+            screen.blit(pause_text, (WIDTH//2 - pause_text.get_width()//2, HEIGHT//2))
+            hint_text = pygame.font.Font(None, 36).render("Press P to resume", True, WHITE)
+            screen.blit(hint_text, (WIDTH//2 - hint_text.get_width()//2, HEIGHT//2 + 70))
+            return
         
-        # Clear screen and draw
-        screen.fill(BLACK)
+        # Clear the world layer and draw
+        self.render_view.begin()
         
         # Draw starfield first (background)
-        star_field.update(player.velocity_x, player.velocity_y)
-        star_field.draw(screen)
+        self.star_field.draw(self.render_view)
         
         # Draw particles
-        particle_system.update()
-        particle_system.draw(screen)
+        particle_system.draw(self.render_view)
         
-        # Draw all sprites
-        all_sprites.draw(screen)
+        # Draw the sprites on screen
+        self.render_view.draw_sprites(viewport_culler.sprites(self.all_sprites))
+        self.render_view.present()
         
         # Draw UI
         font = pygame.font.Font(None, 36)
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        level_text = font.render(f"Level: {level}", True, WHITE)
+        score_text = font.render(f"Score: {self.score}", True, WHITE)
+        level_text = font.render(f"Level: {self.level}", True, WHITE)
         screen.blit(score_text, (10, 10))
         screen.blit(level_text, (10, 50))
+        if game_clock.scale != 1.0:
+            scale_text = font.render(f"Speed x{game_clock.scale:g}", True, LIGHT_BLUE)
+            screen.blit(scale_text, (WIDTH - scale_text.get_width() - 10, HEIGHT - 40))
         
         # Draw active power-up icons
         icon_size = 30
         icon_spacing = 40
         icon_y = 90
-        for i, power_up_type in enumerate(player.power_ups):
-            icon = pygame.Surface((icon_size, icon_size), pygame.SRCALPHA)
-            
-            if power_up_type == PowerUp.RAPID_FIRE:
-                color = YELLOW
-                # Draw lightning bolt
-                points = [(icon_size//2, 0), (icon_size, icon_size//2), 
-                         (icon_size*2//3, icon_size*3//5), (icon_size, icon_size), 
-                         (0, icon_size*3//5), (icon_size//3, icon_size*2//5)]
-                pygame.draw.polygon(icon, color, points)
-            elif power_up_type == PowerUp.DOUBLE_SHOT:
-                color = PURPLE
-                # Draw double circle
-                pygame.draw.circle(icon, color, (icon_size//4, icon_size//2), icon_size//4)
-                pygame.draw.circle(icon, color, (icon_size*3//4, icon_size//2), icon_size//4)
-            elif power_up_type == PowerUp.TRIPLE_SHOT:
-                color = RED
-                # Draw triple circle
-                pygame.draw.circle(icon, color, (icon_size//5, icon_size//2), icon_size//5)
-                pygame.draw.circle(icon, color, (icon_size//2, icon_size//4), icon_size//5)
-                pygame.draw.circle(icon, color, (icon_size*4//5, icon_size//2), icon_size//5)
-            elif power_up_type == PowerUp.SUPER_RAPID_FIRE:
-                color = ORANGE
-                # Draw double lightning bolt
-                points1 = [(icon_size//4, 0), (icon_size//2, icon_size//2), 
-                          (icon_size//3, icon_size*3//5), (icon_size//2, icon_size), 
-                          (0, icon_size*3//5), (icon_size//6, icon_size//2)]
-                points2 = [(icon_size*3//4, 0), (icon_size, icon_size//2), 
-                          (icon_size*5//6, icon_size*3//5), (icon_size, icon_size), 
-                          (icon_size//2, icon_size*3//5), (icon_size*2//3, icon_size//2)]
-                pygame.draw.polygon(icon, color, points1)
-                pygame.draw.polygon(icon, color, points2)
-            elif power_up_type == PowerUp.RAPID_MOVEMENT:
-                color = LIGHT_BLUE
-                # Draw speed arrows
-                pygame.draw.polygon(icon, color, [(0, icon_size//2), (icon_size//2, icon_size//4), 
-                                                (icon_size//2, icon_size*3//4)])
-                pygame.draw.polygon(icon, color, [(icon_size//2, icon_size//2), (icon_size, icon_size//4), 
-                                                (icon_size, icon_size*3//4)])
+        for i, power_up_type in enumerate(self.player.power_ups):
+            # HUD icons are the pickup artwork, already built and converted
+            icon = assets.get(('power_up', power_up_type), lambda: PowerUp.create_image(power_up_type))
+            color = PowerUp.COLORS[power_up_type]
             
             screen.blit(icon, (10 + i * icon_spacing, icon_y))
             
             # Draw remaining time bar
-            time_remaining = (player.power_up_duration - (pygame.time.get_ticks() - player.power_up_start)) / player.power_up_duration
+            time_remaining = (self.player.power_up_duration - (game_clock.ticks() - self.player.power_up_start)) / self.player.power_up_duration
             if time_remaining > 0:
                 bar_width = icon_size
                 bar_height = 4
@@ -2313,7 +5512,7 @@ def game():
                                                int(bar_width * time_remaining), bar_height))
         
         # Draw boss health bar if boss exists
-        for boss in boss_group:
+        for boss in self.boss_group:
             # Draw boss health bar
             health_width = 800
             health_height = 20
@@ -2339,29 +5538,54 @@ def game():
                                (health_x, health_y, current_width, health_height))
         
         # Draw level transition
-        if level_transition:
-            alpha = min(255, int(255 * (pygame.time.get_ticks() - transition_start_time) / transition_duration))
+        if self.level_transition:
+            alpha = min(255, int(255 * (game_clock.ticks() - self.transition_start_time) / self.transition_duration))
             transition_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
             transition_surface.fill((0, 0, 0, alpha))
             
             # Draw level text
             level_font = pygame.font.Font(None, 74)
-            if level % 5 == 0:
-                level_text = level_font.render(f"BOSS LEVEL {level}", True, RED)
+            if self.level % 5 == 0:
+                level_text = level_font.render(f"BOSS LEVEL {self.level}", True, RED)
             else:
-                level_text = level_font.render(f"LEVEL {level}", True, WHITE)
+                level_text = level_font.render(f"LEVEL {self.level}", True, WHITE)
             
             text_rect = level_text.get_rect(center=(WIDTH//2, HEIGHT//2))
             screen.blit(transition_surface, (0, 0))
             screen.blit(level_text, text_rect)
         
-        # Update display
-        pygame.display.flip()
-        clock.tick(60)
-    
-    # Game over - Show rating screen
-    display_rating_screen()
-    return score
+        if self.saved_time is not None and pygame.time.get_ticks() - self.saved_time < 1500:
+            saved_text = font.render("Game saved", True, GREEN)
+            screen.blit(saved_text, (WIDTH - saved_text.get_width() - 10, 10))
+        
+        if self.show_memory and memory_tracker.enabled:
+            memory_tracker.draw(screen)
+        
+        telemetry.frame((time.perf_counter() - self.frame_start) * 1000, len(self.all_sprites),
+                        len(particle_system.particles))
+
+    def exit(self):
+        # Quitting mid-run keeps the save; dying ends it
+        if self.running:
+            SaveState.save(self)
+        else:
+            SaveState.discard()
+        
+        memory_tracker.dump(ARGS.memstats_json)
+        asset_cache.save()  # Keep art drawn this game for next launch
+        log_event_counts(f"Game events (level {self.level}, score {self.score})")
+        input_sampler.report()
+        self.manager.pacer.report()
+        viewport_culler.report()
+        if snapshot_stream:
+            snapshot_stream.report()
+        telemetry.end_run(self)
+        
+        # Nothing from this game outlives the scene
+        self.spawner.clear()
+        entities.reset()
+        particle_system.clear()
+        game_clock.reset()
 
 # After the high scores functions, add persistent score management
 def load_total_score():
@@ -2379,7 +5603,7 @@ def save_total_score(score):
         with open('total_score.json', 'w') as f:
             json.dump({'total_score': score}, f)
     except Exception as e:
-        print(f"Error saving total score: {e}")
+        logger.error("Error saving total score: %s", e)
 
 # Add shop items and shop function after the high scores functions
 class ShopItem:
@@ -2401,37 +5625,56 @@ SHOP_ITEMS = [
     ShopItem("Shield", "Start with temporary invincibility", 4000, "shield_time", 5),
 ]
 
-def shop_screen():
-    font_title = pygame.font.Font(None, 72)
-    font = pygame.font.Font(None, 36)
-    
-    # Reset all items to unpurchased state
-    for item in SHOP_ITEMS:
-        item.purchased = False
-    
-    title = font_title.render("SHOP", True, YELLOW)
-    total_coins = load_total_score()
-    
-    selected_item = 0
-    clock = pygame.time.Clock()
-    running = True
-    
-    while running:
-        clock.tick(60)
+class ShopScene(Scene):
+    """Spends the accumulated score on upgrades for the next game; ESC goes back"""
+    def enter(self):
+        self.font_title = pygame.font.Font(None, 72)
+        self.font = pygame.font.Font(None, 36)
+        
+        # Reset all items to unpurchased state
+        for item in SHOP_ITEMS:
+            item.purchased = False
+        
+        self.title = self.font_title.render("SHOP", True, YELLOW)
+        self.total_coins = load_total_score()
+        self.selected_item = 0
+
+    def update(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    self.selected_item = (self.selected_item - 1) % len(SHOP_ITEMS)
+                elif event.key == pygame.K_DOWN:
+                    self.selected_item = (self.selected_item + 1) % len(SHOP_ITEMS)
+                elif event.key == pygame.K_RETURN:
+                    # Try to purchase selected item
+                    item = SHOP_ITEMS[self.selected_item]
+                    if not item.purchased and self.total_coins >= item.cost:
+                        item.purchased = True
+                        self.total_coins -= item.cost
+                        save_total_score(self.total_coins)
+                        # Play power-up sound for purchase
+                        sound_manager.play_powerup()
+                elif event.key == pygame.K_ESCAPE:
+                    self.manager.pop()
+                    return
+
+    def draw(self):
+        font = self.font
         screen.fill(BLACK)
         
         # Draw title and total coins
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 50))
-        coins_text = font.render(f"Your Coins: {total_coins}", True, YELLOW)
+        screen.blit(self.title, (WIDTH//2 - self.title.get_width()//2, 50))
+        coins_text = font.render(f"Your Coins: {self.total_coins}", True, YELLOW)
         screen.blit(coins_text, (WIDTH//2 - coins_text.get_width()//2, 100))
         
         # Draw items
         for i, item in enumerate(SHOP_ITEMS):
             y_pos = 200 + i * 60
-            color = YELLOW if i == selected_item else WHITE
+            color = YELLOW if i == self.selected_item else WHITE
             
             # Draw selection box
-            if i == selected_item:
+            if i == self.selected_item:
                 pygame.draw.rect(screen, color, (WIDTH//4 - 10, y_pos - 5, WIDTH//2 + 20, 50), 2)
             
             # Draw item name and cost
@@ -2444,70 +5687,178 @@ def shop_screen():
             screen.blit(status_text, (3*WIDTH//4, y_pos))
             
             # Draw description
-            if i == selected_item:
+            if i == self.selected_item:
                 desc_text = font.render(item.description, True, WHITE)
                 screen.blit(desc_text, (WIDTH//2 - desc_text.get_width()//2, y_pos + 25))
         
         # Draw instructions
         instructions = font.render("↑/↓: Select   ENTER: Buy   ESC: Return", True, WHITE)
         screen.blit(instructions, (WIDTH//2 - instructions.get_width()//2, HEIGHT - 50))
-        
-        pygame.display.flip()
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected_item = (selected_item - 1) % len(SHOP_ITEMS)
-                elif event.key == pygame.K_DOWN:
-                    selected_item = (selected_item + 1) % len(SHOP_ITEMS)
-                elif event.key == pygame.K_RETURN:
-                    # Try to purchase selected item
-                    item = SHOP_ITEMS[selected_item]
-                    if not item.purchased and total_coins >= item.cost:
-                        item.purchased = True
-                        total_coins -= item.cost
-                        save_total_score(total_coins)
-                        # Play power-up sound for purchase
-                        sound_manager.play_powerup()
-                elif event.key == pygame.K_ESCAPE:
-                    running = False
 
 # Main game loop
+def bake_assets(levels):
+    """Regenerate stale art and sounds in the asset cache"""
+    start = time.perf_counter()
+    for key, create_ship, name, desc in SHIP_DESIGNS:
+        asset_cache.art(key, create_ship)
+    for power_up_type in PowerUp.COLORS:
+        asset_cache.art(('power_up', power_up_type), PowerUp.create_image, power_up_type)
+    # Large sizes share art; collect distinct keys
+    asteroid_keys = {AsteroidTemplate.art_key(size, variant)
+                     for level in range(1, levels + 1)
+                     for size in AsteroidTemplate.sizes(level)
+                     for variant in range(AsteroidTemplate.VARIANTS)}
+    for key in sorted(asteroid_keys):
+        asset_cache.art(key, AsteroidTemplate.create_image, *key[1:])
+    for level in range(5, levels + 1, 5):
+        asset_cache.art(('boss', level), Boss.create_image, level)
+    for name, params in SoundManager.SOUNDS.items():
+        asset_cache.sound(('sound', name, SAMPLE_RATE), create_simple_sound, *params, SAMPLE_RATE)
+    asset_cache.save()
+    print(f"Baked {len(asset_cache.entries)} assets into {asset_cache.directory}/ "
+          f"({asset_cache.misses} regenerated) in {time.perf_counter() - start:.2f}s")
+
+def read_telemetry_run(path):
+    """Tallies one telemetry run file; tallies merge by addition"""
+    tally = {'runs': 0, 'seconds': 0.0, 'outcomes': Counter(), 'deaths': Counter(), 'death_levels': Counter(),
+             'level_seconds': defaultdict(list), 'boss_ttk': defaultdict(list), 'boss_fights': Counter(),
+             'power_ups': Counter(), 'frame_buckets': defaultdict(lambda: [0, 0.0, 0.0, 0.0]), 'bad_lines': 0}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                    kind = event['event']
+                except (ValueError, KeyError, TypeError):
+                    tally['bad_lines'] += 1  # A run cut short mid-write leaves a partial last line
+                    continue
+                if kind == 'run_start':
+                    tally['runs'] += 1
+                elif kind == 'run_end':
+                    tally['outcomes'][event['outcome']] += 1
+                    tally['seconds'] += event['duration_s']
+                elif kind == 'death':
+                    tally['deaths'][event['cause']] += 1
+                    tally['death_levels'][event['level']] += 1
+                elif kind == 'level_end' and event['outcome'] == 'cleared':
+                    tally['level_seconds'][event['level']].append(event['duration_s'])
+                elif kind == 'boss_spawn':
+                    tally['boss_fights'][event['level']] += 1
+                elif kind == 'boss_defeat' and event['ttk_s'] is not None:
+                    tally['boss_ttk'][event['level']].append(event['ttk_s'])
+                elif kind == 'power_up':
+                    tally['power_ups'][event['type']] += 1
+                elif kind == 'frames':
+                    # Windows are grouped by how crowded the screen was
+                    bucket = tally['frame_buckets'][int(event['entities']) // 25 * 25]
+                    frames = event['frames']
+                    bucket[0] += frames
+                    bucket[1] += event['work_ms']['p50'] * frames
+                    bucket[2] += event['work_ms']['p99'] * frames
+                    bucket[3] = max(bucket[3], event['max_ms'])
+    except OSError as e:
+        logger.error("Error reading telemetry %s: %s", path, e)
+    tally['frame_buckets'] = dict(tally['frame_buckets'])  # Picklable
+    return tally
+
+def report_telemetry(paths):
+    """Summarize telemetry runs"""
+    start = time.perf_counter()
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.ndjson'))
+        else:
+            files.append(path)
+    total = read_telemetry_run(os.devnull)
+    with concurrent.futures.ProcessPoolExecutor() as pool:
+        for tally in pool.map(read_telemetry_run, files, chunksize=16):
+            for key in ('runs', 'seconds', 'bad_lines'):
+                total[key] += tally[key]
+            for key in ('outcomes', 'deaths', 'death_levels', 'boss_fights', 'power_ups'):
+                total[key].update(tally[key])
+            for key in ('level_seconds', 'boss_ttk'):
+                for level, values in tally[key].items():
+                    total[key][level].extend(values)
+            buckets = total['frame_buckets']
+            for entities, (frames, p50, p99, worst) in tally['frame_buckets'].items():
+                bucket = buckets.setdefault(entities, [0, 0.0, 0.0, 0.0])
+                bucket[0] += frames
+                bucket[1] += p50
+                bucket[2] += p99
+                bucket[3] = max(bucket[3], worst)
+    
+    print(f"{total['runs']} runs in {len(files)} files, {total['seconds'] / 3600:.2f}h played "
+          f"(read in {time.perf_counter() - start:.2f}s"
+          + (f", {total['bad_lines']} unreadable lines)" if total['bad_lines'] else ")"))
+    print("Outcomes: " + ", ".join(f"{outcome} {count}" for outcome, count in total['outcomes'].most_common()))
+    deaths = sum(total['deaths'].values())
+    if deaths:
+        print(f"\nDeaths by cause ({deaths}):")
+        for cause, count in total['deaths'].most_common():
+            print(f"  {cause:<14} {count:>7}  {100 * count / deaths:5.1f}%")
+        print("Deadliest levels:")
+        for level, count in total['death_levels'].most_common(10):
+            print(f"  level {level:<8} {count:>7}  {100 * count / deaths:5.1f}%")
+    if total['level_seconds']:
+        print("\nLevel clear time, game s (runs, p50, p90):")
+        for level in sorted(total['level_seconds']):
+            times = total['level_seconds'][level]
+            p50, p90 = numpy.percentile(times, (50, 90))
+            print(f"  level {level:<8} {len(times):>7}  {p50:7.1f}  {p90:7.1f}")
+    if total['boss_fights']:
+        print("\nBoss time-to-kill, game s (fights, kills, p50, p90):")
+        for level in sorted(total['boss_fights']):
+            times = total['boss_ttk'].get(level)
+            p50, p90 = numpy.percentile(times, (50, 90)) if times else (math.nan, math.nan)
+            print(f"  level {level:<8} {total['boss_fights'][level]:>7}  {len(times or ()):>5}  {p50:7.1f}  {p90:7.1f}")
+    if total['power_ups']:
+        print("\nPower-ups collected: "
+              + ", ".join(f"{kind} {count}" for kind, count in total['power_ups'].most_common()))
+    if total['frame_buckets']:
+        print("\nFrame work time by entity count, ms (frames, mean p50, mean p99, max):")
+        for entities in sorted(total['frame_buckets']):
+            frames, p50, p99, worst = total['frame_buckets'][entities]
+            print(f"  {entities:>4}-{entities + 24:<4} {frames:>9}  {p50 / frames:6.2f}  {p99 / frames:6.2f}  {worst:7.2f}")
+
 if __name__ == "__main__":
+    if ARGS.telemetry_report:
+        report_telemetry(ARGS.telemetry_report)
+        pygame.quit()
+        sys.exit()
+    
+    if ARGS.bake:
+        bake_assets(ARGS.bake_levels)
+        pygame.quit()
+        sys.exit()
+    
     pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    set_display_mode()
     pygame.display.set_caption("Space Shooter")
     
-    ESC_QUIT_GAME = False
-    PLAYER_NAME = None  # Always start with no player name
-    
-    # Main game loop
-    running = True
-    while running:
+    if ARGS.watch:
+        # Spectator viewer instead of a game
         try:
-            if ESC_QUIT_GAME:
-                break
-            
-            # Always get the name at the start of each game session
-            PLAYER_NAME = get_player_name()
-            if not PLAYER_NAME:
-                break  # Exit if no name provided
-            
-            # Show welcome screen
-            welcome_screen()
-            
-            # Check if user wants to quit
-            if ESC_QUIT_GAME:
-                break
-                
-        except SystemExit:
-            break
+            SceneManager().run(SpectatorScene(ARGS.watch))
         except Exception as e:
-            print(f"Error occurred: {e}")
-            break
+            logger.exception("Error occurred: %s", e)
+        pygame.quit()
+        sys.exit()
+    
+    if snapshot_stream:
+        snapshot_stream.listen()
+    
+    PLAYER_NAME = None  # Always start with no player name
+    
+    # One loop runs every screen, starting with name entry
+    try:
+        SceneManager().run(NameEntryScene())
+    except Exception as e:
+        logger.exception("Error occurred: %s", e)
     
+    memory_tracker.dump(ARGS.memstats_json)
+    asset_cache.save()
+    if snapshot_stream:
+        snapshot_stream.close()
     pygame.quit()
     sys.exit()
\ No newline at end of file
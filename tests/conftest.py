@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# space_game reads the command line and opens pygame on import; keep its files out of the checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], '--headless']
+os.chdir(tempfile.mkdtemp(prefix='space_game_tests_'))
+
+import space_game
+
+
+@pytest.fixture(scope='session', autouse=True)
+def display():
+    space_game.set_display_mode()
+
+
+@pytest.fixture(autouse=True)
+def clock():
+    space_game.game_clock.reset()
+    return space_game.game_clock
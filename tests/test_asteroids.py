@@ -0,0 +1,23 @@
+import space_game
+from space_game import AsteroidTemplate
+
+
+def test_art_key_caps_size_at_raster_limit():
+    limit = AsteroidTemplate.RASTER_LIMIT
+    assert AsteroidTemplate.art_key(limit - 1, 2) == ('asteroid', limit - 1, 2)
+    assert AsteroidTemplate.art_key(limit, 2) == ('asteroid', limit, 2)
+    assert AsteroidTemplate.art_key(limit * 3, 2) == ('asteroid', limit, 2)
+
+
+def test_sizes_stop_growing_at_growth_limit():
+    assert AsteroidTemplate.sizes(11) == AsteroidTemplate.sizes(40)
+    assert max(AsteroidTemplate.sizes(40)) == int(max(AsteroidTemplate.BASE_SIZES) * AsteroidTemplate.GROWTH_LIMIT)
+
+
+def test_large_sizes_share_art():
+    limit = AsteroidTemplate.RASTER_LIMIT
+    small = AsteroidTemplate.lookup(('asteroid', limit + 20, 0))
+    large = AsteroidTemplate.lookup(('asteroid', limit + 60, 0))
+    assert small.image_key == large.image_key == ('asteroid', limit, 0)
+    assert small.key != large.key
+    assert space_game.assets.images[large.key].get_size() == ((limit + 60) * 2, (limit + 60) * 2)
@@ -0,0 +1,66 @@
+import types
+
+import pygame
+import pytest
+
+from space_game import Bullet, clip_segment, path_hit, sweep_hit
+
+
+def target(rect, collision_radius=None):
+    mask = pygame.Mask(rect.size, fill=True)
+    return types.SimpleNamespace(rect=rect, mask=mask, collision_radius=collision_radius)
+
+
+def test_clip_segment_enter_and_leave():
+    rect = pygame.Rect(10, 0, 10, 10)
+    assert clip_segment(0, 5, 40, 5, rect) == pytest.approx((0.25, 0.5))
+
+
+def test_clip_segment_misses():
+    rect = pygame.Rect(10, 0, 10, 10)
+    assert clip_segment(0, 20, 40, 20, rect) is None
+    assert clip_segment(0, 5, 5, 5, rect) is None
+
+
+def test_clip_segment_axis_parallel_inside():
+    rect = pygame.Rect(0, 10, 10, 10)
+    assert clip_segment(5, 0, 5, 40, rect) == pytest.approx((0.25, 0.5))
+    assert clip_segment(5, 12, 5, 12, rect) == (0.0, 1.0)
+
+
+def test_path_hit_finds_first_contact_through_thin_target():
+    # A wall the footprint jumps clean over between the path's ends
+    wall = target(pygame.Rect(0, 48, 20, 4))
+    footprint = pygame.Mask((4, 4), fill=True)
+    hit = path_hit(10, 100, 10, 0, footprint, wall)
+    assert hit is not None
+    assert 100 - 100 * hit == pytest.approx(54, abs=0.5)
+
+
+def test_path_hit_misses_to_the_side():
+    wall = target(pygame.Rect(0, 48, 20, 4))
+    footprint = pygame.Mask((4, 4), fill=True)
+    assert path_hit(40, 100, 40, 0, footprint, wall) is None
+
+
+def test_path_hit_circle_target():
+    disc = target(pygame.Rect(0, 0, 40, 40), collision_radius=20)
+    footprint = pygame.Mask((2, 2), fill=True)
+    hit = path_hit(20, 100, 20, -100, footprint, disc)
+    assert hit is not None
+    assert 100 - 200 * hit == pytest.approx(41, abs=1.5)
+    # Passes the bounding box's corner but not the circle
+    assert path_hit(-10, 4, 4, -10, footprint, disc) is None
+
+
+def test_sweep_hit_catches_a_bullet_that_jumped_the_target():
+    bullet = Bullet(10, 100, -1)
+    try:
+        store, slot = bullet.store, bullet.slot
+        store.last_x[slot], store.last_y[slot] = 10, 80
+        store.x[slot], store.y[slot] = 10, 30
+        wall = target(pygame.Rect(0, 50, 20, 4))
+        assert wall.rect.colliderect(bullet.rect) is False
+        assert sweep_hit(bullet, wall) == pytest.approx(0.44, abs=0.03)
+    finally:
+        bullet.release()
@@ -0,0 +1,92 @@
+
+import pygame
+import pytest
+
+from space_game import Boss, FramePacer, GameClock
+
+
+def run(clock, frames):
+    for _ in range(frames):
+        for _ in range(clock.steps()):
+            clock.advance()
+
+
+def test_timers_fire_in_due_order(clock):
+    fired = []
+    clock.schedule_at(80, fired.append, 'late')
+    clock.schedule_at(40, fired.append, 'early')
+    clock.schedule_at(40, fired.append, 'early, scheduled second')
+    run(clock, 2)
+    assert fired == []
+    run(clock, 1)
+    assert fired == ['early', 'early, scheduled second']
+    run(clock, 1)
+    assert fired == ['early', 'early, scheduled second']
+    run(clock, 1)
+    assert fired == ['early', 'early, scheduled second', 'late']
+
+
+def test_cancelled_timer_does_not_fire(clock):
+    fired = []
+    clock.schedule(10, fired.append, 'cancelled').cancel()
+    clock.schedule(10, fired.append, 'kept')
+    run(clock, 1)
+    assert fired == ['kept']
+
+
+def test_pause_stops_time_and_timers(clock):
+    fired = []
+    clock.schedule(100, fired.append, True)
+    run(clock, 3)
+    now = clock.ticks()
+    clock.toggle_pause()
+    assert clock.steps() == 0
+    run(clock, 60)
+    assert clock.ticks() == now and fired == []
+    clock.toggle_pause()
+    run(clock, 4)
+    assert fired == [True]
+
+
+@pytest.mark.parametrize('direction, steps', [(-1, 30), (-2, 15), (1, 120), (2, 240), (5, 240), (-5, 15)])
+def test_scale_sets_steps_per_frame(clock, direction, steps):
+    clock.change_scale(direction)
+    assert sum(clock.steps() for _ in range(60)) == steps
+
+
+def test_reset(clock):
+    clock.schedule(10, pytest.fail)
+    clock.change_scale(1)
+    clock.toggle_pause()
+    clock.reset()
+    run(clock, 2)
+    assert (clock.scale, clock.paused) == (1.0, False)
+    assert clock.ticks() == int(2 * GameClock.TICK_MS)
+
+
+def test_idle_frames_are_not_intervals():
+    pacer = FramePacer(mode='uncapped')
+    pacer.tick()
+    pacer.idle(0)
+    pacer.idle(0)
+    pacer.tick()
+    pacer.tick()
+    assert len(pacer.intervals) == 1
+
+
+@pytest.mark.parametrize('level', [5, 50])
+def test_boss_patterns_switch_on_the_clock(clock, level):
+    boss = Boss(level)
+    group = pygame.sprite.Group(boss)
+    switches = []
+    for _ in range(int(boss.pattern_duration * 3.5 / GameClock.TICK_MS)):
+        pattern = boss.current_pattern
+        clock.advance()
+        if boss.current_pattern != pattern:
+            switches.append((boss.current_pattern, clock.ticks()))
+    assert [pattern for pattern, _ in switches] == [1, 2, 3]
+    for previous, (_, now) in zip([0] + [now for _, now in switches], switches):
+        assert boss.pattern_duration <= now - previous <= boss.pattern_duration + GameClock.TICK_MS
+    group.empty()
+    run(clock, int(boss.pattern_duration / GameClock.TICK_MS) + 2)
+    assert boss.current_pattern == 3
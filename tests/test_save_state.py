@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+import space_game
+from space_game import GameScene, SaveState, SceneManager
+
+
+@pytest.fixture
+def ship():
+    key, create_ship, _, _ = space_game.SHIP_DESIGNS[0]
+    space_game.assets.get(key, lambda: space_game.build_art(key))
+    return key
+
+
+def play(manager, scene, frames):
+    manager.push(scene)
+    for _ in range(frames):
+        scene.update([])
+        scene.draw()
+
+
+def snapshot(scene):
+    sprites = sorted((type(sprite).__name__, sprite.rect.center) for sprite in scene.all_sprites)
+    return (scene.score, scene.level, scene.level_score_threshold, scene.player.rect.center,
+            scene.player.shoot_delay, sprites, len(scene.spawner.pending))
+
+
+def test_round_trip(ship, tmp_path, monkeypatch):
+    monkeypatch.setattr(space_game, 'PLAYER_NAME', '12345')
+    path = str(tmp_path / 'save.bin')
+    manager = SceneManager()
+    scene = GameScene(ship, 5)
+    play(manager, scene, 90)
+    scene.score = 1234
+    before = snapshot(scene)
+    assert SaveState.save(scene, path)
+    expected_random = random.random()
+    manager.pop()
+
+    saved = SaveState.load(path)
+    assert (saved.level, saved.ship_key, saved.ship_speed) == (scene.level, ship, 5)
+    resumed = GameScene(saved.ship_key, saved.ship_speed, saved)
+    manager.push(resumed)
+    try:
+        assert snapshot(resumed) == before
+        assert random.random() == expected_random
+    finally:
+        resumed.running = False
+        manager.pop()
+
+
+def test_boss_round_trip(ship, tmp_path, monkeypatch):
+    monkeypatch.setattr(space_game, 'PLAYER_NAME', '12345')
+    path = str(tmp_path / 'save.bin')
+    manager = SceneManager()
+    scene = GameScene(ship, 5)
+    manager.push(scene)
+    scene.level = 5
+    scene.transition_start_time = space_game.game_clock.ticks() - 5000
+    for _ in range(50):
+        scene.update([])
+        scene.draw()
+    boss = next(iter(scene.boss_group))
+    boss.health -= 100
+    before = (boss.image_key, boss.health, boss.current_pattern, boss.rect.center)
+    assert SaveState.save(scene, path)
+    manager.pop()
+
+    saved = SaveState.load(path)
+    resumed = GameScene(saved.ship_key, saved.ship_speed, saved)
+    manager.push(resumed)
+    try:
+        boss = next(iter(resumed.boss_group))
+        assert (boss.image_key, boss.health, boss.current_pattern, boss.rect.center) == before
+        assert len(boss.timers) == 2
+    finally:
+        resumed.running = False
+        manager.pop()
+
+
+def test_damaged_save_is_discarded(ship, tmp_path, monkeypatch):
+    monkeypatch.setattr(space_game, 'PLAYER_NAME', '12345')
+    path = str(tmp_path / 'save.bin')
+    manager = SceneManager()
+    scene = GameScene(ship, 5)
+    play(manager, scene, 10)
+    assert SaveState.save(scene, path)
+    scene.running = False
+    manager.pop()
+
+    data = open(path, 'rb').read()
+    with open(path, 'wb') as f:
+        f.write(data[:len(data) // 2])
+    assert SaveState.load(path) is None
+    assert not SaveState.exists(path)
+
+
+def test_wrong_version_is_discarded(tmp_path):
+    path = str(tmp_path / 'save.bin')
+    with open(path, 'wb') as f:
+        f.write(SaveState.HEADER.pack(SaveState.MAGIC, SaveState.VERSION + 1))
+    assert SaveState.load(path) is None
+    assert not SaveState.exists(path)
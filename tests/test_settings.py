@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import space_game
+from space_game import parse_args
+
+
+@pytest.fixture
+def config(tmp_path):
+    def write(values):
+        path = tmp_path / 'settings.json'
+        path.write_text(values if isinstance(values, str) else json.dumps(values))
+        return str(path)
+    return write
+
+
+def fails(argv, capsys):
+    with pytest.raises(SystemExit) as exit:
+        parse_args(argv)
+    assert exit.value.code == 2
+    return capsys.readouterr().err
+
+
+def test_defaults_without_a_config_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(space_game, 'CONFIG_PATH', str(tmp_path / 'missing.json'))
+    args = parse_args([])
+    assert (args.width, args.height, args.fps, args.render_scale, args.glow) == (1280, 1280, 60, 1.0, True)
+
+
+def test_default_config_path_is_read(config, monkeypatch):
+    monkeypatch.setattr(space_game, 'CONFIG_PATH', config({'fps': 120}))
+    assert parse_args([]).fps == 120
+
+
+def test_file_values_by_name(config):
+    args = parse_args(['--config', config({'width': 1920, 'render-scale': 0.5, 'glow': False, 'pacing': 'busy'})])
+    assert (args.width, args.render_scale, args.glow, args.pacing) == (1920, 0.5, False, 'busy')
+
+
+def test_command_line_overrides_file(config):
+    path = config({'fps': 120, 'glow': False})
+    args = parse_args(['--config', path, '--fps', '30', '--glow'])
+    assert (args.fps, args.glow) == (30, True)
+
+
+@pytest.mark.parametrize('values, message', [
+    ({'fps': 0}, 'fps must be at least 1'),
+    ({'width': 320}, 'width must be at least 640'),
+    ({'render_scale': 2}, 'render_scale must be from 0.25 to 1.0'),
+    ({'fps': 'fast'}, "bad value 'fast' for fps"),
+    ({'glow': 'yes'}, 'expected true or false'),
+    ({'pacing': 'sometimes'}, 'pacing must be one of'),
+    ({'colour': 'red'}, "unknown setting 'colour'"),
+    ([60], 'expected a JSON object'),
+    ('{"fps": ', "can't read config file"),
+])
+def test_bad_file_values(config, capsys, values, message):
+    assert message in fails(['--config', config(values)], capsys)
+
+
+@pytest.mark.parametrize('argv, message', [
+    (['--fps', '0'], '--fps must be at least 1'),
+    (['--height', '100'], '--height must be at least 640'),
+    (['--render-scale', '0.1'], '--render-scale must be from 0.25 to 1.0'),
+    (['--no-such-option'], 'unrecognized arguments'),
+])
+def test_bad_command_line_values(tmp_path, monkeypatch, capsys, argv, message):
+    monkeypatch.setattr(space_game, 'CONFIG_PATH', str(tmp_path / 'missing.json'))
+    assert message in fails(argv, capsys)
+
+
+def test_missing_explicit_config(tmp_path, capsys):
+    assert 'not found' in fails(['--config', str(tmp_path / 'missing.json')], capsys)
@@ -0,0 +1,54 @@
+import json
+
+from space_game import read_telemetry_run
+
+
+def write_run(path, events, tail=''):
+    with open(path, 'w') as f:
+        for event in events:
+            f.write(json.dumps(event) + '\n')
+        f.write(tail)
+
+
+EVENTS = [
+    {'event': 'run_start', 'player': 'test'},
+    {'event': 'level_end', 'level': 1, 'outcome': 'cleared', 'duration_s': 12.5},
+    {'event': 'power_up', 'type': 'shield'},
+    {'event': 'frames', 'frames': 300, 'entities': 30, 'work_ms': {'p50': 2.0, 'p99': 6.0}, 'max_ms': 9.0},
+    {'event': 'death', 'cause': 'asteroid', 'level': 2},
+]
+
+
+def test_partial_last_line_is_counted_and_skipped(tmp_path):
+    path = tmp_path / 'run.ndjson'
+    write_run(path, EVENTS, tail='{"event": "run_end", "outc')
+    tally = read_telemetry_run(str(path))
+    assert tally['bad_lines'] == 1
+    assert tally['runs'] == 1
+    assert tally['outcomes'] == {}
+    assert tally['level_seconds'] == {1: [12.5]}
+    assert tally['power_ups'] == {'shield': 1}
+    assert tally['deaths'] == {'asteroid': 1}
+    assert tally['frame_buckets'] == {25: [300, 600.0, 1800.0, 9.0]}
+
+
+def test_lines_without_an_event_are_bad(tmp_path):
+    path = tmp_path / 'run.ndjson'
+    write_run(path, [{'event': 'run_start'}], tail='[1, 2]\n{"level": 3}\n\n')
+    tally = read_telemetry_run(str(path))
+    assert tally['runs'] == 1
+    assert tally['bad_lines'] == 3
+
+
+def test_complete_run(tmp_path):
+    path = tmp_path / 'run.ndjson'
+    write_run(path, EVENTS + [{'event': 'run_end', 'outcome': 'died', 'duration_s': 40.0}])
+    tally = read_telemetry_run(str(path))
+    assert tally['bad_lines'] == 0
+    assert tally['outcomes'] == {'died': 1}
+    assert tally['seconds'] == 40.0
+
+
+def test_missing_file(tmp_path):
+    tally = read_telemetry_run(str(tmp_path / 'missing.ndjson'))
+    assert tally['runs'] == 0